@@ -0,0 +1,27 @@
+"""Record request attempts on classification steps
+
+Revision ID: 004a
+Revises: 003a
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "004a"
+down_revision: Union[str, None] = "003a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "classification_steps",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("1")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("classification_steps", "attempts")
@@ -0,0 +1,33 @@
+"""LLM response cache table
+
+Revision ID: 005a
+Revises: 004a
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005a"
+down_revision: Union[str, None] = "004a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_cache_entries",
+        sa.Column("key", sa.String(64), primary_key=True),
+        sa.Column("model", sa.String(200), nullable=False, server_default=""),
+        sa.Column("response", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_llm_cache_entries_created_at", "llm_cache_entries", ["created_at"])
+    op.create_index("ix_llm_cache_entries_expires_at", "llm_cache_entries", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("llm_cache_entries")
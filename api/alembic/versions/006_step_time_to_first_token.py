@@ -0,0 +1,27 @@
+"""Record time to first token on classification steps
+
+Revision ID: 006a
+Revises: 005a
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006a"
+down_revision: Union[str, None] = "005a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "classification_steps",
+        sa.Column("time_to_first_token_ms", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("classification_steps", "time_to_first_token_ms")
@@ -0,0 +1,27 @@
+"""Record which LLM backend served each classification step
+
+Revision ID: 007a
+Revises: 006a
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "007a"
+down_revision: Union[str, None] = "006a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "classification_steps",
+        sa.Column("backend", sa.String(100), nullable=False, server_default=""),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("classification_steps", "backend")
@@ -0,0 +1,33 @@
+"""Record prompt, completion and cached tokens and cost per classification step
+
+Revision ID: 008a
+Revises: 007a
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008a"
+down_revision: Union[str, None] = "007a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for column in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+        op.add_column(
+            "classification_steps",
+            sa.Column(column, sa.Integer(), nullable=False, server_default="0"),
+        )
+    op.add_column(
+        "classification_steps",
+        sa.Column("cost_usd", sa.Float(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    for column in ("cost_usd", "cached_tokens", "completion_tokens", "prompt_tokens"):
+        op.drop_column("classification_steps", column)
@@ -0,0 +1,50 @@
+"""Ranked full-text and trigram search over taxonomy nodes
+
+Revision ID: 009a
+Revises: 008a
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "009a"
+down_revision: Union[str, None] = "008a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(definition, '') || ' ' || "
+    "coalesce(distinguishing_characteristics, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(inclusions, '') || ' ' || "
+    "coalesce(exclusions, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "ALTER TABLE taxonomy_nodes ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+    )
+    op.create_index(
+        "idx_taxonomy_nodes_search_vector",
+        "taxonomy_nodes",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "idx_taxonomy_nodes_name_trgm",
+        "taxonomy_nodes",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_taxonomy_nodes_name_trgm", table_name="taxonomy_nodes")
+    op.drop_index("idx_taxonomy_nodes_search_vector", table_name="taxonomy_nodes")
+    op.drop_column("taxonomy_nodes", "search_vector")
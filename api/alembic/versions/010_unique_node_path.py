@@ -0,0 +1,23 @@
+"""Unique index on taxonomy node path, for upserts keyed by path
+
+Revision ID: 010a
+Revises: 009a
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "010a"
+down_revision: Union[str, None] = "009a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("uq_taxonomy_nodes_path", "taxonomy_nodes", ["path"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("uq_taxonomy_nodes_path", table_name="taxonomy_nodes")
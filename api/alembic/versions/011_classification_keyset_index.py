@@ -0,0 +1,26 @@
+"""Index classifications by (created_at, id) for keyset pagination
+
+Revision ID: 011a
+Revises: 010a
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "011a"
+down_revision: Union[str, None] = "010a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX idx_classifications_created_at_id "
+        "ON classifications (created_at DESC, id DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_classifications_created_at_id", table_name="classifications")
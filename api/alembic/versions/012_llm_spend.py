@@ -0,0 +1,29 @@
+"""Daily LLM spend per API key
+
+Revision ID: 012a
+Revises: 011a
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "012a"
+down_revision: Union[str, None] = "011a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_spend",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("key", sa.String(200), primary_key=True),
+        sa.Column("spent_usd", sa.Float(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("llm_spend")
@@ -0,0 +1,94 @@
+"""A fake vendor website for load-testing the scraper without the internet.
+
+Every `/products/{n}` is a deterministic product page with enough body text for
+trafilatura to extract, served after a log-normal delay:
+
+    python -m bench.fake_site --port 8020 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import math
+import random
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import HTMLResponse
+
+_CAPABILITIES = [
+    "endpoint detection and response",
+    "identity and access management",
+    "application performance monitoring",
+    "log aggregation and search",
+    "backup and disaster recovery",
+    "network firewall and intrusion prevention",
+    "container orchestration",
+    "data warehousing and analytics",
+    "IT service management and ticketing",
+    "rack servers for virtualization workloads",
+]
+
+
+def product_page(product_id: int) -> str:
+    rng = random.Random(product_id)
+    capability = rng.choice(_CAPABILITIES)
+    name = f"Acme {capability.split()[0].title()} {product_id}"
+    paragraphs = [
+        f"{name} is an enterprise platform for {capability}. Teams use it to run "
+        f"{capability} across cloud and on-premises environments from a single console.",
+        f"Key features include policy-based automation, role-based access control, audit "
+        f"logging, and integrations with the tools your organization already runs. "
+        f"{name} scales from a single site to global deployments.",
+        f"Customers choose {name} to reduce operational overhead, meet compliance "
+        f"requirements, and give security and operations teams a shared view of "
+        f"{capability}.",
+    ]
+    body = "\n".join(f"<p>{p}</p>" for p in paragraphs)
+    return f"""<!DOCTYPE html>
+<html><head><title>{name}</title></head>
+<body>
+<nav><a href="/">Home</a> | <a href="/pricing">Pricing</a></nav>
+<article>
+<h1>{name}</h1>
+{body}
+</article>
+<footer>Copyright Acme Corp</footer>
+</body></html>"""
+
+
+def create_site_app(
+    latency: float = 0.05,
+    latency_sigma: float = 0.5,
+    error_rate: float = 0.0,
+    seed: int = 0,
+) -> FastAPI:
+    """Product pages after a log-normal delay; `error_rate` of responses are 503s."""
+    app = FastAPI(title="Fake vendor site")
+    rng = random.Random(seed)
+
+    @app.get("/products/{product_id}", response_class=HTMLResponse)
+    async def product(product_id: int):
+        if latency > 0:
+            await asyncio.sleep(rng.lognormvariate(math.log(latency), latency_sigma))
+        if rng.random() < error_rate:
+            raise HTTPException(status_code=503, detail="Try again later")
+        return product_page(product_id)
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve fake vendor product pages.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8020)
+    parser.add_argument("--latency", type=float, default=0.05, help="median seconds per page")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    app = create_site_app(args.latency, args.latency_sigma, args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Drive POST /classify at a fixed request rate and report latency and saturation.
+
+By default the API runs inside this process as a single uvicorn worker, using
+the fake LLM provider and a fake vendor site, against the database in
+SORTING_HAT_DATABASE_URL (a local Postgres with `alembic upgrade head` applied):
+
+    python -m bench.loadtest --rps 20 --duration 60
+
+Load is open-loop: requests are sent on schedule whether or not earlier ones
+have finished, and latency is measured from the scheduled send time, so a
+saturated server shows up as growing latency rather than a lower send rate.
+
+With --target the load goes to an API that is already running (start it with
+SORTING_HAT_LLM_PROVIDER=fake); DB pool waits and event-loop lag are only
+measured in-process.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+
+import httpx
+
+from bench.fake_site import create_site_app
+from bench.stats import describe, print_report
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that asked to sleep `interval`."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+
+def instrument_pool(engine) -> list[float]:
+    """Record how long each DB connection checkout takes (waiting for a free
+    connection, or opening a new one)."""
+    pool = engine.sync_engine.pool
+    waits: list[float] = []
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            waits.append(time.perf_counter() - start)
+
+    pool.connect = timed_connect
+    return waits
+
+
+class ServerThread(threading.Thread):
+    """Run a uvicorn server on its own event loop so it does not skew the API's loop."""
+
+    def __init__(self, app, port: int):
+        import uvicorn
+
+        super().__init__(daemon=True)
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+        )
+
+    def run(self) -> None:
+        self.server.run()
+
+    def wait_started(self, timeout: float = 10.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("server did not start")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.join(timeout=5)
+
+
+async def generate_load(
+    base_url: str, urls: list[str], rps: float, duration: float, timeout: float
+) -> dict:
+    """Send POST /classify at `rps` for `duration` seconds; return latency and status stats."""
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+
+        async def one(url: str, scheduled: float) -> tuple[str, float]:
+            try:
+                response = await client.post("/classify", json={"url": url})
+                outcome = str(response.status_code)
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            return outcome, time.perf_counter() - scheduled
+
+        start = time.perf_counter()
+        tasks = []
+        i = 0
+        while (scheduled := start + i / rps) < start + duration:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(urls[i % len(urls)], scheduled)))
+            i += 1
+        results = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    outcomes: dict[str, int] = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    ok = [latency for outcome, latency in results if outcome == "201"]
+    return {
+        "sent": len(results),
+        "target_rps": rps,
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "outcomes": outcomes,
+        "latency": describe(ok),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    site = ServerThread(
+        create_site_app(args.site_latency, error_rate=args.site_error_rate), args.site_port
+    )
+    site.start()
+    site.wait_started()
+    urls = [f"http://127.0.0.1:{args.site_port}/products/{n}" for n in range(args.pages)]
+
+    server = lag = pool_waits = None
+    if args.target:
+        base_url = args.target.rstrip("/")
+    else:
+        import uvicorn
+
+        from sorting_hat.config import settings
+        from sorting_hat.db import engine
+        from sorting_hat.main import app
+
+        pool_waits = instrument_pool(engine)
+        server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning")
+        )
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            if serving.done():
+                serving.result()
+            await asyncio.sleep(0.05)
+        lag = LoopLagMonitor()
+        lag.start()
+        base_url = f"http://127.0.0.1:{args.port}{settings.api_prefix}"
+
+    try:
+        # The load generator gets its own thread and loop, leaving the API's loop alone.
+        report = await asyncio.to_thread(
+            asyncio.run,
+            generate_load(base_url, urls, args.rps, args.duration, args.timeout),
+        )
+    finally:
+        site.stop()
+        if server:
+            lag.stop()
+            server.should_exit = True
+            await serving
+
+    if lag is not None:
+        report["event_loop_lag"] = describe(lag.samples)
+    if pool_waits is not None:
+        report["db_pool_wait"] = {
+            **describe(pool_waits),
+            "over_10ms": sum(1 for w in pool_waits if w > 0.01),
+            "pool": engine.pool.status(),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test POST /classify.")
+    parser.add_argument("--rps", type=float, default=10.0, help="requests per second to send")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to send for")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout")
+    parser.add_argument(
+        "--target", help="base URL of a running API, e.g. http://localhost:8000/api/v1"
+    )
+    parser.add_argument("--port", type=int, default=8001, help="port for the in-process API")
+    parser.add_argument("--site-port", type=int, default=8020)
+    parser.add_argument("--site-latency", type=float, default=0.05, help="median page latency")
+    parser.add_argument("--site-error-rate", type=float, default=0.0)
+    parser.add_argument("--pages", type=int, default=1000, help="distinct product pages")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="median fake LLM latency")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    # Settings are read at import, so configure the in-process API before importing it.
+    os.environ.setdefault("SORTING_HAT_LLM_PROVIDER", "fake")
+    os.environ.setdefault("SORTING_HAT_FAKE_LLM_LATENCY", str(args.llm_latency))
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Re-run recorded classifications offline from a cassette and compare the results.
+
+Record production traffic with SORTING_HAT_CASSETTE_RECORD_PATH, then:
+
+    python -m bench.replay traffic.jsonl.gz --latency-scale 0 --save baseline.json
+    # ...change prompts, parsing or the pipeline...
+    python -m bench.replay traffic.jsonl.gz --latency-scale 0 --baseline baseline.json
+
+Every URL in the cassette is classified again by the current code, with LLM
+calls and page fetches served from the cassette. The taxonomy comes from
+SORTING_HAT_DATABASE_URL; each classification runs in a transaction that is
+rolled back, so nothing is written.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from bench.stats import describe, print_report
+from sorting_hat.cassette import Cassette, ReplayProvider, ReplayScraper
+from sorting_hat.config import settings
+from sorting_hat.db import async_session
+from sorting_hat.services.classifier import ClassifierService
+
+
+def recorded_models(cassette: Cassette) -> dict[str, str]:
+    """The model each scope's first LLM call used, so replayed requests match exactly."""
+    models: dict[str, str] = {}
+    for item in cassette.interactions:
+        if item["kind"] == "llm" and item.get("scope"):
+            models.setdefault(item["scope"], item["request"]["model"])
+    return models
+
+
+async def replay(cassette: Cassette, concurrency: int, latency_scale: float) -> dict:
+    provider = ReplayProvider(cassette, latency_scale)
+    models = recorded_models(cassette)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    outputs: dict[str, dict] = {}
+    tokens = {"prompt": 0, "completion": 0, "cached": 0, "total": 0}
+    cost = 0.0
+
+    async def one(url: str) -> None:
+        nonlocal cost
+        async with semaphore, async_session() as session:
+            service = ClassifierService(
+                session=session,
+                llm=provider,
+                model=models.get(url, settings.llm_model),
+                scraper=ReplayScraper(cassette, latency_scale, max_attempts=1),
+            )
+            start = time.perf_counter()
+            try:
+                result = await service.classify_url(url)
+            except Exception as e:
+                outputs[url] = {"error": f"{type(e).__name__}: {e}"}
+                return
+            finally:
+                await session.rollback()
+            latencies.append(time.perf_counter() - start)
+            classification = result.classification
+            outputs[url] = {
+                "primary_node_id": classification.primary_node_id,
+                "secondary_node_ids": list(classification.secondary_node_ids),
+                "confidence": classification.confidence_score,
+            }
+            for step in result.steps:
+                tokens["prompt"] += step.prompt_tokens
+                tokens["completion"] += step.completion_tokens
+                tokens["cached"] += step.cached_tokens
+                tokens["total"] += step.tokens_used
+                cost += step.cost_usd
+
+    urls = cassette.scopes()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(url) for url in urls))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "classifications": len(urls),
+        "errors": sum(1 for output in outputs.values() if "error" in output),
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency": describe(latencies),
+        "tokens": tokens,
+        "cost_usd": round(cost, 4),
+        "replay": {
+            "exact": cassette.stats.exact,
+            "positional": cassette.stats.positional,
+            "misses": cassette.stats.misses,
+        },
+        "outputs": outputs,
+    }
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """Outputs that changed and token usage relative to a previous run."""
+    changed = {
+        url: {"before": baseline["outputs"].get(url), "after": output}
+        for url, output in report["outputs"].items()
+        if baseline["outputs"].get(url) != output
+    }
+    return {
+        "changed_outputs": len(changed),
+        "token_delta": {
+            key: report["tokens"][key] - baseline["tokens"].get(key, 0) for key in report["tokens"]
+        },
+        "throughput_ratio": (
+            round(report["throughput_per_s"] / baseline["throughput_per_s"], 2)
+            if baseline.get("throughput_per_s")
+            else None
+        ),
+        "changes": changed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a cassette through the classifier.")
+    parser.add_argument("cassette", help="gzip JSONL cassette recorded by the API")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="multiply recorded latencies (0 = as fast as possible)",
+    )
+    parser.add_argument("--save", help="write the full report as JSON, for use as a baseline")
+    parser.add_argument("--baseline", help="report from an earlier run to compare against")
+    args = parser.parse_args()
+
+    cassette = Cassette.load(args.cassette)
+    report = asyncio.run(replay(cassette, args.concurrency, args.latency_scale))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report, json.load(f))
+
+    summary = {key: value for key, value in report.items() if key != "outputs"}
+    print_report(summary)
+
+
+if __name__ == "__main__":
+    main()
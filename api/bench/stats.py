@@ -0,0 +1,26 @@
+def percentile(samples: list[float], p: float) -> float:
+    """Nearest-rank percentile; 0 for no samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def describe(samples: list[float]) -> dict[str, float]:
+    """p50/p95/p99/max of samples in seconds, reported in milliseconds."""
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+        "max_ms": round(max(samples, default=0.0) * 1000, 1),
+    }
+
+
+def print_report(report: dict, indent: int = 0) -> None:
+    for key, value in report.items():
+        if isinstance(value, dict):
+            print(f"{' ' * indent}{key}:")
+            print_report(value, indent + 2)
+        else:
+            print(f"{' ' * indent}{key}: {value}")
@@ -0,0 +1,311 @@
+"""Record and replay LLM and scraper traffic ("cassettes").
+
+A cassette is a gzip-compressed JSONL file with one interaction per line: the
+request, the response and how long it took. Recording wraps the real provider
+and scraper; replay serves the interactions back without touching the network,
+with the original latencies or scaled ones.
+
+Replay matches an LLM call by its exact request first. When prompts have
+changed since recording, it falls back to the call's position within its
+scope (one classification), so a fixed corpus can be re-run after prompt,
+parsing or pipeline changes.
+"""
+
+import asyncio
+import gzip
+import json
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Iterator
+
+from sorting_hat.config import settings
+from sorting_hat.llm.cache import cache_key
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse, LLMStreamChunk
+from sorting_hat.services.scraper import Scraper, ScraperError
+
+
+class CassetteMissError(Exception):
+    pass
+
+
+@dataclass
+class _Scope:
+    label: str
+    calls: dict[str, int] = field(default_factory=dict)  # next call index per kind
+
+    def next_index(self, kind: str) -> int:
+        index = self.calls.get(kind, 0)
+        self.calls[kind] = index + 1
+        return index
+
+
+_scope: ContextVar[_Scope | None] = ContextVar("cassette_scope", default=None)
+
+
+@contextmanager
+def cassette_scope(label: str) -> Iterator[None]:
+    """Label the calls made inside this block (e.g. with the URL being classified)."""
+    token = _scope.set(_Scope(label))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def _position(kind: str) -> dict:
+    scope = _scope.get()
+    if scope is None:
+        return {"scope": None, "index": None}
+    return {"scope": scope.label, "index": scope.next_index(kind)}
+
+
+def _prompt_chars(messages: list[LLMMessage]) -> int:
+    return sum(len(m.content) for m in messages)
+
+
+class CassetteWriter:
+    """Appends interactions to a cassette; safe to reopen, gzip members concatenate.
+
+    write() only queues the line. A background thread compresses and writes it,
+    flushing whenever the queue runs dry, so recording never blocks the event loop.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._queue: queue.SimpleQueue[str | None] | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def write(self, interaction: dict) -> None:
+        line = json.dumps(interaction) + "\n"
+        with self._lock:
+            if self._queue is None:
+                self._queue = queue.SimpleQueue()
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._queue,), name="cassette-writer", daemon=True
+                )
+                self._thread.start()
+            self._queue.put(line)
+
+    def _run(self, lines: queue.SimpleQueue[str | None]) -> None:
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            while (line := lines.get()) is not None:
+                f.write(line)
+                if lines.empty():
+                    f.flush()
+
+    def close(self) -> None:
+        """Write everything queued so far and close the file."""
+        with self._lock:
+            lines, thread = self._queue, self._thread
+            self._queue = self._thread = None
+            if lines is not None:
+                lines.put(None)
+        if thread is not None:
+            thread.join()
+
+
+@dataclass
+class ReplayStats:
+    exact: int = 0
+    positional: int = 0  # matched by position because the request changed
+    misses: int = 0
+
+
+class Cassette:
+    def __init__(self, interactions: list[dict]):
+        self.interactions = interactions
+        self.stats = ReplayStats()
+        self._by_key: dict[tuple[str, str], deque[dict]] = {}
+        self._by_position: dict[tuple[str, str, int], dict] = {}
+        for item in interactions:
+            self._by_key.setdefault((item["kind"], item["key"]), deque()).append(item)
+            if item.get("scope") is not None:
+                self._by_position[(item["kind"], item["scope"], item["index"])] = item
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return cls([json.loads(line) for line in f if line.strip()])
+
+    def scopes(self) -> list[str]:
+        """Scope labels in recording order."""
+        return list(dict.fromkeys(i["scope"] for i in self.interactions if i.get("scope")))
+
+    def find(self, kind: str, key: str) -> tuple[dict, bool]:
+        """Return (interaction, exact). Repeated identical requests replay in recorded order."""
+        position = _position(kind)
+        queue = self._by_key.get((kind, key))
+        if queue:
+            self.stats.exact += 1
+            return (queue.popleft() if len(queue) > 1 else queue[0]), True
+        item = self._by_position.get((kind, position["scope"], position["index"]))
+        if item is not None:
+            self.stats.positional += 1
+            return item, False
+        self.stats.misses += 1
+        raise CassetteMissError(f"No recorded {kind} interaction for {key[:80]}")
+
+
+class RecordingProvider(LLMProvider):
+    def __init__(self, inner: LLMProvider, writer: CassetteWriter):
+        self.inner = inner
+        self.writer = writer
+
+    async def complete(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> LLMResponse:
+        position = _position("llm")
+        start = time.monotonic()
+        response = await self.inner.complete(messages, model, temperature, max_tokens)
+        self._record(messages, model, temperature, max_tokens, position, response, start, None)
+        return response
+
+    async def complete_stream(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        position = _position("llm")
+        start = time.monotonic()
+        ttft = None
+        async for chunk in self.inner.complete_stream(messages, model, temperature, max_tokens):
+            if chunk.delta and ttft is None:
+                ttft = time.monotonic() - start
+            if chunk.response:
+                self._record(
+                    messages, model, temperature, max_tokens, position, chunk.response, start, ttft
+                )
+            yield chunk
+
+    def _record(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        position: dict,
+        response: LLMResponse,
+        start: float,
+        ttft: float | None,
+    ) -> None:
+        self.writer.write(
+            {
+                "kind": "llm",
+                "key": cache_key(model, messages, temperature, max_tokens),
+                **position,
+                "request": {
+                    "model": model,
+                    "messages": [[m.role, m.content] for m in messages],
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                },
+                "response": asdict(response),
+                "elapsed": time.monotonic() - start,
+                "ttft": ttft,
+            }
+        )
+
+
+class ReplayProvider(LLMProvider):
+    """Serve recorded completions; `latency_scale` 0 replays as fast as possible."""
+
+    def __init__(self, cassette: Cassette, latency_scale: float = 1.0):
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+
+    async def complete(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> LLMResponse:
+        item, response = self._find(messages, model, temperature, max_tokens)
+        await asyncio.sleep(item["elapsed"] * self.latency_scale)
+        return response
+
+    async def complete_stream(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        item, response = self._find(messages, model, temperature, max_tokens)
+        ttft = item["ttft"] if item["ttft"] is not None else item["elapsed"]
+        await asyncio.sleep(ttft * self.latency_scale)
+        yield LLMStreamChunk(delta=response.content)
+        await asyncio.sleep(max(0.0, item["elapsed"] - ttft) * self.latency_scale)
+        yield LLMStreamChunk(delta="", response=response)
+
+    def _find(
+        self, messages: list[LLMMessage], model: str, temperature: float, max_tokens: int
+    ) -> tuple[dict, LLMResponse]:
+        item, exact = self.cassette.find(
+            "llm", cache_key(model, messages, temperature, max_tokens)
+        )
+        response = LLMResponse(**item["response"])
+        if not exact:
+            # The prompt changed: scale prompt tokens by its change in size.
+            recorded = sum(len(content) for _, content in item["request"]["messages"])
+            if recorded:
+                prompt_tokens = round(response.prompt_tokens * _prompt_chars(messages) / recorded)
+                response.tokens_used += prompt_tokens - response.prompt_tokens
+                response.prompt_tokens = prompt_tokens
+        return item, response
+
+
+class RecordingScraper(Scraper):
+    def __init__(self, writer: CassetteWriter, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = writer
+
+    async def _fetch(self, url: str) -> tuple[str, int]:
+        position = _position("scrape")
+        start = time.monotonic()
+        interaction = {"kind": "scrape", "key": url, **position}
+        try:
+            raw_html, attempts = await super()._fetch(url)
+        except ScraperError as e:
+            interaction.update(error=str(e), elapsed=time.monotonic() - start)
+            self.writer.write(interaction)
+            raise
+        interaction.update(raw_html=raw_html, attempts=attempts, elapsed=time.monotonic() - start)
+        self.writer.write(interaction)
+        return raw_html, attempts
+
+
+class ReplayScraper(Scraper):
+    """Serve recorded pages; extraction still runs, so extraction changes are exercised."""
+
+    def __init__(self, cassette: Cassette, latency_scale: float = 1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+
+    async def _fetch(self, url: str) -> tuple[str, int]:
+        item, _ = self.cassette.find("scrape", url)
+        await asyncio.sleep(item["elapsed"] * self.latency_scale)
+        if "error" in item:
+            raise ScraperError(item["error"])
+        return item["raw_html"], item["attempts"]
+
+
+# Set when SORTING_HAT_CASSETTE_RECORD_PATH is configured; the app then records
+# every LLM call and page fetch to it.
+cassette_recorder = (
+    CassetteWriter(settings.cassette_record_path) if settings.cassette_record_path else None
+)
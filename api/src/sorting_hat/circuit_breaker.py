@@ -0,0 +1,152 @@
+"""Circuit breakers for outbound calls (LLM providers, scraped hosts).
+
+A breaker watches a rolling window of call outcomes. Errors and calls slower
+than `slow_call_seconds` count as failures; once the failure rate crosses the
+threshold the breaker opens and callers fail fast with CircuitOpenError. After
+the cool-down it goes half-open and lets a few probe calls through: a
+successful probe closes it again, a failed one re-opens it.
+"""
+
+import enum
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable
+
+from sorting_hat.config import settings
+
+
+class CircuitState(str, enum.Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open), retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+@dataclass
+class CircuitBreakerConfig:
+    failure_rate: float = 0.5
+    window: int = 20
+    min_calls: int = 10
+    slow_call_seconds: float = 60.0
+    cooldown: float = 30.0
+    half_open_probes: int = 1
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, config: CircuitBreakerConfig | None = None):
+        self.name = name
+        self.config = config or CircuitBreakerConfig()
+        self.state = CircuitState.closed
+        self.outcomes: deque[bool] = deque(maxlen=self.config.window)  # True = failure
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.config.cooldown - time.monotonic())
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go ahead now."""
+        if self.state == CircuitState.open:
+            if self.retry_after() > 0:
+                raise CircuitOpenError(self.name, self.retry_after())
+            self.state = CircuitState.half_open
+            self.probes_in_flight = 0
+        if self.state == CircuitState.half_open:
+            if self.probes_in_flight >= self.config.half_open_probes:
+                raise CircuitOpenError(self.name, self.config.cooldown)
+            self.probes_in_flight += 1
+
+    def record(self, seconds: float, ok: bool) -> None:
+        failed = not ok or seconds > self.config.slow_call_seconds
+        if self.state == CircuitState.half_open:
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+            if failed:
+                self._open()
+            else:
+                self.state = CircuitState.closed
+                self.outcomes.clear()
+            return
+
+        self.outcomes.append(failed)
+        if len(self.outcomes) >= self.config.min_calls:
+            rate = sum(self.outcomes) / len(self.outcomes)
+            if rate >= self.config.failure_rate:
+                self._open()
+
+    def abandon(self) -> None:
+        """The call was cancelled before it finished; count neither way."""
+        if self.state == CircuitState.half_open:
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+
+    def _open(self) -> None:
+        self.state = CircuitState.open
+        self.opened_at = time.monotonic()
+        self.outcomes.clear()
+
+    @asynccontextmanager
+    async def guard(
+        self, is_failure: Callable[[Exception], bool] = lambda e: True
+    ) -> AsyncIterator[None]:
+        """Wrap one call: fail fast when open, record its latency and outcome otherwise.
+
+        `is_failure` decides whether an exception says something about the
+        remote side (a timeout, a 5xx) or only about the request (a 404).
+        """
+        self.before_call()
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.record(time.monotonic() - start, ok=not is_failure(e))
+            raise
+        except BaseException:
+            self.abandon()
+            raise
+        self.record(time.monotonic() - start, ok=True)
+
+
+class CircuitBreakerRegistry:
+    """Breakers created on first use per key (a provider/model pair, a hostname)."""
+
+    def __init__(self, config: CircuitBreakerConfig | None = None):
+        self.config = config or CircuitBreakerConfig()
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key, self.config)
+            self.breakers[key] = breaker
+        return breaker
+
+    def states(self) -> dict[str, str]:
+        return {key: breaker.state.value for key, breaker in self.breakers.items()}
+
+
+def _build_registry(slow_call_seconds: float) -> CircuitBreakerRegistry | None:
+    if not settings.circuit_breakers_enabled:
+        return None
+    return CircuitBreakerRegistry(
+        CircuitBreakerConfig(
+            failure_rate=settings.circuit_failure_rate,
+            window=settings.circuit_window,
+            min_calls=settings.circuit_min_calls,
+            slow_call_seconds=slow_call_seconds,
+            cooldown=settings.circuit_cooldown,
+            half_open_probes=settings.circuit_half_open_probes,
+        )
+    )
+
+
+# Process-wide breakers, so every request sees the same view of a failing
+# provider or host; None when circuit breaking is disabled.
+llm_breakers = _build_registry(settings.llm_slow_call_seconds)
+scraper_breakers = _build_registry(settings.scraper_slow_call_seconds)
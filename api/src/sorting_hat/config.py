@@ -1,15 +1,138 @@
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
 
+class LLMBackendConfig(BaseModel):
+    name: str  # e.g. "openai", "ollama"; also the rate-limit key
+    base_url: str
+    api_key: str = ""
+    model: str | None = None  # model to request on this backend instead of llm_model
+
+
+class LLMProviderConfig(BaseModel):
+    """A named provider that requests can select with ClassifyRequest.provider."""
+
+    base_url: str = ""
+    api_key: str = ""
+    model: str = ""  # default model for requests sent here; falls back to llm_model
+    rpm: int = 0  # rate limits for this provider; 0 = llm_rpm etc.
+    tpm: int = 0
+    max_concurrency: int = 0
+    max_connections: int | None = None  # HTTP pool size; falls back to llm_max_connections
+    # Interchangeable replicas (e.g. several vLLM/Ollama boxes serving the same model);
+    # when set, calls are balanced across these instead of going to base_url.
+    endpoints: list[str] = []
+    balance: str = "least_outstanding"  # or "power_of_two"
+    endpoint_max_concurrency: int = 0  # in-flight calls per endpoint; 0 = unlimited
+
+
 class Settings(BaseSettings):
     database_url: str = "postgresql+asyncpg://localhost:5432/sorting_hat"
     api_prefix: str = "/api/v1"
     debug: bool = False
-    llm_provider: str = "openrouter"  # "openrouter", "openai", "ollama"
+    llm_provider: str = "openrouter"  # "openrouter", "openai", "ollama", or "fake" (no network)
     llm_api_key: str = ""
     llm_base_url: str = "https://openrouter.ai/api/v1"
     llm_model: str = "anthropic/claude-sonnet-4-20250514"
+    # Named providers selectable per request, each with its own pool, limits and
+    # default model. An entry named like llm_provider overrides the three settings
+    # above for the default provider, e.g.
+    # {"ollama": {"base_url": "http://ollama:11434/v1", "model": "llama3.1", "max_concurrency": 4}}
+    llm_providers: dict[str, LLMProviderConfig] = {}
+    # Extra backends to fail over / hedge to, tried in order of measured health
+    # after the primary one above, e.g.
+    # [{"name": "ollama", "base_url": "http://ollama:11434/v1", "model": "llama3.1"}]
+    llm_fallbacks: list[LLMBackendConfig] = []
+    llm_hedge: bool = False
+    llm_hedge_percentile: float = 0.95
+    # Outbound LLM rate limits; 0 = unlimited. Per provider/model overrides are keyed
+    # "provider/model" or "provider", e.g. {"openrouter": {"rpm": 200, "tpm": 400000}}.
+    llm_rpm: int = 0
+    llm_tpm: int = 0
+    llm_max_concurrency: int = 0
+    llm_rate_limits: dict[str, dict[str, int]] = {}
+    llm_rate_limit_retries: int = 2
+    # Health checks for balanced provider endpoints (LLMProviderConfig.endpoints): an
+    # endpoint failing llm_eject_after calls in a row, or GET /models, sits out
+    # llm_eject_seconds.
+    llm_health_check_interval: float = 10.0  # 0 = passive ejection only
+    llm_eject_after: int = 3
+    llm_eject_seconds: float = 30.0
+    # Pooled HTTP client per LLM provider
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 60.0  # seconds an idle connection stays open
+    llm_timeout: float = 600.0
+    # LLM response cache: an in-memory LRU tier, plus a persistent tier when
+    # llm_cache_url is set (the app database URL, or e.g. sqlite+aiosqlite:///llm_cache.db).
+    llm_cache_enabled: bool = False
+    llm_cache_memory_entries: int = 1024
+    llm_cache_memory_ttl: int = 3600  # seconds
+    llm_cache_url: str = ""
+    llm_cache_max_entries: int = 100_000
+    llm_cache_ttl: int = 7 * 86400  # seconds
+    # Circuit breakers per LLM provider/model and per scraped host. A breaker opens
+    # once circuit_failure_rate of its last circuit_window calls (at least
+    # circuit_min_calls) failed or ran past the slow-call threshold, fails fast
+    # with 503 for circuit_cooldown seconds, then lets probe calls through.
+    circuit_breakers_enabled: bool = True
+    circuit_failure_rate: float = 0.5
+    circuit_window: int = 20
+    circuit_min_calls: int = 10
+    circuit_cooldown: float = 30.0
+    circuit_half_open_probes: int = 1
+    llm_slow_call_seconds: float = 120.0
+    scraper_slow_call_seconds: float = 20.0
+    # Batch API for bulk classification (python -m sorting_hat.services.bulk). Empty
+    # values fall back to the interactive llm_* settings; point llm_batch_base_url at
+    # the local stand-in (python -m sorting_hat.llm.batch_server) to run offline.
+    llm_batch_base_url: str = ""
+    llm_batch_api_key: str = ""
+    llm_batch_model: str = ""
+    llm_batch_completion_window: str = "24h"
+    llm_batch_poll_interval: float = 30.0  # seconds
+    llm_batch_timeout: float = 25 * 3600.0  # give up polling a batch after this many seconds
+    # USD per million tokens by model, used for the cost of each LLM call, e.g.
+    # {"openai/gpt-4o-mini": {"prompt": 0.15, "completion": 0.6, "cached": 0.075}}
+    llm_prices: dict[str, dict[str, float]] = {}
+    # Daily (UTC) spend budget per provider API key in USD; 0 = unlimited. Per provider
+    # overrides are keyed by provider name. Once a key's budget is spent, calls use
+    # llm_budget_downgrade_model if set and are rejected with 429 otherwise.
+    llm_daily_budget_usd: float = 0.0
+    llm_daily_budgets: dict[str, float] = {}
+    # Where spend is counted, so every worker process and restart shares one daily
+    # total: the llm_spend table in this database (default: database_url).
+    llm_budget_url: str = ""
+    llm_budget_downgrade_model: str = ""
+    # FakeLLMProvider (llm_provider="fake"): log-normal latency around fake_llm_latency
+    # seconds, deterministic per prompt and seed. For load tests and local development.
+    fake_llm_latency: float = 1.0
+    fake_llm_latency_sigma: float = 0.5
+    fake_llm_seed: int = 0
+    # Token counts it reports: fixed per call, or 0 to estimate from the text.
+    fake_llm_prompt_tokens: int = 0
+    fake_llm_completion_tokens: int = 0
+    fake_llm_chars_per_token: float = 4.0
+    # Taxonomy reads are served from an in-memory snapshot, rebuilt after writes in
+    # this process and at least this often (seconds) to pick up other workers' writes.
+    taxonomy_snapshot_ttl: float = 60.0
+    # Cache-Control for taxonomy GETs, which carry an ETag of the taxonomy content.
+    # "no-cache" lets browsers and Traefik/CDN caches store responses but revalidate
+    # (a cheap 304) each time; raise max-age to let them serve without asking.
+    taxonomy_cache_control: str = "public, no-cache"
+    # Record every LLM call and page fetch to this gzip JSONL cassette, for offline
+    # replay with python -m bench.replay. Empty = off.
+    cassette_record_path: str = ""
     cors_origins: list[str] = ["http://localhost:3000"]
+    scraper_timeout: float = 30.0  # per request
+    # Deadline for a whole fetch, across retries, backoff and Retry-After waits. 0 = none.
+    scraper_total_timeout: float = 45.0
+    scraper_max_attempts: int = 3
+    scraper_backoff_base: float = 0.5  # seconds; doubled per retry, full jitter
+    scraper_backoff_max: float = 8.0
+    scraper_hedge: bool = False
+    scraper_hedge_percentile: float = 0.95  # hedge once a fetch is slower than this
+    scraper_hedge_min_delay: float = 2.0
 
     model_config = {"env_prefix": "SORTING_HAT_", "env_file": ".env"}
 
@@ -1,4 +1,29 @@
-from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse, LLMStreamChunk
+from sorting_hat.llm.balancer import BalancedProvider, Endpoint
+from sorting_hat.llm.batch import BatchLLMProvider, BatchRequest, BatchResult, OpenAIBatchProvider
+from sorting_hat.llm.fake import FakeLLMProvider
 from sorting_hat.llm.openai_compat import OpenAICompatProvider
+from sorting_hat.llm.rate_limit import RateLimiter, RateLimits
+from sorting_hat.llm.registry import NamedProvider, ProviderRegistry
+from sorting_hat.llm.routing import Backend, RoutingProvider
 
-__all__ = ["LLMMessage", "LLMProvider", "LLMResponse", "OpenAICompatProvider"]
+__all__ = [
+    "Backend",
+    "BalancedProvider",
+    "BatchLLMProvider",
+    "BatchRequest",
+    "BatchResult",
+    "Endpoint",
+    "FakeLLMProvider",
+    "LLMMessage",
+    "LLMProvider",
+    "LLMResponse",
+    "LLMStreamChunk",
+    "NamedProvider",
+    "OpenAIBatchProvider",
+    "OpenAICompatProvider",
+    "ProviderRegistry",
+    "RateLimiter",
+    "RateLimits",
+    "RoutingProvider",
+]
@@ -0,0 +1,202 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable
+
+from sorting_hat.llm.circuit_breaker import is_provider_failure
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse, LLMStreamChunk
+
+HealthCheck = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class Endpoint:
+    """One replica of a model server behind a BalancedProvider."""
+
+    name: str  # e.g. the base URL, reported in LLMResponse.backend
+    provider: LLMProvider
+    max_concurrency: int = 0  # 0 = unlimited
+    health_check: HealthCheck | None = None  # raises when the endpoint is unhealthy
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    served: int = field(default=0, repr=False)
+
+    def healthy(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def has_capacity(self) -> bool:
+        return not self.max_concurrency or self.outstanding < self.max_concurrency
+
+
+class BalancedProvider(LLMProvider):
+    """Spread calls across interchangeable endpoints, e.g. several vLLM or Ollama boxes.
+
+    `strategy` is "least_outstanding" (fewest in-flight calls wins) or
+    "power_of_two" (pick two at random, take the less busy one). Endpoints
+    that fail `eject_after` calls in a row, or fail a health check, are left
+    out for `eject_seconds`; if every endpoint is ejected, all are tried
+    again rather than failing outright. A call waits for a free slot when
+    every healthy endpoint is at its concurrency limit. Failures that are not
+    the endpoint's fault (e.g. a 400) are raised without trying another endpoint.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        strategy: str = "least_outstanding",
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+        health_check_interval: float = 10.0,  # 0 = no active health checks
+        retries: int = 1,
+    ):
+        if not endpoints:
+            raise ValueError("BalancedProvider needs at least one endpoint")
+        if strategy not in ("least_outstanding", "power_of_two"):
+            raise ValueError(f"Unknown balancing strategy '{strategy}'")
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.health_check_interval = health_check_interval
+        self.retries = retries
+        self._slot_freed = asyncio.Condition()
+        self._health_task: asyncio.Task | None = None
+
+    async def complete(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> LLMResponse:
+        tried: set[str] = set()
+        while True:
+            endpoint = await self._acquire(tried)
+            try:
+                response = await endpoint.provider.complete(
+                    messages, model, temperature, max_tokens
+                )
+            except Exception as e:
+                self._record_failure(endpoint, e)
+                tried.add(endpoint.name)
+                # A bad request fails the same way everywhere: don't retry it.
+                if not is_provider_failure(e) or len(tried) > self.retries:
+                    raise
+                continue
+            finally:
+                await self._release(endpoint)
+            self._record_success(endpoint)
+            response.backend = response.backend or endpoint.name
+            return response
+
+    async def complete_stream(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        # Retry on another endpoint only while nothing has been yielded yet.
+        tried: set[str] = set()
+        while True:
+            endpoint = await self._acquire(tried)
+            started = False
+            try:
+                async for chunk in endpoint.provider.complete_stream(
+                    messages, model, temperature, max_tokens
+                ):
+                    started = True
+                    if chunk.response and not chunk.response.backend:
+                        chunk.response.backend = endpoint.name
+                    yield chunk
+            except Exception as e:
+                self._record_failure(endpoint, e)
+                tried.add(endpoint.name)
+                if started or not is_provider_failure(e) or len(tried) > self.retries:
+                    raise
+                continue
+            finally:
+                await self._release(endpoint)
+            self._record_success(endpoint)
+            return
+
+    def pick(self, exclude: set[str] = frozenset()) -> Endpoint | None:
+        """The endpoint the next call should go to, or None if all are at their limit."""
+        now = time.monotonic()
+        candidates = [e for e in self.endpoints if e.healthy(now) and e.name not in exclude]
+        if not candidates:
+            # Everything is ejected (or already tried): better to try than to fail outright.
+            candidates = [e for e in self.endpoints if e.name not in exclude] or self.endpoints
+        candidates = [e for e in candidates if e.has_capacity()]
+        if not candidates:
+            return None
+        if self.strategy == "power_of_two" and len(candidates) > 2:
+            candidates = random.sample(candidates, 2)
+        least = min(e.outstanding for e in candidates)
+        # Random tie-break so idle endpoints share load instead of the first taking it all.
+        return random.choice([e for e in candidates if e.outstanding == least])
+
+    async def _acquire(self, exclude: set[str]) -> Endpoint:
+        self._ensure_health_checks()
+        async with self._slot_freed:
+            while (endpoint := self.pick(exclude)) is None:
+                try:
+                    await asyncio.wait_for(self._slot_freed.wait(), self._until_readmission())
+                except TimeoutError:
+                    pass  # an ejection ran out: that endpoint may be free
+            endpoint.outstanding += 1
+            return endpoint
+
+    async def _release(self, endpoint: Endpoint) -> None:
+        async with self._slot_freed:
+            endpoint.outstanding -= 1
+            # Wake every waiter: the first one woken may have excluded this endpoint.
+            self._slot_freed.notify_all()
+
+    def _until_readmission(self) -> float | None:
+        """Seconds until the next ejected endpoint is readmitted, None if none is ejected."""
+        now = time.monotonic()
+        waits = [e.ejected_until - now for e in self.endpoints if e.ejected_until > now]
+        return min(waits) if waits else None
+
+    def _record_success(self, endpoint: Endpoint) -> None:
+        endpoint.consecutive_failures = 0
+        endpoint.served += 1
+
+    def _record_failure(self, endpoint: Endpoint, error: Exception) -> None:
+        if not is_provider_failure(error):
+            return
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.eject_after:
+            endpoint.ejected_until = time.monotonic() + self.eject_seconds
+
+    def _ensure_health_checks(self) -> None:
+        if self._health_task is not None or not self.health_check_interval:
+            return
+        if any(e.health_check for e in self.endpoints):
+            self._health_task = asyncio.create_task(self._run_health_checks())
+
+    async def _run_health_checks(self) -> None:
+        while True:
+            await asyncio.gather(*(self.check(e) for e in self.endpoints if e.health_check))
+            await asyncio.sleep(self.health_check_interval)
+
+    async def check(self, endpoint: Endpoint) -> None:
+        """Eject the endpoint if its health check fails; readmit it once it passes."""
+        try:
+            await endpoint.health_check()
+        except Exception:
+            endpoint.ejected_until = time.monotonic() + self.eject_seconds
+            return
+        if endpoint.ejected_until:
+            endpoint.consecutive_failures = 0
+            async with self._slot_freed:
+                endpoint.ejected_until = 0.0
+                self._slot_freed.notify_all()
+
+    async def aclose(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
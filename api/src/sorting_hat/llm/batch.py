@@ -0,0 +1,175 @@
+import asyncio
+import json
+import time
+from abc import abstractmethod
+from dataclasses import dataclass
+
+import httpx
+
+from sorting_hat.llm.openai_compat import OpenAICompatProvider
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse
+
+# Batch statuses after which no more output will appear.
+_FINISHED = {"completed", "failed", "expired", "cancelled"}
+
+# How long complete_batch polls by default: a 24h completion window plus slack
+# for the provider to mark the batch expired.
+DEFAULT_BATCH_TIMEOUT = 25 * 3600.0
+
+
+class BatchError(Exception):
+    pass
+
+
+@dataclass
+class BatchRequest:
+    custom_id: str  # echoed back with the result, unique within one batch
+    messages: list[LLMMessage]
+    model: str
+    temperature: float = 0.0
+    max_tokens: int = 4096
+
+
+@dataclass
+class BatchResult:
+    custom_id: str
+    response: LLMResponse | None = None
+    error: str = ""  # set when this request failed; the rest of the batch may still succeed
+
+
+def to_jsonl(requests: list[BatchRequest]) -> bytes:
+    """Serialize requests as an OpenAI Batch API input file."""
+    lines = [
+        json.dumps(
+            {
+                "custom_id": r.custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": r.model,
+                    "messages": [{"role": m.role, "content": m.content} for m in r.messages],
+                    "temperature": r.temperature,
+                    "max_tokens": r.max_tokens,
+                },
+            }
+        )
+        for r in requests
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def parse_output(text: str) -> dict[str, BatchResult]:
+    """Parse an OpenAI Batch API output (or error) file, keyed by custom_id."""
+    results = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        custom_id = item["custom_id"]
+        response = item.get("response") or {}
+        body = response.get("body") or {}
+        if item.get("error"):
+            error = item["error"].get("message") or str(item["error"])
+            results[custom_id] = BatchResult(custom_id, error=error)
+        elif response.get("status_code") != 200:
+            status = response.get("status_code")
+            error = (body.get("error") or {}).get("message") or f"HTTP {status}"
+            results[custom_id] = BatchResult(custom_id, error=error)
+        else:
+            usage = body.get("usage") or {}
+            details = usage.get("prompt_tokens_details") or {}
+            results[custom_id] = BatchResult(
+                custom_id,
+                response=LLMResponse(
+                    content=body["choices"][0]["message"].get("content") or "",
+                    model=body.get("model", ""),
+                    tokens_used=usage.get("total_tokens", 0),
+                    prompt_tokens=usage.get("prompt_tokens", 0),
+                    completion_tokens=usage.get("completion_tokens", 0),
+                    cached_tokens=details.get("cached_tokens") or 0,
+                    backend="batch",
+                ),
+            )
+    return results
+
+
+class BatchLLMProvider(LLMProvider):
+    """A provider that can also run many completions as one asynchronous batch job.
+
+    Batches trade latency (minutes to hours) for a lower price and separate,
+    higher throughput limits, which suits overnight bulk classification.
+    """
+
+    @abstractmethod
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        """Start a batch job and return its ID."""
+
+    @abstractmethod
+    async def batch_results(self, batch_id: str) -> dict[str, BatchResult] | None:
+        """Results keyed by custom_id once the job has finished, None while it is still running."""
+
+    async def complete_batch(
+        self,
+        requests: list[BatchRequest],
+        poll_interval: float = 30.0,
+        timeout: float | None = DEFAULT_BATCH_TIMEOUT,
+    ) -> dict[str, BatchResult]:
+        """Submit `requests` as one job and poll until it finishes (or `timeout` passes)."""
+        if not requests:
+            return {}
+        batch_id = await self.submit_batch(requests)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while (results := await self.batch_results(batch_id)) is None:
+            if deadline is not None and time.monotonic() > deadline:
+                raise BatchError(f"Batch {batch_id} did not finish within {timeout:.0f}s")
+            await asyncio.sleep(poll_interval)
+        # Requests the provider silently dropped still get an entry.
+        for request in requests:
+            results.setdefault(
+                request.custom_id, BatchResult(request.custom_id, error="missing from batch output")
+            )
+        return results
+
+
+class OpenAIBatchProvider(OpenAICompatProvider, BatchLLMProvider):
+    """OpenAI-compatible provider with the Batch API (`/files` + `/batches`).
+
+    Batch jobs bypass the interactive rate limiter: providers meter them
+    against a separate queue.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str | None = None,
+        name: str = "openai",
+        completion_window: str = "24h",
+        http_client: httpx.AsyncClient | None = None,
+    ):
+        super().__init__(api_key=api_key, base_url=base_url, name=name, http_client=http_client)
+        self.completion_window = completion_window
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        input_file = await self.client.files.create(
+            file=("batch.jsonl", to_jsonl(requests)), purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    async def batch_results(self, batch_id: str) -> dict[str, BatchResult] | None:
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status not in _FINISHED:
+            return None
+        if batch.status != "completed" and not batch.output_file_id:
+            raise BatchError(f"Batch {batch_id} {batch.status}")
+
+        results: dict[str, BatchResult] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = await self.client.files.content(file_id)
+                results.update(parse_output(content.text))
+        return results
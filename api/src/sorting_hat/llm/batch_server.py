@@ -0,0 +1,250 @@
+"""A local, file-based stand-in for the OpenAI Batch API.
+
+Implements just enough of `/v1/files` and `/v1/batches` for
+OpenAIBatchProvider: uploaded files and batch records are kept as files under
+a storage directory, and each batch is worked through in the background by
+sending its requests to an ordinary LLMProvider. Useful for testing the bulk
+path offline and for running bulk jobs against providers without a batch API:
+
+    python -m sorting_hat.llm.batch_server --dir .batches --port 8010
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+from uuid import uuid4
+
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from sorting_hat.llm.provider import LLMMessage, LLMProvider
+
+# IDs become file names, so only the shapes this server hands out are accepted.
+_FILE_ID = re.compile(r"file-[0-9a-f]{32}")
+_BATCH_ID = re.compile(r"batch_[0-9a-f]{32}")
+
+
+class BatchCreate(BaseModel):
+    input_file_id: str
+    endpoint: str
+    completion_window: str = "24h"
+    metadata: dict[str, str] | None = None
+
+
+def create_batch_app(storage_dir: Path, provider: LLMProvider, concurrency: int = 4) -> FastAPI:
+    files_dir = storage_dir / "files"
+    batches_dir = storage_dir / "batches"
+    files_dir.mkdir(parents=True, exist_ok=True)
+    batches_dir.mkdir(parents=True, exist_ok=True)
+    app = FastAPI(title="Sorting Hat batch stand-in")
+    # Keep references so running batches are not garbage collected.
+    app.state.tasks = set()
+
+    def file_path(file_id: str, suffix: str) -> Path:
+        if not _FILE_ID.fullmatch(file_id):
+            raise HTTPException(status_code=404, detail=f"{file_id} not found")
+        return files_dir / f"{file_id}{suffix}"
+
+    def batch_path(batch_id: str) -> Path:
+        if not _BATCH_ID.fullmatch(batch_id):
+            raise HTTPException(status_code=404, detail=f"{batch_id} not found")
+        return batches_dir / f"{batch_id}.json"
+
+    def read_json(path: Path) -> dict:
+        if not path.exists():
+            raise HTTPException(status_code=404, detail=f"{path.stem} not found")
+        return json.loads(path.read_text())
+
+    def save_file(content: bytes, filename: str, purpose: str) -> dict:
+        file_id = f"file-{uuid4().hex}"
+        (files_dir / f"{file_id}.jsonl").write_bytes(content)
+        meta = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        (files_dir / f"{file_id}.json").write_text(json.dumps(meta))
+        return meta
+
+    def save_batch(batch: dict) -> None:
+        batch_path(batch["id"]).write_text(json.dumps(batch))
+
+    async def run_one(line: str, semaphore: asyncio.Semaphore) -> tuple[bool, dict]:
+        item = {}
+        try:
+            item = json.loads(line)
+            body = item["body"]
+            custom_id = item["custom_id"]
+            messages = [LLMMessage(role=m["role"], content=m["content"]) for m in body["messages"]]
+            model = body["model"]
+        except (ValueError, TypeError, KeyError) as e:
+            # Like the real Batch API: the line fails on its own, the batch carries on.
+            custom_id = item.get("custom_id") if isinstance(item, dict) else None
+            return False, {
+                "id": f"batch_req_{uuid4().hex}",
+                "custom_id": custom_id,
+                "response": None,
+                "error": {"code": "invalid_request", "message": f"Malformed request line: {e!r}"},
+            }
+        async with semaphore:
+            try:
+                response = await provider.complete(
+                    messages,
+                    model=model,
+                    temperature=body.get("temperature", 0.0),
+                    max_tokens=body.get("max_tokens", 4096),
+                )
+            except Exception as e:
+                error = {"message": str(e), "type": type(e).__name__}
+                return False, {
+                    "id": f"batch_req_{uuid4().hex}",
+                    "custom_id": custom_id,
+                    "response": {"status_code": 500, "body": {"error": error}},
+                    "error": None,
+                }
+        return True, {
+            "id": f"batch_req_{uuid4().hex}",
+            "custom_id": custom_id,
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "object": "chat.completion",
+                    "model": response.model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": response.content},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": response.prompt_tokens,
+                        "completion_tokens": response.completion_tokens,
+                        "total_tokens": response.tokens_used,
+                        "prompt_tokens_details": {"cached_tokens": response.cached_tokens},
+                    },
+                },
+            },
+            "error": None,
+        }
+
+    async def run_batch(batch: dict) -> None:
+        try:
+            await process_batch(batch)
+        except Exception as e:
+            # Never leave a batch in_progress forever: pollers would wait on it indefinitely.
+            batch.update(
+                status="failed",
+                failed_at=int(time.time()),
+                errors={"object": "list", "data": [{"code": "server_error", "message": str(e)}]},
+            )
+            save_batch(batch)
+
+    async def process_batch(batch: dict) -> None:
+        lines = file_path(batch["input_file_id"], ".jsonl").read_text().splitlines()
+        lines = [line for line in lines if line.strip()]
+        batch.update(status="in_progress", in_progress_at=int(time.time()))
+        batch["request_counts"]["total"] = len(lines)
+        save_batch(batch)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        outcomes = await asyncio.gather(*(run_one(line, semaphore) for line in lines))
+        succeeded = [item for ok, item in outcomes if ok]
+        failed = [item for ok, item in outcomes if not ok]
+
+        batch.update(status="finalizing", finalizing_at=int(time.time()))
+        if succeeded:
+            batch["output_file_id"] = save_file(
+                "".join(json.dumps(item) + "\n" for item in succeeded).encode(),
+                f"{batch['id']}_output.jsonl",
+                "batch_output",
+            )["id"]
+        if failed:
+            batch["error_file_id"] = save_file(
+                "".join(json.dumps(item) + "\n" for item in failed).encode(),
+                f"{batch['id']}_error.jsonl",
+                "batch_output",
+            )["id"]
+        batch["request_counts"].update(completed=len(succeeded), failed=len(failed))
+        batch.update(status="completed", completed_at=int(time.time()))
+        save_batch(batch)
+
+    @app.post("/v1/files")
+    async def upload_file(file: UploadFile = File(...), purpose: str = Form(...)):
+        return save_file(await file.read(), file.filename or "upload.jsonl", purpose)
+
+    @app.get("/v1/files/{file_id}")
+    async def get_file(file_id: str):
+        return read_json(file_path(file_id, ".json"))
+
+    @app.get("/v1/files/{file_id}/content")
+    async def get_file_content(file_id: str):
+        read_json(file_path(file_id, ".json"))
+        content = file_path(file_id, ".jsonl").read_bytes()
+        return Response(content=content, media_type="application/jsonl")
+
+    @app.post("/v1/batches")
+    async def create_batch(data: BatchCreate):
+        read_json(file_path(data.input_file_id, ".json"))
+        if data.endpoint != "/v1/chat/completions":
+            raise HTTPException(status_code=400, detail="Only /v1/chat/completions is supported")
+        batch = {
+            "id": f"batch_{uuid4().hex}",
+            "object": "batch",
+            "endpoint": data.endpoint,
+            "input_file_id": data.input_file_id,
+            "completion_window": data.completion_window,
+            "status": "validating",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": data.metadata,
+        }
+        save_batch(batch)
+        task = asyncio.create_task(run_batch(dict(batch)))
+        app.state.tasks.add(task)
+        task.add_done_callback(app.state.tasks.discard)
+        return batch
+
+    @app.get("/v1/batches/{batch_id}")
+    async def get_batch(batch_id: str):
+        return read_json(batch_path(batch_id))
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    from sorting_hat.config import settings
+    from sorting_hat.llm.openai_compat import OpenAICompatProvider
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", type=Path, default=Path(".batches"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    # Requests are answered by the configured interactive provider.
+    provider = OpenAICompatProvider(
+        api_key=settings.llm_api_key,
+        base_url=settings.llm_base_url or None,
+        name=settings.llm_provider,
+    )
+    uvicorn.run(
+        create_batch_app(args.dir, provider, args.concurrency), host=args.host, port=args.port
+    )
+
+
+if __name__ == "__main__":
+    main()
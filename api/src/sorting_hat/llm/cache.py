@@ -0,0 +1,300 @@
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterator
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from sorting_hat.config import settings
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse, LLMStreamChunk
+from sorting_hat.models.llm_cache import LLMCacheEntry
+
+logger = logging.getLogger(__name__)
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_cache() -> Iterator[None]:
+    """Skip cache reads for LLM calls made inside this block (fresh responses are still stored)."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_key(
+    model: str, messages: list[LLMMessage], temperature: float, max_tokens: int
+) -> str:
+    messages_hash = hashlib.sha256(
+        json.dumps([[m.role, m.content] for m in messages]).encode()
+    ).hexdigest()
+    raw = json.dumps([model, messages_hash, temperature, max_tokens])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class CacheBackend(ABC):
+    name: str
+
+    @abstractmethod
+    async def get(self, key: str) -> LLMResponse | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, response: LLMResponse) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU tier with per-entry TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, LLMResponse]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> LLMResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    async def set(self, key: str, response: LLMResponse) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLCacheBackend(CacheBackend):
+    """Persistent tier in Postgres (the app database) or SQLite (a local file)."""
+
+    name = "sql"
+
+    # Expired and over-limit rows are trimmed every this many writes.
+    EVICT_EVERY = 100
+
+    def __init__(self, engine: AsyncEngine, max_entries: int = 100_000, ttl: float = 7 * 86400):
+        self.engine = engine
+        self.session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._writes = 0
+
+    async def create_table(self) -> None:
+        async with self.engine.begin() as conn:
+            await conn.run_sync(LLMCacheEntry.__table__.create, checkfirst=True)
+
+    async def get(self, key: str) -> LLMResponse | None:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(LLMCacheEntry.response).where(
+                    LLMCacheEntry.key == key,
+                    LLMCacheEntry.expires_at > datetime.now(timezone.utc),
+                )
+            )
+            raw = result.scalar_one_or_none()
+        return LLMResponse(**json.loads(raw)) if raw else None
+
+    async def set(self, key: str, response: LLMResponse) -> None:
+        now = datetime.now(timezone.utc)
+        async with self.session_factory() as session:
+            await session.merge(
+                LLMCacheEntry(
+                    key=key,
+                    model=response.model,
+                    response=json.dumps(asdict(response)),
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl),
+                )
+            )
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                await self._evict(session, now)
+            await session.commit()
+
+    async def _evict(self, session: AsyncSession, now: datetime) -> None:
+        await session.execute(delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= now))
+        overflow = (
+            select(LLMCacheEntry.key)
+            .order_by(LLMCacheEntry.created_at.desc())
+            .offset(self.max_entries)
+            .scalar_subquery()
+        )
+        await session.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(overflow)))
+
+
+@dataclass
+class CacheStats:
+    hits: dict[str, int] = field(default_factory=dict)  # per tier
+    misses: int = 0
+    bypassed: int = 0
+    errors: dict[str, int] = field(default_factory=dict)  # per tier
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": sum(self.hits.values()),
+            "hits_by_tier": dict(self.hits),
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "errors_by_tier": dict(self.errors),
+        }
+
+
+class LLMCache:
+    """Ordered cache tiers (fastest first) plus shared hit/miss counters.
+
+    A failing tier (e.g. the cache table is unreachable) is logged and skipped,
+    so a cache outage degrades to cache misses instead of failed completions.
+    """
+
+    def __init__(self, backends: list[CacheBackend]):
+        self.backends = backends
+        self.stats = CacheStats()
+
+    async def setup(self) -> None:
+        for backend in self.backends:
+            if isinstance(backend, SQLCacheBackend):
+                await backend.create_table()
+
+    async def get(self, key: str) -> LLMResponse | None:
+        for i, backend in enumerate(self.backends):
+            try:
+                response = await backend.get(key)
+            except Exception:
+                self._failed(backend, "read")
+                continue
+            if response is not None:
+                self.stats.hits[backend.name] = self.stats.hits.get(backend.name, 0) + 1
+                # Promote into the faster tiers that missed.
+                for faster in self.backends[:i]:
+                    await self._set(faster, key, response)
+                return response
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, response: LLMResponse) -> None:
+        for backend in self.backends:
+            await self._set(backend, key, response)
+
+    async def _set(self, backend: CacheBackend, key: str, response: LLMResponse) -> None:
+        try:
+            await backend.set(key, response)
+        except Exception:
+            self._failed(backend, "write")
+
+    def _failed(self, backend: CacheBackend, operation: str) -> None:
+        self.stats.errors[backend.name] = self.stats.errors.get(backend.name, 0) + 1
+        logger.warning("LLM cache %s failed on the %s tier", operation, backend.name, exc_info=True)
+
+
+class CachingProvider(LLMProvider):
+    """Serve repeated deterministic completions (temperature 0) from the cache."""
+
+    def __init__(self, inner: LLMProvider, cache: LLMCache, cache_sampled: bool = False):
+        self.inner = inner
+        self.cache = cache
+        # Responses drawn at temperature > 0 are samples; only cache them on request.
+        self.cache_sampled = cache_sampled
+
+    async def complete(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> LLMResponse:
+        if temperature > 0 and not self.cache_sampled:
+            return await self.inner.complete(messages, model, temperature, max_tokens)
+
+        key = cache_key(model, messages, temperature, max_tokens)
+        cached = await self._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = await self.inner.complete(messages, model, temperature, max_tokens)
+        await self.cache.set(key, response)
+        return response
+
+    async def complete_stream(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        if temperature > 0 and not self.cache_sampled:
+            async for chunk in self.inner.complete_stream(messages, model, temperature, max_tokens):
+                yield chunk
+            return
+
+        key = cache_key(model, messages, temperature, max_tokens)
+        cached = await self._lookup(key)
+        if cached is not None:
+            yield LLMStreamChunk(delta=cached.content, response=cached)
+            return
+
+        # Pass the stream through as it arrives; store it once it has finished.
+        parts: list[str] = []
+        async for chunk in self.inner.complete_stream(messages, model, temperature, max_tokens):
+            parts.append(chunk.delta)
+            if chunk.response:
+                await self.cache.set(key, replace(chunk.response, content="".join(parts)))
+            yield chunk
+
+    async def _lookup(self, key: str) -> LLMResponse | None:
+        if _bypass.get():
+            self.cache.stats.bypassed += 1
+            return None
+        cached = await self.cache.get(key)
+        if cached is None:
+            return None
+        # No provider call was made, so nothing was spent.
+        return replace(cached, cached=True, cost_usd=0.0)
+
+
+def _build_llm_cache() -> LLMCache | None:
+    if not settings.llm_cache_enabled:
+        return None
+    backends: list[CacheBackend] = [
+        MemoryCacheBackend(
+            max_entries=settings.llm_cache_memory_entries, ttl=settings.llm_cache_memory_ttl
+        )
+    ]
+    if settings.llm_cache_url:
+        backends.append(
+            SQLCacheBackend(
+                create_async_engine(settings.llm_cache_url),
+                max_entries=settings.llm_cache_max_entries,
+                ttl=settings.llm_cache_ttl,
+            )
+        )
+    return LLMCache(backends)
+
+
+# Process-wide cache shared by every request; None when caching is disabled.
+llm_cache = _build_llm_cache()
@@ -0,0 +1,45 @@
+from typing import AsyncIterator
+
+from openai import APIStatusError
+
+from sorting_hat.circuit_breaker import CircuitBreakerRegistry
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse, LLMStreamChunk
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """Timeouts, connection errors, 5xx and 429 count against the provider; other 4xx do not."""
+    if isinstance(error, APIStatusError):
+        return error.status_code >= 500 or error.status_code in (408, 429)
+    return True
+
+
+class CircuitBreakerProvider(LLMProvider):
+    """Fail fast with CircuitOpenError while a provider/model pair is unhealthy."""
+
+    def __init__(self, inner: LLMProvider, breakers: CircuitBreakerRegistry, name: str):
+        self.inner = inner
+        self.breakers = breakers
+        self.name = name
+
+    async def complete(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> LLMResponse:
+        async with self.breakers.get(f"{self.name}/{model}").guard(is_provider_failure):
+            return await self.inner.complete(messages, model, temperature, max_tokens)
+
+    async def complete_stream(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        async with self.breakers.get(f"{self.name}/{model}").guard(is_provider_failure):
+            async for chunk in self.inner.complete_stream(
+                messages, model, temperature, max_tokens
+            ):
+                yield chunk
@@ -0,0 +1,215 @@
+import hashlib
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from sorting_hat.config import settings
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse, LLMStreamChunk
+from sorting_hat.models.llm_spend import LLMSpend
+
+
+@dataclass
+class ModelPrice:
+    """USD per million tokens."""
+
+    prompt: float = 0.0
+    completion: float = 0.0
+    cached: float | None = None  # cached prompt tokens; defaults to the prompt price
+
+
+class PriceTable:
+    def __init__(self, prices: dict[str, ModelPrice] | None = None):
+        self.prices = prices or {}
+
+    def cost(self, response: LLMResponse, requested_model: str = "") -> float:
+        """Cost of a response in USD; 0 for models without a configured price."""
+        # Providers often answer with a dated variant of the requested model name.
+        price = self.prices.get(response.model) or self.prices.get(requested_model)
+        if price is None:
+            return 0.0
+        cached_price = price.prompt if price.cached is None else price.cached
+        uncached = max(0, response.prompt_tokens - response.cached_tokens)
+        return (
+            uncached * price.prompt
+            + response.cached_tokens * cached_price
+            + response.completion_tokens * price.completion
+        ) / 1_000_000
+
+
+class BudgetExceededError(Exception):
+    def __init__(self, key: str, budget: float, retry_after: float):
+        super().__init__(f"Daily LLM budget of ${budget:.2f} for {key} is spent")
+        self.key = key
+        self.budget = budget
+        self.retry_after = retry_after
+
+
+def _today() -> datetime:
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class SpendBudget:
+    """Spend per API key per UTC day, kept in process memory.
+
+    Each worker process counts (and restarts) on its own, so this only suits
+    tests and single-process runs; SQLSpendBudget shares one count.
+    Limits are looked up by provider name, falling back to the default; 0 means unlimited.
+    """
+
+    def __init__(self, default: float = 0.0, overrides: dict[str, float] | None = None):
+        self.default = default
+        self.overrides = overrides or {}
+        self._day = _today()
+        self._spent: dict[str, float] = {}
+
+    def limit_for(self, provider: str) -> float:
+        return self.overrides.get(provider, self.default)
+
+    async def spent(self, key: str) -> float:
+        self._roll_over()
+        return self._spent.get(key, 0.0)
+
+    async def record(self, key: str, usd: float) -> None:
+        self._roll_over()
+        self._spent[key] = self._spent.get(key, 0.0) + usd
+
+    async def exceeded(self, key: str, provider: str) -> bool:
+        limit = self.limit_for(provider)
+        return limit > 0 and await self.spent(key) >= limit
+
+    def seconds_until_reset(self) -> float:
+        return (self._day + timedelta(days=1) - datetime.now(timezone.utc)).total_seconds()
+
+    def _roll_over(self) -> None:
+        today = _today()
+        if today != self._day:
+            self._day = today
+            self._spent.clear()
+
+
+class SQLSpendBudget(SpendBudget):
+    """Spend kept in the llm_spend table (one row per day and key), incremented atomically,
+    so the daily limit holds across worker processes and restarts."""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        default: float = 0.0,
+        overrides: dict[str, float] | None = None,
+    ):
+        super().__init__(default, overrides)
+        self.session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        self._insert = sqlite.insert if engine.dialect.name == "sqlite" else postgresql.insert
+
+    async def spent(self, key: str) -> float:
+        self._roll_over()
+        async with self.session_factory() as session:
+            spent = await session.scalar(
+                select(LLMSpend.spent_usd).where(
+                    LLMSpend.day == self._day.date(), LLMSpend.key == key
+                )
+            )
+        return spent or 0.0
+
+    async def record(self, key: str, usd: float) -> None:
+        if usd <= 0:
+            return
+        self._roll_over()
+        stmt = self._insert(LLMSpend).values(day=self._day.date(), key=key, spent_usd=usd)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LLMSpend.day, LLMSpend.key],
+            set_={"spent_usd": LLMSpend.spent_usd + stmt.excluded.spent_usd},
+        )
+        async with self.session_factory() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Short, non-reversible label for an API key, safe to show in errors and logs."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:8]
+
+
+class CostTrackingProvider(LLMProvider):
+    """Price every response and enforce the daily budget of the provider's API key.
+
+    Once the key's budget is spent, calls go to `downgrade_model` when one is
+    set and are rejected with BudgetExceededError otherwise.
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        prices: PriceTable,
+        budget: SpendBudget | None = None,
+        name: str = "",
+        api_key: str = "",
+        downgrade_model: str = "",
+    ):
+        self.inner = inner
+        self.prices = prices
+        self.budget = budget
+        self.name = name
+        self.key = f"{name}:{key_fingerprint(api_key)}"
+        self.downgrade_model = downgrade_model
+
+    async def complete(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> LLMResponse:
+        model = await self._model_for(model)
+        response = await self.inner.complete(messages, model, temperature, max_tokens)
+        return await self._account(response, model)
+
+    async def complete_stream(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        model = await self._model_for(model)
+        async for chunk in self.inner.complete_stream(messages, model, temperature, max_tokens):
+            if chunk.response:
+                chunk = replace(chunk, response=await self._account(chunk.response, model))
+            yield chunk
+
+    async def _model_for(self, model: str) -> str:
+        if self.budget is None or not await self.budget.exceeded(self.key, self.name):
+            return model
+        if self.downgrade_model:
+            return self.downgrade_model
+        raise BudgetExceededError(
+            self.key, self.budget.limit_for(self.name), self.budget.seconds_until_reset()
+        )
+
+    async def _account(self, response: LLMResponse, model: str) -> LLMResponse:
+        cost = self.prices.cost(response, model)
+        if self.budget is not None:
+            await self.budget.record(self.key, cost)
+        return replace(response, cost_usd=cost)
+
+
+def _build_spend_budget() -> SpendBudget:
+    if not settings.llm_daily_budget_usd and not any(settings.llm_daily_budgets.values()):
+        # No limits to enforce: nothing needs a shared count.
+        return SpendBudget()
+    return SQLSpendBudget(
+        create_async_engine(settings.llm_budget_url or settings.database_url),
+        default=settings.llm_daily_budget_usd,
+        overrides=settings.llm_daily_budgets,
+    )
+
+
+# Process-wide price table and budget shared by every provider.
+price_table = PriceTable(
+    {model: ModelPrice(**price) for model, price in settings.llm_prices.items()}
+)
+spend_budget = _build_spend_budget()
@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse, LLMStreamChunk
+from sorting_hat.llm.rate_limit import (
+    CHARS_PER_TOKEN,
+    RateLimiter,
+    RateLimitLease,
+    estimate_tokens,
+)
+
+# Taxonomy lines in the classify prompt look like "- [<uuid>] Name: definition".
+_TAXONOMY_LINE = re.compile(r"\[([0-9a-f-]{36})\] ([^:\n]+)")
+
+
+class FakeLLMProvider(LLMProvider):
+    """Deterministic stand-in for a real provider, for load tests and local development.
+
+    Latency is drawn from a log-normal distribution around `latency` seconds and
+    streamed over `chunks` deltas. Classify prompts get valid JSON that picks
+    nodes from the taxonomy in the prompt; anything else gets a canned summary.
+    The same messages always produce the same response and latency for a given seed.
+    With a rate limiter, calls are admitted under `name` like a real provider's.
+    Token counts are estimated from the text at `chars_per_token`, unless
+    `prompt_tokens` / `completion_tokens` fix them (0 = estimate).
+    """
+
+    def __init__(
+        self,
+        latency: float = 1.0,
+        latency_sigma: float = 0.5,
+        time_to_first_token: float = 0.3,  # fraction of the latency before the first chunk
+        chunks: int = 8,
+        seed: int = 0,
+        model: str = "fake",
+        name: str = "fake",
+        rate_limiter: RateLimiter | None = None,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        chars_per_token: float = CHARS_PER_TOKEN,
+    ):
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.time_to_first_token = time_to_first_token
+        self.chunks = max(1, chunks)
+        self.seed = seed
+        self.model = model
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.chars_per_token = chars_per_token
+
+    async def complete(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> LLMResponse:
+        async with self._admit(messages, model, max_tokens) as lease:
+            rng = self._rng(messages)
+            await asyncio.sleep(self._latency(rng))
+            response = self._respond(messages, rng)
+            if lease:
+                lease.record_usage(response.tokens_used)
+            return response
+
+    async def complete_stream(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        async with self._admit(messages, model, max_tokens) as lease:
+            rng = self._rng(messages)
+            latency = self._latency(rng)
+            response = self._respond(messages, rng)
+            content = response.content
+            size = math.ceil(len(content) / self.chunks) or 1
+
+            await asyncio.sleep(latency * self.time_to_first_token)
+            gap = latency * (1 - self.time_to_first_token) / self.chunks
+            for start in range(0, len(content), size):
+                yield LLMStreamChunk(delta=content[start : start + size])
+                await asyncio.sleep(gap)
+            if lease:
+                lease.record_usage(response.tokens_used)
+            yield LLMStreamChunk(delta="", response=response)
+
+    @asynccontextmanager
+    async def _admit(
+        self, messages: list[LLMMessage], model: str, max_tokens: int
+    ) -> AsyncIterator[RateLimitLease | None]:
+        if self.rate_limiter is None:
+            yield None
+            return
+        estimate = estimate_tokens(messages, max_tokens)
+        async with self.rate_limiter.acquire(self.name, model, estimate) as lease:
+            yield lease
+
+    def _rng(self, messages: list[LLMMessage]) -> random.Random:
+        digest = hashlib.sha256(
+            json.dumps([self.seed, [[m.role, m.content] for m in messages]]).encode()
+        ).digest()
+        return random.Random(digest)
+
+    def _latency(self, rng: random.Random) -> float:
+        if self.latency <= 0:
+            return 0.0
+        return rng.lognormvariate(math.log(self.latency), self.latency_sigma)
+
+    def _respond(self, messages: list[LLMMessage], rng: random.Random) -> LLMResponse:
+        prompt = "\n".join(m.content for m in messages)
+        nodes = _TAXONOMY_LINE.findall(messages[-1].content) if messages else []
+        content = self._classify(nodes, rng) if nodes else self._summarize(prompt)
+        prompt_tokens = self.prompt_tokens or int(len(prompt) / self.chars_per_token)
+        completion_tokens = self.completion_tokens or int(len(content) / self.chars_per_token)
+        return LLMResponse(
+            content=content,
+            model=self.model,
+            tokens_used=prompt_tokens + completion_tokens,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            backend="fake",
+        )
+
+    def _summarize(self, prompt: str) -> str:
+        words = prompt.split()[-40:]
+        return (
+            "This product is an enterprise software platform. Based on its public page it "
+            f"offers: {' '.join(words)}"
+        )
+
+    def _classify(self, nodes: list[tuple[str, str]], rng: random.Random) -> str:
+        picked = rng.sample(nodes, k=min(3, len(nodes)))
+        primary, secondaries = picked[0], picked[1:]
+        return json.dumps(
+            {
+                "primary": {
+                    "node_id": primary[0],
+                    "node_path": primary[1].strip(),
+                    "reasoning": "Fake classification for load testing.",
+                },
+                "secondaries": [
+                    {"node_id": node_id, "node_path": name.strip(), "reasoning": "Related."}
+                    for node_id, name in secondaries
+                ],
+                "confidence": round(rng.uniform(0.5, 0.99), 2),
+            },
+            indent=2,
+        )
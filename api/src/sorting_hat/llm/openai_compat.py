@@ -1,11 +1,52 @@
-from openai import AsyncOpenAI
+from typing import AsyncIterator, Mapping
 
-from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse
+import httpx
+from openai import AsyncOpenAI, RateLimitError
+from openai.types import CompletionUsage
+
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse, LLMStreamChunk
+from sorting_hat.llm.rate_limit import (
+    RateLimiter,
+    RateLimitLease,
+    estimate_tokens,
+    parse_reset,
+)
+
+# Used when a 429 arrives without a usable Retry-After header.
+DEFAULT_RATE_LIMIT_PAUSE = 1.0
+
+
+def usage_fields(usage: CompletionUsage | None) -> dict[str, int]:
+    """LLMResponse token counts from an OpenAI usage block."""
+    if usage is None:
+        return {"tokens_used": 0}
+    details = usage.prompt_tokens_details
+    return {
+        "tokens_used": usage.total_tokens,
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "cached_tokens": (details.cached_tokens or 0) if details else 0,
+    }
 
 
 class OpenAICompatProvider(LLMProvider):
-    def __init__(self, api_key: str, base_url: str | None = None):
-        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str | None = None,
+        name: str = "openai",
+        rate_limiter: RateLimiter | None = None,
+        rate_limit_retries: int = 2,
+        http_client: httpx.AsyncClient | None = None,
+    ):
+        # No SDK-level retries: every attempt, including a retried 429, goes back
+        # through the rate limiter (see rate_limit_retries).
+        self.client = AsyncOpenAI(
+            api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0
+        )
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.rate_limit_retries = rate_limit_retries
 
     async def complete(
         self,
@@ -14,16 +55,126 @@ class OpenAICompatProvider(LLMProvider):
         temperature: float = 0.0,
         max_tokens: int = 4096,
     ) -> LLMResponse:
-        response = await self.client.chat.completions.create(
+        if self.rate_limiter is None:
+            response, _ = await self._create(messages, model, temperature, max_tokens)
+            return response
+
+        estimate = estimate_tokens(messages, max_tokens)
+        attempt = 0
+        while True:
+            async with self.rate_limiter.acquire(self.name, model, estimate) as lease:
+                try:
+                    response, headers = await self._create(
+                        messages, model, temperature, max_tokens
+                    )
+                except RateLimitError as e:
+                    headers = e.response.headers
+                    lease.update_from_headers(headers)
+                    lease.pause(
+                        parse_reset(headers.get("retry-after")) or DEFAULT_RATE_LIMIT_PAUSE
+                    )
+                    if attempt >= self.rate_limit_retries:
+                        raise
+                    attempt += 1
+                    continue
+                lease.update_from_headers(headers)
+                lease.record_usage(response.tokens_used)
+                return response
+
+    async def complete_stream(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        if self.rate_limiter is None:
+            async for chunk in self._stream(messages, model, temperature, max_tokens):
+                yield chunk
+            return
+
+        estimate = estimate_tokens(messages, max_tokens)
+        attempt = 0
+        while True:
+            started = False
+            async with self.rate_limiter.acquire(self.name, model, estimate) as lease:
+                try:
+                    async for chunk in self._stream(
+                        messages, model, temperature, max_tokens, lease
+                    ):
+                        started = True
+                        yield chunk
+                    return
+                except RateLimitError as e:
+                    headers = e.response.headers
+                    lease.update_from_headers(headers)
+                    lease.pause(
+                        parse_reset(headers.get("retry-after")) or DEFAULT_RATE_LIMIT_PAUSE
+                    )
+                    # Once text has reached the caller a retry would repeat it.
+                    if started or attempt >= self.rate_limit_retries:
+                        raise
+                    attempt += 1
+
+    async def _stream(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        lease: RateLimitLease | None = None,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        stream = await self.client.chat.completions.create(
+            model=model,
+            messages=[{"role": m.role, "content": m.content} for m in messages],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        if lease:
+            lease.update_from_headers(stream.response.headers)
+
+        parts: list[str] = []
+        response_model = model
+        usage = None
+        async for event in stream:
+            response_model = event.model or response_model
+            if event.usage:
+                usage = event.usage
+            if event.choices and event.choices[0].delta.content:
+                delta = event.choices[0].delta.content
+                parts.append(delta)
+                yield LLMStreamChunk(delta=delta)
+
+        counts = usage_fields(usage)
+        if lease:
+            lease.record_usage(counts["tokens_used"])
+        yield LLMStreamChunk(
+            delta="",
+            response=LLMResponse(content="".join(parts), model=response_model, **counts),
+        )
+
+    async def _create(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> tuple[LLMResponse, Mapping[str, str]]:
+        raw = await self.client.chat.completions.with_raw_response.create(
             model=model,
             messages=[{"role": m.role, "content": m.content} for m in messages],
             temperature=temperature,
             max_tokens=max_tokens,
         )
+        response = raw.parse()
         choice = response.choices[0]
-        tokens = response.usage.total_tokens if response.usage else 0
-        return LLMResponse(
-            content=choice.message.content or "",
-            model=response.model,
-            tokens_used=tokens,
+        return (
+            LLMResponse(
+                content=choice.message.content or "",
+                model=response.model,
+                **usage_fields(response.usage),
+            ),
+            raw.headers,
         )
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from typing import AsyncIterator
 
 
 @dataclass
@@ -13,6 +14,18 @@ class LLMResponse:
     content: str
     model: str
     tokens_used: int
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0  # prompt tokens served from the provider's prompt cache
+    cost_usd: float = 0.0  # from the configured price table; 0 for unpriced models
+    cached: bool = False  # served from the response cache, no provider call made
+    backend: str = ""  # which backend served the call, when routed across several
+
+
+@dataclass
+class LLMStreamChunk:
+    delta: str
+    response: LLMResponse | None = None  # set on the final chunk only
 
 
 class LLMProvider(ABC):
@@ -25,3 +38,17 @@ class LLMProvider(ABC):
         max_tokens: int = 4096,
     ) -> LLMResponse:
         pass
+
+    async def complete_stream(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Yield the completion as it is generated; the last chunk carries the full response.
+
+        Providers that cannot stream fall back to a single chunk from `complete`.
+        """
+        response = await self.complete(messages, model, temperature, max_tokens)
+        yield LLMStreamChunk(delta=response.content, response=response)
@@ -0,0 +1,233 @@
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Mapping
+
+from sorting_hat.config import LLMProviderConfig, settings
+from sorting_hat.llm.provider import LLMMessage
+
+# Rough chars-per-token ratio for English prose; good enough to reserve budget
+# before a request is sent, and reconciled against real usage afterwards.
+CHARS_PER_TOKEN = 4
+TOKENS_PER_MESSAGE = 4
+
+
+def estimate_tokens(messages: list[LLMMessage], max_tokens: int = 0) -> int:
+    """Estimate the tokens a request counts against a TPM budget (prompt + max completion)."""
+    prompt = sum(len(m.content) // CHARS_PER_TOKEN + TOKENS_PER_MESSAGE for m in messages)
+    return prompt + max_tokens
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: str | None) -> float | None:
+    """Parse an `x-ratelimit-reset-*` value ("1s", "6m0s", "20ms", "0.5") into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+@dataclass
+class RateLimits:
+    rpm: int = 0  # requests per minute; 0 = unlimited
+    tpm: int = 0  # tokens per minute; 0 = unlimited
+    max_concurrency: int = 0  # in-flight requests; 0 = unlimited
+
+
+class _TokenBucket:
+    """Continuously refilling bucket holding up to one minute of budget."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def sync(self, remaining: float) -> None:
+        """Never believe we have more budget left than the provider says we do."""
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+
+
+@dataclass
+class _Bucket:
+    limits: RateLimits
+    requests: _TokenBucket | None = None
+    tokens: _TokenBucket | None = None
+    concurrency: asyncio.Semaphore | None = None
+    turnstile: asyncio.Lock = field(default_factory=asyncio.Lock)
+    blocked_until: float = 0.0
+
+    def __post_init__(self):
+        if self.limits.rpm > 0:
+            self.requests = _TokenBucket(self.limits.rpm)
+        if self.limits.tpm > 0:
+            self.tokens = _TokenBucket(self.limits.tpm)
+        if self.limits.max_concurrency > 0:
+            self.concurrency = asyncio.Semaphore(self.limits.max_concurrency)
+
+    def wait_time(self, estimated_tokens: int) -> float:
+        wait = self.blocked_until - time.monotonic()
+        if self.requests:
+            wait = max(wait, self.requests.wait_time(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_time(estimated_tokens))
+        return wait
+
+
+class RateLimitLease:
+    """Handed to the caller for one request so it can report what actually happened."""
+
+    def __init__(self, bucket: _Bucket, estimated_tokens: int):
+        self._bucket = bucket
+        self.estimated_tokens = estimated_tokens
+
+    def record_usage(self, tokens_used: int) -> None:
+        """Reconcile the TPM bucket with the real token count once the response is in."""
+        if self._bucket.tokens and tokens_used:
+            difference = self.estimated_tokens - tokens_used
+            if difference > 0:
+                self._bucket.tokens.give_back(difference)
+            else:
+                self._bucket.tokens.take(-difference)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Adapt to `x-ratelimit-*` headers returned by OpenAI-compatible providers."""
+        for kind, bucket in (
+            ("requests", self._bucket.requests),
+            ("tokens", self._bucket.tokens),
+        ):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                remaining_value = float(remaining)
+            except ValueError:
+                continue
+            if bucket:
+                bucket.sync(remaining_value)
+            if remaining_value <= 0:
+                reset = parse_reset(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self.pause(reset)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for this provider/model, e.g. after a 429 Retry-After."""
+        until = time.monotonic() + seconds
+        self._bucket.blocked_until = max(self._bucket.blocked_until, until)
+
+
+class RateLimiter:
+    """Async RPM/TPM/concurrency limiter keyed by (provider, model).
+
+    Callers are admitted in arrival order: each one holds the bucket's
+    turnstile lock (FIFO in asyncio) until its budget is available, so a
+    large request cannot be starved by a stream of small ones.
+    """
+
+    def __init__(
+        self,
+        default: RateLimits | None = None,
+        overrides: Mapping[str, RateLimits] | None = None,
+    ):
+        self.default = default or RateLimits()
+        # Keys are "provider/model" or just "provider".
+        self.overrides = dict(overrides or {})
+        self._buckets: dict[tuple[str, str], _Bucket] = {}
+
+    def limits_for(self, provider: str, model: str) -> RateLimits:
+        return (
+            self.overrides.get(f"{provider}/{model}")
+            or self.overrides.get(provider)
+            or self.default
+        )
+
+    def _bucket(self, provider: str, model: str) -> _Bucket:
+        key = (provider, model)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(self.limits_for(provider, model))
+            self._buckets[key] = bucket
+        return bucket
+
+    @asynccontextmanager
+    async def acquire(
+        self, provider: str, model: str, estimated_tokens: int = 0
+    ) -> AsyncIterator[RateLimitLease]:
+        bucket = self._bucket(provider, model)
+        async with bucket.turnstile:
+            while (wait := bucket.wait_time(estimated_tokens)) > 0:
+                await asyncio.sleep(wait)
+            if bucket.requests:
+                bucket.requests.take(1)
+            if bucket.tokens:
+                bucket.tokens.take(estimated_tokens)
+
+        if bucket.concurrency:
+            await bucket.concurrency.acquire()
+        try:
+            yield RateLimitLease(bucket, estimated_tokens)
+        finally:
+            if bucket.concurrency:
+                bucket.concurrency.release()
+
+
+def provider_limits(provider: LLMProviderConfig) -> RateLimits:
+    """A named provider's limits; each one it leaves at 0 falls back to llm_rpm etc."""
+    return RateLimits(
+        rpm=provider.rpm or settings.llm_rpm,
+        tpm=provider.tpm or settings.llm_tpm,
+        max_concurrency=provider.max_concurrency or settings.llm_max_concurrency,
+    )
+
+
+# Process-wide limiter shared by the HTTP routes and any background workers, so
+# every caller draws from the same provider budget.
+rate_limiter = RateLimiter(
+    default=RateLimits(
+        rpm=settings.llm_rpm,
+        tpm=settings.llm_tpm,
+        max_concurrency=settings.llm_max_concurrency,
+    ),
+    overrides={
+        # Limits set on a named provider, unless llm_rate_limits configures it explicitly.
+        **{
+            name: provider_limits(p)
+            for name, p in settings.llm_providers.items()
+            if p.rpm or p.tpm or p.max_concurrency
+        },
+        **{key: RateLimits(**limits) for key, limits in settings.llm_rate_limits.items()},
+    },
+)
@@ -0,0 +1,191 @@
+from dataclasses import dataclass
+
+import httpx
+
+from sorting_hat.circuit_breaker import CircuitBreakerRegistry
+from sorting_hat.llm.balancer import BalancedProvider, Endpoint
+from sorting_hat.llm.cache import CachingProvider, LLMCache
+from sorting_hat.llm.circuit_breaker import CircuitBreakerProvider
+from sorting_hat.llm.cost import CostTrackingProvider, PriceTable, SpendBudget
+from sorting_hat.llm.fake import FakeLLMProvider
+from sorting_hat.llm.openai_compat import OpenAICompatProvider
+from sorting_hat.llm.provider import LLMProvider
+from sorting_hat.llm.rate_limit import RateLimiter
+
+
+@dataclass
+class NamedProvider:
+    provider: LLMProvider
+    model: str  # used when a request does not ask for a specific model
+
+
+class ProviderRegistry:
+    """Long-lived LLM providers keyed by (provider name, base URL).
+
+    Each provider owns one pooled HTTP client, so requests reuse warm TLS
+    connections instead of opening a fresh pool per classification. Create
+    it once at startup and close it on shutdown.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter | None = None,
+        cache: LLMCache | None = None,
+        breakers: CircuitBreakerRegistry | None = None,
+        prices: PriceTable | None = None,
+        budget: SpendBudget | None = None,
+        budget_downgrade_model: str = "",
+        rate_limit_retries: int = 2,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 600.0,
+        health_check_interval: float = 10.0,
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+    ):
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.breakers = breakers
+        self.prices = prices or PriceTable()
+        self.budget = budget
+        self.budget_downgrade_model = budget_downgrade_model
+        self.rate_limit_retries = rate_limit_retries
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self._providers: dict[tuple[str, str | None], LLMProvider] = {}
+        self._clients: list[httpx.AsyncClient] = []
+        self._balancers: list[BalancedProvider] = []
+
+    def get(
+        self,
+        name: str,
+        api_key: str,
+        base_url: str | None = None,
+        max_connections: int | None = None,
+    ) -> LLMProvider:
+        key = (name, base_url)
+        provider = self._providers.get(key)
+        if provider is None:
+            provider = self._build(name, api_key, base_url, max_connections)
+            self._providers[key] = provider
+        return provider
+
+    def get_fake(self, name: str = "fake", **options) -> LLMProvider:
+        """The fake provider behind the same limiter and wrappers as a real one, so load
+        tests exercise them. `options` are passed to FakeLLMProvider."""
+        key = (name, None)
+        provider = self._providers.get(key)
+        if provider is None:
+            fake = FakeLLMProvider(name=name, rate_limiter=self.rate_limiter, **options)
+            provider = self._wrap(fake, name, api_key="")
+            self._providers[key] = provider
+        return provider
+
+    def get_balanced(
+        self,
+        name: str,
+        api_key: str,
+        base_urls: list[str],
+        strategy: str = "least_outstanding",
+        endpoint_max_concurrency: int = 0,
+        max_connections: int | None = None,
+    ) -> LLMProvider:
+        """One provider spreading calls across interchangeable endpoints (see BalancedProvider)."""
+        key = (name, " ".join(base_urls))
+        provider = self._providers.get(key)
+        if provider is None:
+            health_client = self._client(max_connections=len(base_urls))
+            balancer = BalancedProvider(
+                [
+                    Endpoint(
+                        name=base_url,
+                        provider=self._openai(name, api_key, base_url, max_connections),
+                        max_concurrency=endpoint_max_concurrency,
+                        health_check=_models_check(health_client, base_url, api_key),
+                    )
+                    for base_url in base_urls
+                ],
+                strategy=strategy,
+                eject_after=self.eject_after,
+                eject_seconds=self.eject_seconds,
+                health_check_interval=self.health_check_interval,
+            )
+            self._balancers.append(balancer)
+            provider = self._wrap(balancer, name, api_key)
+            self._providers[key] = provider
+        return provider
+
+    def _client(self, max_connections: int | None = None) -> httpx.AsyncClient:
+        limits = self.limits
+        if max_connections is not None:
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=min(
+                    max_connections, self.limits.max_keepalive_connections
+                ),
+                keepalive_expiry=self.limits.keepalive_expiry,
+            )
+        http_client = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+        self._clients.append(http_client)
+        return http_client
+
+    def _openai(
+        self, name: str, api_key: str, base_url: str | None, max_connections: int | None
+    ) -> OpenAICompatProvider:
+        return OpenAICompatProvider(
+            api_key=api_key,
+            base_url=base_url,
+            name=name,
+            rate_limiter=self.rate_limiter,
+            rate_limit_retries=self.rate_limit_retries,
+            http_client=self._client(max_connections),
+        )
+
+    def _build(
+        self, name: str, api_key: str, base_url: str | None, max_connections: int | None
+    ) -> LLMProvider:
+        return self._wrap(self._openai(name, api_key, base_url, max_connections), name, api_key)
+
+    def _wrap(self, provider: LLMProvider, name: str, api_key: str) -> LLMProvider:
+        if self.breakers is not None:
+            provider = CircuitBreakerProvider(provider, self.breakers, name)
+        provider = CostTrackingProvider(
+            provider,
+            self.prices,
+            self.budget,
+            name=name,
+            api_key=api_key,
+            downgrade_model=self.budget_downgrade_model,
+        )
+        # Cache outermost: hits are served even while the provider's circuit is open.
+        if self.cache is not None:
+            provider = CachingProvider(provider, self.cache)
+        return provider
+
+    async def aclose(self) -> None:
+        for balancer in self._balancers:
+            await balancer.aclose()
+        self._balancers.clear()
+        for client in self._clients:
+            await client.aclose()
+        self._clients.clear()
+        self._providers.clear()
+
+
+def _models_check(client: httpx.AsyncClient, base_url: str, api_key: str):
+    """Health check for an OpenAI-compatible server: GET /models must succeed."""
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    async def check() -> None:
+        response = await client.get(f"{base_url.rstrip('/')}/models", headers=headers, timeout=5.0)
+        response.raise_for_status()
+
+    return check
@@ -0,0 +1,272 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass, field, replace
+from typing import AsyncIterator
+
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse, LLMStreamChunk
+
+
+def _percentile(samples: deque[float], p: float, min_samples: int) -> float | None:
+    if len(samples) < min_samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+@dataclass
+class BackendStats:
+    """Moving latency and error rate for one backend (exponentially weighted).
+
+    The error rate also decays with time since the last call, so a backend
+    that failed and then lost all its traffic is tried, and re-measured, again.
+    """
+
+    alpha: float = 0.2
+    error_half_life: float = 30.0  # seconds
+    # Score of a backend that has only ever failed, at an error rate of 1.
+    unmeasured_penalty: float = 60.0
+    latency: float | None = None  # seconds, successful calls only
+    error_rate: float = 0.0
+    updated_at: float | None = None  # monotonic time of the last recorded call
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=200))
+    first_token_samples: deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    def record(self, seconds: float, ok: bool, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        error_rate = self.current_error_rate(now)
+        self.error_rate = (1 - self.alpha) * error_rate + self.alpha * (0.0 if ok else 1.0)
+        self.updated_at = now
+        if ok:
+            self.samples.append(seconds)
+            if self.latency is None:
+                self.latency = seconds
+            else:
+                self.latency = (1 - self.alpha) * self.latency + self.alpha * seconds
+
+    def current_error_rate(self, now: float | None = None) -> float:
+        if self.updated_at is None:
+            return self.error_rate
+        elapsed = (time.monotonic() if now is None else now) - self.updated_at
+        return self.error_rate * 0.5 ** (max(0.0, elapsed) / self.error_half_life)
+
+    def record_first_token(self, seconds: float) -> None:
+        self.first_token_samples.append(seconds)
+
+    def percentile(self, p: float, min_samples: int = 20) -> float | None:
+        return _percentile(self.samples, p, min_samples)
+
+    def first_token_percentile(self, p: float, min_samples: int = 20) -> float | None:
+        return _percentile(self.first_token_samples, p, min_samples)
+
+    def score(self, now: float | None = None) -> float:
+        """Lower is healthier. Untried backends score 0 so they get a chance to be measured."""
+        error_rate = self.current_error_rate(now)
+        if self.latency is None:
+            # Never succeeded: ranked by its (decaying) errors alone, always finite.
+            return self.unmeasured_penalty * error_rate
+        # A backend failing half its calls looks ~10x slower than its raw latency.
+        return self.latency * (1 + 20 * error_rate)
+
+
+@dataclass
+class Backend:
+    name: str
+    provider: LLMProvider
+    model: str | None = None  # model to request from this backend instead of the caller's
+    stats: BackendStats = field(default_factory=BackendStats)
+
+
+class _StreamAttempt:
+    """One backend's stream, its first chunk fetched in a task so attempts can race for it."""
+
+    def __init__(self, backend: Backend, stream: AsyncIterator[LLMStreamChunk]):
+        self.backend = backend
+        self.stream = stream
+        self.start = time.monotonic()
+        self.first = asyncio.create_task(self._first_chunk())
+
+    async def _first_chunk(self) -> LLMStreamChunk:
+        try:
+            chunk = await anext(self.stream)
+        except Exception:
+            self.backend.stats.record(time.monotonic() - self.start, ok=False)
+            raise
+        self.backend.stats.record_first_token(time.monotonic() - self.start)
+        return chunk
+
+    async def chunks(self) -> AsyncIterator[LLMStreamChunk]:
+        """The whole stream, starting with the first chunk."""
+        try:
+            yield self._tag(self.first.result())
+            async for chunk in self.stream:
+                yield self._tag(chunk)
+        except Exception:
+            self.backend.stats.record(time.monotonic() - self.start, ok=False)
+            raise
+        finally:
+            await self.stream.aclose()
+
+    def _tag(self, chunk: LLMStreamChunk) -> LLMStreamChunk:
+        if not chunk.response:
+            return chunk
+        self.backend.stats.record(time.monotonic() - self.start, ok=True)
+        return replace(chunk, response=replace(chunk.response, backend=self.backend.name))
+
+    async def cancel(self) -> None:
+        self.first.cancel()
+        await asyncio.wait({self.first})
+        await self.stream.aclose()
+
+
+class RoutingProvider(LLMProvider):
+    """Send each call to the healthiest of several backends, failing over in order of health.
+
+    With hedging enabled, a second backend is tried in parallel once the first
+    has taken longer than its own p-th percentile latency (for streams: time to
+    first token); the first success wins and the other call is cancelled.
+    The backend that served a call is reported in `LLMResponse.backend`.
+    """
+
+    def __init__(
+        self,
+        backends: list[Backend],
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+    ):
+        if not backends:
+            raise ValueError("RoutingProvider needs at least one backend")
+        self.backends = backends
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+
+    def ranked(self) -> list[Backend]:
+        # Stable sort keeps configuration order as the tie-breaker.
+        return sorted(self.backends, key=lambda b: b.stats.score())
+
+    async def complete(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> LLMResponse:
+        candidates = self.ranked()
+        last_error: Exception | None = None
+        while candidates:
+            backend = candidates.pop(0)
+            call = asyncio.create_task(
+                self._call(backend, messages, model, temperature, max_tokens)
+            )
+            delay = backend.stats.percentile(self.hedge_percentile) if self.hedge else None
+            if delay is None or not candidates:
+                pending = {call}
+            else:
+                done, _ = await asyncio.wait({call}, timeout=delay)
+                pending = {call}
+                if not done:
+                    hedge = candidates.pop(0)
+                    pending.add(
+                        asyncio.create_task(
+                            self._call(hedge, messages, model, temperature, max_tokens)
+                        )
+                    )
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        if task.exception() is None:
+                            return task.result()
+                        last_error = task.exception()
+            finally:
+                for task in pending:
+                    task.cancel()
+        raise last_error
+
+    async def complete_stream(
+        self,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        # Hedged on time to first token; once a backend has yielded, the stream is
+        # committed to it and can no longer fail over.
+        candidates = self.ranked()
+        last_error: Exception | None = None
+        while candidates:
+            attempts = [self._open(candidates.pop(0), messages, model, temperature, max_tokens)]
+            delay = (
+                attempts[0].backend.stats.first_token_percentile(self.hedge_percentile)
+                if self.hedge and candidates
+                else None
+            )
+            winner: _StreamAttempt | None = None
+            try:
+                if delay is not None:
+                    done, _ = await asyncio.wait({attempts[0].first}, timeout=delay)
+                    if not done:
+                        attempts.append(
+                            self._open(candidates.pop(0), messages, model, temperature, max_tokens)
+                        )
+                pending = {attempt.first for attempt in attempts}
+                while pending and winner is None:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for attempt in attempts:
+                        if attempt.first not in done:
+                            continue
+                        if attempt.first.exception() is not None:
+                            last_error = attempt.first.exception()
+                        elif winner is None:
+                            winner = attempt
+            finally:
+                for attempt in attempts:
+                    if attempt is not winner:
+                        await attempt.cancel()
+            if winner is not None:
+                async with aclosing(winner.chunks()) as chunks:
+                    async for chunk in chunks:
+                        yield chunk
+                return
+        raise last_error
+
+    def _open(
+        self,
+        backend: Backend,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> _StreamAttempt:
+        return _StreamAttempt(
+            backend,
+            backend.provider.complete_stream(
+                messages, backend.model or model, temperature, max_tokens
+            ),
+        )
+
+    async def _call(
+        self,
+        backend: Backend,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> LLMResponse:
+        start = time.monotonic()
+        try:
+            response = await backend.provider.complete(
+                messages, backend.model or model, temperature, max_tokens
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            backend.stats.record(time.monotonic() - start, ok=False)
+            raise
+        backend.stats.record(time.monotonic() - start, ok=True)
+        return replace(response, backend=backend.name)
@@ -3,13 +3,117 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from sorting_hat.config import settings
-from sorting_hat.routes import taxonomy_router, classification_router
+from sorting_hat.cassette import RecordingProvider, cassette_recorder
+from sorting_hat.circuit_breaker import llm_breakers
+from sorting_hat.config import LLMProviderConfig, settings
+from sorting_hat.llm.cache import llm_cache
+from sorting_hat.llm.cost import price_table, spend_budget
+from sorting_hat.llm.rate_limit import rate_limiter
+from sorting_hat.llm.provider import LLMProvider
+from sorting_hat.llm.registry import NamedProvider, ProviderRegistry
+from sorting_hat.llm.routing import Backend, RoutingProvider
+from sorting_hat.pagination import NEXT_CURSOR_HEADER
+from sorting_hat.routes import taxonomy_router, classification_router, llm_router
+
+
+def _default_config() -> LLMProviderConfig:
+    return settings.llm_providers.get(settings.llm_provider) or LLMProviderConfig(
+        base_url=settings.llm_base_url, api_key=settings.llm_api_key, model=settings.llm_model
+    )
+
+
+def _get_provider(registry: ProviderRegistry, name: str, config: LLMProviderConfig) -> LLMProvider:
+    if name == "fake":
+        return registry.get_fake(
+            name,
+            latency=settings.fake_llm_latency,
+            latency_sigma=settings.fake_llm_latency_sigma,
+            seed=settings.fake_llm_seed,
+            prompt_tokens=settings.fake_llm_prompt_tokens,
+            completion_tokens=settings.fake_llm_completion_tokens,
+            chars_per_token=settings.fake_llm_chars_per_token,
+        )
+    if config.endpoints:
+        return registry.get_balanced(
+            name,
+            api_key=config.api_key,
+            base_urls=config.endpoints,
+            strategy=config.balance,
+            endpoint_max_concurrency=config.endpoint_max_concurrency,
+            max_connections=config.max_connections,
+        )
+    return registry.get(
+        name,
+        api_key=config.api_key,
+        base_url=config.base_url or None,
+        max_connections=config.max_connections,
+    )
+
+
+def build_llm_provider(registry: ProviderRegistry) -> LLMProvider:
+    """The default provider, routed across the fallback backends when any are set."""
+    primary = _get_provider(registry, settings.llm_provider, _default_config())
+    if not settings.llm_fallbacks:
+        return primary
+    backends = [Backend(name=settings.llm_provider, provider=primary)]
+    for fallback in settings.llm_fallbacks:
+        backends.append(
+            Backend(
+                name=fallback.name,
+                provider=registry.get(
+                    fallback.name, api_key=fallback.api_key, base_url=fallback.base_url
+                ),
+                model=fallback.model,
+            )
+        )
+    return RoutingProvider(
+        backends, hedge=settings.llm_hedge, hedge_percentile=settings.llm_hedge_percentile
+    )
+
+
+def build_llm_providers(registry: ProviderRegistry) -> dict[str, NamedProvider]:
+    """Every provider a request can select by name; the default one is always present."""
+    providers = {
+        settings.llm_provider: NamedProvider(
+            build_llm_provider(registry), _default_config().model or settings.llm_model
+        )
+    }
+    for name, config in settings.llm_providers.items():
+        if name not in providers:
+            providers[name] = NamedProvider(
+                _get_provider(registry, name, config), config.model or settings.llm_model
+            )
+    if cassette_recorder is not None:
+        for named in providers.values():
+            named.provider = RecordingProvider(named.provider, cassette_recorder)
+    return providers
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if llm_cache is not None:
+        await llm_cache.setup()
+    app.state.llm_registry = ProviderRegistry(
+        rate_limiter=rate_limiter,
+        cache=llm_cache,
+        breakers=llm_breakers,
+        prices=price_table,
+        budget=spend_budget,
+        budget_downgrade_model=settings.llm_budget_downgrade_model,
+        rate_limit_retries=settings.llm_rate_limit_retries,
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry,
+        timeout=settings.llm_timeout,
+        health_check_interval=settings.llm_health_check_interval,
+        eject_after=settings.llm_eject_after,
+        eject_seconds=settings.llm_eject_seconds,
+    )
+    app.state.llm_providers = build_llm_providers(app.state.llm_registry)
     yield
+    await app.state.llm_registry.aclose()
+    if cassette_recorder is not None:
+        cassette_recorder.close()
 
 
 tags_metadata = [
@@ -25,6 +129,11 @@ tags_metadata = [
         "to read the page, summarize the product, and classify it into the taxonomy. "
         "Supports retrieving past classifications with full audit trails.",
     },
+    {
+        "name": "llm",
+        "description": "Operational status of the LLM layer, such as response cache hit rates "
+        "and circuit breaker states.",
+    },
 ]
 
 app = FastAPI(
@@ -52,10 +161,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", NEXT_CURSOR_HEADER],
 )
 
 app.include_router(taxonomy_router, prefix=settings.api_prefix)
 app.include_router(classification_router, prefix=settings.api_prefix)
+app.include_router(llm_router, prefix=settings.api_prefix)
 
 
 @app.get("/api/health")
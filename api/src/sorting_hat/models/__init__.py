@@ -1,5 +1,7 @@
 from sorting_hat.models.taxonomy import Base, Branch, GovernanceGroup, TaxonomyNode
 from sorting_hat.models.classification import Classification, ClassificationStep, StepType
+from sorting_hat.models.llm_cache import LLMCacheEntry
+from sorting_hat.models.llm_spend import LLMSpend
 
 __all__ = [
     "Base",
@@ -9,4 +11,6 @@ __all__ = [
     "Classification",
     "ClassificationStep",
     "StepType",
+    "LLMCacheEntry",
+    "LLMSpend",
 ]
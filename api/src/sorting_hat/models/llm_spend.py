@@ -0,0 +1,16 @@
+from datetime import date
+
+from sqlalchemy import Date, Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from sorting_hat.models.taxonomy import Base
+
+
+class LLMSpend(Base):
+    """USD spent per provider API key per UTC day, shared by every worker process."""
+
+    __tablename__ = "llm_spend"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    key: Mapped[str] = mapped_column(String(200), primary_key=True)  # provider:key fingerprint
+    spent_usd: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
@@ -0,0 +1,39 @@
+from sqlalchemy import Boolean, cast
+from sqlalchemy.types import UserDefinedType
+
+
+class Ltree(UserDefinedType):
+    """Postgres ltree (materialized label path such as 'software.data_analytics.etl').
+
+    Values are plain strings. Bound parameters are cast to ltree so comparisons
+    and inserts type-check, and the comparator exposes the operators the GiST
+    index on taxonomy_nodes.path can serve.
+    """
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "LTREE"
+
+    def bind_expression(self, bindvalue):
+        return cast(bindvalue, self)
+
+    class comparator_factory(UserDefinedType.Comparator):
+        def descendant_of(self, other):
+            """`path <@ other`: at or below other (includes other itself)."""
+            return self.op("<@", return_type=Boolean)(other)
+
+        def ancestor_of(self, other):
+            """`path @> other`: at or above other (includes other itself)."""
+            return self.op("@>", return_type=Boolean)(other)
+
+        def lquery(self, pattern: str):
+            """`path ~ pattern`, e.g. 'software.data_analytics.*{0,2}'."""
+            return self.op("~", return_type=Boolean)(cast(pattern, LQuery()))
+
+
+class LQuery(UserDefinedType):
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "LQUERY"
@@ -4,6 +4,7 @@ from uuid import uuid4
 
 from sqlalchemy import (
     Boolean,
+    Computed,
     DateTime,
     Enum,
     ForeignKey,
@@ -12,9 +13,11 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+from sorting_hat.models.ltree import Ltree
+
 
 class Base(DeclarativeBase):
     pass
@@ -50,6 +53,17 @@ class GovernanceGroup(Base):
     nodes: Mapped[list["TaxonomyNode"]] = relationship(back_populates="governance_group")
 
 
+# Search document for ranked full-text search: name outranks definitions, which
+# outrank inclusions/exclusions. Kept in step with migration 009a.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(definition, '') || ' ' || "
+    "coalesce(distinguishing_characteristics, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(inclusions, '') || ' ' || "
+    "coalesce(exclusions, '')), 'C')"
+)
+
+
 class TaxonomyNode(Base):
     __tablename__ = "taxonomy_nodes"
     __table_args__ = (UniqueConstraint("parent_id", "slug", name="uq_node_parent_slug"),)
@@ -63,7 +77,7 @@ class TaxonomyNode(Base):
     parent_id: Mapped[str | None] = mapped_column(
         UUID(as_uuid=False), ForeignKey("taxonomy_nodes.id"), nullable=True
     )
-    path: Mapped[str] = mapped_column(String(1000), nullable=False, default="")
+    path: Mapped[str] = mapped_column(Ltree(), nullable=False, default="")
     name: Mapped[str] = mapped_column(String(300), nullable=False)
     slug: Mapped[str] = mapped_column(String(300), nullable=False)
     level: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -75,6 +89,9 @@ class TaxonomyNode(Base):
     inclusions: Mapped[str] = mapped_column(Text, nullable=False, default="")
     exclusions: Mapped[str] = mapped_column(Text, nullable=False, default="")
     sort_order: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), deferred=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
     )
@@ -0,0 +1,29 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor encodes the sort key of the last row on a page; the next page starts
+strictly after it. List endpoints return it in the X-Next-Cursor header (absent
+on the last page) so their JSON bodies stay plain lists.
+"""
+
+import base64
+import json
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*key) -> str:
+    raw = json.dumps(key, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """The key values in a cursor; a malformed cursor is a 400."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        key = None
+    if not isinstance(key, list) or len(key) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
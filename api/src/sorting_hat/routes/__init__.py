@@ -1,4 +1,5 @@
 from sorting_hat.routes.taxonomy import router as taxonomy_router
 from sorting_hat.routes.classification import router as classification_router
+from sorting_hat.routes.llm import router as llm_router
 
-__all__ = ["taxonomy_router", "classification_router"]
+__all__ = ["taxonomy_router", "classification_router", "llm_router"]
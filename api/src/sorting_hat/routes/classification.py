@@ -1,75 +1,192 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+import asyncio
+import json
+import math
+from contextlib import nullcontext
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from sorting_hat.cassette import RecordingScraper, cassette_recorder
+from sorting_hat.circuit_breaker import CircuitOpenError, scraper_breakers
 from sorting_hat.config import settings
-from sorting_hat.db import get_session
-from sorting_hat.llm import OpenAICompatProvider
+from sorting_hat.db import async_session, get_session
+from sorting_hat.llm import NamedProvider
+from sorting_hat.llm.cache import bypass_cache
+from sorting_hat.llm.cost import BudgetExceededError
 from sorting_hat.models.classification import Classification
+from sorting_hat.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from sorting_hat.schemas.classification import (
     ClassificationDetail,
     ClassificationResponse,
     ClassifyRequest,
 )
 from sorting_hat.services.classifier import ClassifierService, ClassificationError
+from sorting_hat.services.scraper import Scraper, ScraperError
 from sorting_hat.services.taxonomy import TaxonomyService
 
 router = APIRouter(prefix="/classify", tags=["classification"])
 
 
-async def _resolve_node_paths(
-    classification: Classification, session: AsyncSession
-) -> ClassificationResponse:
-    """Build a response dict with human-readable node paths resolved."""
-    taxonomy = TaxonomyService(session)
-    response = ClassificationResponse.model_validate(classification)
+def _node_ids(classification: Classification) -> list[str]:
+    return [
+        node_id
+        for node_id in [classification.primary_node_id, *classification.secondary_node_ids]
+        if node_id
+    ]
+
 
+def _with_node_paths(response, classification: Classification, paths: dict[str, str]):
+    """Fill the human-readable node paths on a classification response."""
     if classification.primary_node_id:
-        response.primary_node_path = await taxonomy.resolve_node_path(
-            classification.primary_node_id
-        )
+        response.primary_node_path = paths.get(classification.primary_node_id)
+    response.secondary_node_paths = [
+        paths[node_id] for node_id in classification.secondary_node_ids if node_id in paths
+    ]
+    return response
 
-    paths = []
-    for node_id in classification.secondary_node_ids:
-        path = await taxonomy.resolve_node_path(node_id)
-        if path:
-            paths.append(path)
-    response.secondary_node_paths = paths
 
-    return response
+async def _resolve_node_paths(
+    classification: Classification, session: AsyncSession
+) -> ClassificationResponse:
+    """Build a response dict with human-readable node paths resolved."""
+    paths = await TaxonomyService(session).resolve_node_paths(_node_ids(classification))
+    return _with_node_paths(
+        ClassificationResponse.model_validate(classification), classification, paths
+    )
 
 
-def get_llm_provider() -> OpenAICompatProvider:
-    return OpenAICompatProvider(
-        api_key=settings.llm_api_key,
-        base_url=settings.llm_base_url if settings.llm_base_url else None,
+def get_named_provider(request: Request, name: str | None) -> NamedProvider:
+    """The provider a request asked for by name, or the default one."""
+    providers: dict[str, NamedProvider] = request.app.state.llm_providers
+    named = providers.get(name or settings.llm_provider)
+    if named is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown LLM provider '{name}'. Available: {', '.join(sorted(providers))}",
+        )
+    return named
+
+
+def get_scraper() -> Scraper:
+    options = dict(
+        timeout=settings.scraper_timeout,
+        total_timeout=settings.scraper_total_timeout,
+        max_attempts=settings.scraper_max_attempts,
+        backoff_base=settings.scraper_backoff_base,
+        backoff_max=settings.scraper_backoff_max,
+        hedge=settings.scraper_hedge,
+        hedge_percentile=settings.scraper_hedge_percentile,
+        hedge_min_delay=settings.scraper_hedge_min_delay,
+        breakers=scraper_breakers,
     )
+    if cassette_recorder is not None:
+        return RecordingScraper(cassette_recorder, **options)
+    return Scraper(**options)
 
 
 @router.post("", response_model=ClassificationResponse, status_code=201)
 async def classify_url(
     data: ClassifyRequest,
+    request: Request,
     session: AsyncSession = Depends(get_session),
-    provider: OpenAICompatProvider = Depends(get_llm_provider),
+    scraper: Scraper = Depends(get_scraper),
 ):
     """Classify a product by its URL.
 
     Fetches the webpage, uses AI to summarize the product, then classifies it
     into exactly one primary taxonomy node and up to two secondary nodes.
     """
-    model = data.model or settings.llm_model
-    service = ClassifierService(session=session, llm=provider, model=model)
+    named = get_named_provider(request, data.provider)
+    model = data.model or named.model
+    service = ClassifierService(session=session, llm=named.provider, model=model, scraper=scraper)
     try:
-        result = await service.classify_url(data.url)
+        with bypass_cache() if data.bypass_cache else nullcontext():
+            result = await service.classify_url(data.url)
     except ClassificationError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except BudgetExceededError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except ScraperError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Classification failed: {e}")
     await session.commit()
     return await _resolve_node_paths(result.classification, session)
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/stream")
+async def classify_url_stream(
+    data: ClassifyRequest,
+    request: Request,
+    scraper: Scraper = Depends(get_scraper),
+):
+    """Classify a product by its URL, streaming progress as server-sent events.
+
+    Emits `summary` events with product summary text as the model writes it,
+    then a single `result` event with the classification (or an `error` event).
+    """
+    named = get_named_provider(request, data.provider)
+    model = data.model or named.model
+    queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+    async def on_summary_delta(delta: str) -> None:
+        await queue.put(_sse("summary", {"delta": delta}))
+
+    async def run() -> None:
+        # The request-scoped session is closed before a streaming body is sent,
+        # so this task manages its own.
+        async with async_session() as session:
+            service = ClassifierService(
+                session=session, llm=named.provider, model=model, scraper=scraper
+            )
+            try:
+                with bypass_cache() if data.bypass_cache else nullcontext():
+                    result = await service.classify_url(
+                        data.url, on_summary_delta=on_summary_delta
+                    )
+                await session.commit()
+                response = await _resolve_node_paths(result.classification, session)
+                await queue.put(_sse("result", response.model_dump(mode="json")))
+            except (CircuitOpenError, BudgetExceededError) as e:
+                await queue.put(
+                    _sse("error", {"detail": str(e), "retry_after": math.ceil(e.retry_after)})
+                )
+            except Exception as e:
+                await queue.put(_sse("error", {"detail": f"Classification failed: {e}"}))
+            finally:
+                await queue.put(None)
+
+    async def events():
+        task = asyncio.create_task(run())
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @router.get("/{classification_id}", response_model=ClassificationDetail)
 async def get_classification(
     classification_id: str, session: AsyncSession = Depends(get_session)
@@ -84,33 +201,53 @@ async def get_classification(
     if not classification:
         raise HTTPException(status_code=404, detail="Classification not found")
 
-    taxonomy = TaxonomyService(session)
-    response = ClassificationDetail.model_validate(classification)
-    if classification.primary_node_id:
-        response.primary_node_path = await taxonomy.resolve_node_path(
-            classification.primary_node_id
-        )
-    paths = []
-    for node_id in classification.secondary_node_ids:
-        path = await taxonomy.resolve_node_path(node_id)
-        if path:
-            paths.append(path)
-    response.secondary_node_paths = paths
-    return response
+    paths = await TaxonomyService(session).resolve_node_paths(_node_ids(classification))
+    return _with_node_paths(
+        ClassificationDetail.model_validate(classification), classification, paths
+    )
 
 
 @router.get("", response_model=list[ClassificationResponse])
 async def list_classifications(
+    response: Response,
     url: str | None = Query(None, description="Filter by URL substring (case-insensitive)"),
-    limit: int = Query(20, le=100, description="Maximum number of results to return"),
-    offset: int = Query(0, ge=0, description="Number of results to skip for pagination"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results to return"),
+    cursor: str | None = Query(None, description="Continue after the page that returned this X-Next-Cursor value"),
+    offset: int = Query(0, ge=0, description="Number of results to skip (prefer cursor, which stays fast on deep pages)"),
     session: AsyncSession = Depends(get_session),
 ):
-    """List classifications, newest first. Optionally filter by product URL."""
-    query = select(Classification).order_by(Classification.created_at.desc())
+    """List classifications, newest first. Optionally filter by product URL.
+
+    When more results exist, the X-Next-Cursor response header holds the cursor for the next page.
+    """
+    query = select(Classification).order_by(
+        Classification.created_at.desc(), Classification.id.desc()
+    )
     if url:
         query = query.where(Classification.url.ilike(f"%{url}%"))
-    query = query.limit(limit).offset(offset)
-    result = await session.execute(query)
+    if cursor:
+        created_at, classification_id = decode_cursor(cursor, 2)
+        try:
+            created_at = datetime.fromisoformat(created_at)
+            classification_id = str(UUID(str(classification_id)))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            tuple_(Classification.created_at, Classification.id) < (created_at, classification_id)
+        )
+    elif offset:
+        query = query.offset(offset)
+    result = await session.execute(query.limit(limit + 1))
     classifications = list(result.scalars().all())
-    return [await _resolve_node_paths(c, session) for c in classifications]
+    if len(classifications) > limit:
+        classifications = classifications[:limit]
+        last = classifications[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at.isoformat(), last.id)
+    # One query resolves the primary and secondary paths for the whole page.
+    paths = await TaxonomyService(session).resolve_node_paths(
+        node_id for c in classifications for node_id in _node_ids(c)
+    )
+    return [
+        _with_node_paths(ClassificationResponse.model_validate(c), c, paths)
+        for c in classifications
+    ]
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Request
+
+from sorting_hat.circuit_breaker import llm_breakers
+from sorting_hat.config import settings
+from sorting_hat.llm.cache import llm_cache
+
+router = APIRouter(prefix="/llm", tags=["llm"])
+
+
+@router.get("/providers")
+async def list_providers(request: Request):
+    """LLM providers a classification request can select, with their default models."""
+    return {
+        "default": settings.llm_provider,
+        "providers": {
+            name: {"model": named.model}
+            for name, named in request.app.state.llm_providers.items()
+        },
+    }
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Hit/miss counters for the LLM response cache."""
+    if llm_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **llm_cache.stats.as_dict()}
+
+
+@router.get("/circuits")
+async def get_circuit_states():
+    """Circuit breaker state ("closed", "open", "half_open") per provider/model."""
+    if llm_breakers is None:
+        return {"enabled": False}
+    return {"enabled": True, "circuits": llm_breakers.states()}
@@ -1,17 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Iterable
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from sorting_hat.config import settings
 from sorting_hat.db import get_session
+from sorting_hat.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from sorting_hat.schemas.taxonomy import (
     GovernanceGroupCreate,
     GovernanceGroupResponse,
     GovernanceGroupUpdate,
+    TaxonomyBulkImportResult,
     TaxonomyNodeCreate,
     TaxonomyNodeDetail,
+    TaxonomyNodeImport,
+    TaxonomyNodeMove,
     TaxonomyNodeResponse,
+    TaxonomyNodeSuggestion,
     TaxonomyNodeUpdate,
+    TaxonomyNodeWithCounts,
 )
+from sorting_hat.services.suggest import suggest_index
 from sorting_hat.services.taxonomy import TaxonomyService, TaxonomyServiceError
+from sorting_hat.services.taxonomy_snapshot import (
+    TREE_FIELDS,
+    TaxonomySnapshot,
+    encoded_etag,
+    etag_matches,
+    get_snapshot,
+    negotiate_encoding,
+)
 
 router = APIRouter(prefix="/taxonomy", tags=["taxonomy"])
 
@@ -20,19 +38,57 @@ def get_service(session: AsyncSession = Depends(get_session)) -> TaxonomyService
     return TaxonomyService(session)
 
 
+def cache_headers(snapshot: TaxonomySnapshot, encoding: str | None = None) -> dict[str, str]:
+    return {
+        "ETag": encoded_etag(snapshot.etag, encoding),
+        "Cache-Control": settings.taxonomy_cache_control,
+        # Also on 304s, so caches key stored bodies by encoding (ours or a proxy's).
+        "Vary": "Accept-Encoding",
+    }
+
+
+async def cached_snapshot(
+    request: Request,
+    response: Response,
+    snapshot: TaxonomySnapshot = Depends(get_snapshot),
+) -> TaxonomySnapshot:
+    """The current snapshot, with ETag and Cache-Control set on the response.
+
+    Answers 304 Not Modified straight away when the client already has this version.
+    """
+    headers = cache_headers(snapshot)
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return snapshot
+
+
+def with_counts(snapshot: TaxonomySnapshot, nodes: Iterable) -> list[TaxonomyNodeWithCounts]:
+    return [
+        TaxonomyNodeWithCounts(
+            **TaxonomyNodeResponse.model_validate(node).model_dump(),
+            child_count=snapshot.child_count(node.id),
+            descendant_count=snapshot.descendant_count(node.id),
+        )
+        for node in nodes
+    ]
+
+
 # --- Governance Groups ---
 
 
 @router.get("/governance-groups", response_model=list[GovernanceGroupResponse])
-async def list_governance_groups(service: TaxonomyService = Depends(get_service)):
+async def list_governance_groups(snapshot: TaxonomySnapshot = Depends(cached_snapshot)):
     """List all governance groups, ordered by sort_order."""
-    return await service.list_governance_groups()
+    return snapshot.groups
 
 
 @router.get("/governance-groups/{slug}", response_model=GovernanceGroupResponse)
-async def get_governance_group(slug: str, service: TaxonomyService = Depends(get_service)):
+async def get_governance_group(
+    slug: str, snapshot: TaxonomySnapshot = Depends(cached_snapshot)
+):
     """Get a single governance group by its URL slug."""
-    group = await service.get_governance_group(slug)
+    group = snapshot.get_group(slug)
     if not group:
         raise HTTPException(status_code=404, detail="Governance group not found")
     return group
@@ -86,42 +142,142 @@ async def delete_governance_group(
 
 @router.get("/nodes", response_model=list[TaxonomyNodeResponse])
 async def list_nodes(
+    response: Response,
     branch: str | None = Query(None, description="Filter by top-level branch: 'software' or 'computing-hardware'"),
     governance_group: str | None = Query(None, description="Filter by governance group slug"),
     max_depth: int | None = Query(None, description="Limit results to nodes at or above this tree depth"),
-    service: TaxonomyService = Depends(get_service),
+    limit: int | None = Query(None, ge=1, le=1000, description="Maximum number of results to return (default: all)"),
+    cursor: str | None = Query(None, description="Continue after the page that returned this X-Next-Cursor value"),
+    snapshot: TaxonomySnapshot = Depends(cached_snapshot),
+):
+    """List taxonomy nodes with optional filters for branch, governance group, and depth.
+
+    Nodes come in path order. With `limit`, the X-Next-Cursor response header holds the
+    cursor for the next page while more results exist.
+    """
+    nodes = snapshot.list_nodes(branch, governance_group, max_depth)
+    if cursor:
+        (after,) = decode_cursor(cursor, 1)
+        if not isinstance(after, str):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        nodes = [n for n in nodes if n.path > after]
+    if limit is not None and len(nodes) > limit:
+        nodes = nodes[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(nodes[-1].path)
+    return nodes
+
+
+@router.get(
+    "/tree",
+    response_class=Response,
+    responses={200: {"content": {"application/json": {}}, "description": "Nested taxonomy tree"}},
+)
+async def get_tree(
+    request: Request,
+    fields: str | None = Query(None, description="Comma-separated node fields to include (default: all); 'id' and 'children' are always present"),
+    max_depth: int | None = Query(None, ge=1, description="Omit children of nodes at this tree depth or deeper"),
+    snapshot: TaxonomySnapshot = Depends(get_snapshot),
 ):
-    """List taxonomy nodes with optional filters for branch, governance group, and depth."""
-    return await service.list_nodes(branch, governance_group, max_depth)
+    """The whole taxonomy as nested nodes, each with a `children` list.
+
+    Serialized and compressed once per taxonomy version, then served as stored bytes.
+    """
+    selected = TREE_FIELDS
+    if fields:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = set(selected) - set(TREE_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+    payload = snapshot.tree_payload(selected, max_depth)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), payload.encodings())
+    headers = cache_headers(snapshot, encoding)
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(payload.body(encoding), media_type="application/json", headers=headers)
 
 
 @router.get("/nodes/search", response_model=list[TaxonomyNodeResponse])
 async def search_nodes(
     q: str = Query(..., min_length=2, description="Text to search for in node names and definitions"),
     service: TaxonomyService = Depends(get_service),
+    _: TaxonomySnapshot = Depends(cached_snapshot),
 ):
     """Search taxonomy nodes by name or definition text."""
     return await service.search_nodes(q)
 
 
+@router.get("/nodes/suggest", response_model=list[TaxonomyNodeSuggestion])
+async def suggest_nodes(
+    q: str = Query(..., min_length=1, description="What the user has typed so far"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions"),
+    snapshot: TaxonomySnapshot = Depends(cached_snapshot),
+):
+    """Typeahead suggestions by node name, acronym or alias, best first, with breadcrumbs.
+
+    Served from an in-memory index of the current taxonomy; no database round trip.
+    """
+    return [
+        TaxonomyNodeSuggestion(
+            id=s.node.id,
+            name=s.node.name,
+            path=s.breadcrumb,
+            level=s.node.level,
+            branch=s.node.branch.value,
+            score=s.score,
+        )
+        for s in suggest_index(snapshot).suggest(q, limit)
+    ]
+
+
+@router.get("/nodes/roots", response_model=list[TaxonomyNodeWithCounts])
+async def list_root_nodes(
+    branch: str | None = Query(None, description="Filter by top-level branch: 'software' or 'computing-hardware'"),
+    snapshot: TaxonomySnapshot = Depends(cached_snapshot),
+):
+    """List top-level nodes with child and descendant counts, for loading the tree lazily."""
+    roots = [n for n in snapshot.get_children(None) if branch is None or n.branch == branch]
+    return with_counts(snapshot, roots)
+
+
+@router.get("/nodes/{node_id}/children", response_model=list[TaxonomyNodeWithCounts])
+async def list_children(node_id: str, snapshot: TaxonomySnapshot = Depends(cached_snapshot)):
+    """List a node's direct children with their own child and descendant counts."""
+    if snapshot.get_node(node_id) is None:
+        raise HTTPException(status_code=404, detail="Node not found")
+    return with_counts(snapshot, snapshot.get_children(node_id))
+
+
 @router.get("/nodes/{node_id}", response_model=TaxonomyNodeDetail)
-async def get_node(node_id: str, service: TaxonomyService = Depends(get_service)):
+async def get_node(
+    node_id: str, snapshot: TaxonomySnapshot = Depends(cached_snapshot)
+):
     """Get a taxonomy node with its children and full parent chain."""
-    node = await service.get_node(node_id)
+    node = snapshot.get_node(node_id)
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
-    parent_chain = await service.get_parent_chain(node_id)
+    parent_chain = snapshot.get_parent_chain(node_id)
     return TaxonomyNodeDetail(
         **TaxonomyNodeResponse.model_validate(node).model_dump(),
-        children=[TaxonomyNodeResponse.model_validate(c) for c in node.children],
+        children=[
+            TaxonomyNodeResponse.model_validate(c) for c in snapshot.get_children(node_id)
+        ],
         parent_chain=[TaxonomyNodeResponse.model_validate(p) for p in parent_chain],
     )
 
 
 @router.get("/nodes/{node_id}/subtree", response_model=list[TaxonomyNodeResponse])
-async def get_subtree(node_id: str, service: TaxonomyService = Depends(get_service)):
+async def get_subtree(
+    node_id: str,
+    depth: int | None = Query(None, ge=0, description="Only include descendants up to this many levels below the node"),
+    snapshot: TaxonomySnapshot = Depends(cached_snapshot),
+):
     """Get all descendants of a taxonomy node as a flat list."""
-    return await service.get_subtree(node_id)
+    return snapshot.get_subtree(node_id, depth)
 
 
 @router.post("/nodes", response_model=TaxonomyNodeResponse, status_code=201)
@@ -139,6 +295,26 @@ async def create_node(
     return node
 
 
+@router.post("/nodes/bulk", response_model=TaxonomyBulkImportResult)
+async def bulk_upsert_nodes(
+    data: list[TaxonomyNodeImport] | TaxonomyNodeImport,
+    service: TaxonomyService = Depends(get_service),
+    session: AsyncSession = Depends(get_session),
+):
+    """Create or update many nodes by path, given as a list or a nested subtree.
+
+    Everything is validated first and written in one transaction: either every node
+    is imported or none is. Existing nodes only change the fields given for them.
+    """
+    items = data if isinstance(data, list) else [data]
+    try:
+        result = await service.bulk_upsert_nodes(items)
+    except TaxonomyServiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await session.commit()
+    return result
+
+
 @router.put("/nodes/{node_id}", response_model=TaxonomyNodeResponse)
 async def update_node(
     node_id: str,
@@ -154,6 +330,24 @@ async def update_node(
     return node
 
 
+@router.post("/nodes/{node_id}/move", response_model=TaxonomyNodeResponse)
+async def move_node(
+    node_id: str,
+    data: TaxonomyNodeMove,
+    service: TaxonomyService = Depends(get_service),
+    session: AsyncSession = Depends(get_session),
+):
+    """Move a node, with everything below it, under a new parent in the same branch."""
+    try:
+        node = await service.move_node(node_id, data.new_parent_id)
+    except TaxonomyServiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not node:
+        raise HTTPException(status_code=404, detail="Node not found")
+    await session.commit()
+    return node
+
+
 @router.delete("/nodes/{node_id}", status_code=204)
 async def delete_node(
     node_id: str,
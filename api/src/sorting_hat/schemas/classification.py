@@ -8,7 +8,8 @@ class ClassifyRequest(BaseModel):
 
     url: str = Field(..., max_length=2000, description="Public URL of the product webpage to classify")
     model: str | None = Field(None, description="LLM model to use (defaults to server-configured model)")
-    provider: str | None = Field(None, description="LLM provider override")
+    provider: str | None = Field(None, description="Named LLM provider from the server config (defaults to the server's default)")
+    bypass_cache: bool = Field(False, description="Ignore cached LLM responses and call the provider")
 
     model_config = {
         "json_schema_extra": {
@@ -17,6 +18,7 @@ class ClassifyRequest(BaseModel):
                     "url": "https://www.datadoghq.com/",
                     "model": None,
                     "provider": None,
+                    "bypass_cache": False,
                 }
             ]
         }
@@ -32,7 +34,14 @@ class ClassificationStepResponse(BaseModel):
     output_text: str = Field(..., description="Output produced by this step")
     model_used: str = Field(..., description="LLM model used for this step")
     tokens_used: int = Field(..., description="Total tokens consumed by this step")
+    prompt_tokens: int = Field(0, description="Prompt (input) tokens sent to the LLM")
+    completion_tokens: int = Field(0, description="Completion (output) tokens generated by the LLM")
+    cached_tokens: int = Field(0, description="Prompt tokens served from the provider's prompt cache")
+    cost_usd: float = Field(0.0, description="Cost of this step in USD, from the configured price table")
     latency_ms: int = Field(..., description="Wall-clock time for this step in milliseconds")
+    attempts: int = Field(1, description="Number of requests made for this step, including retries and hedges")
+    time_to_first_token_ms: int | None = Field(None, description="Time until the LLM streamed its first token (LLM steps only)")
+    backend: str = Field("", description="LLM backend that served this step, when several are configured")
     created_at: datetime = Field(..., description="When this step was executed")
 
     model_config = {"from_attributes": True}
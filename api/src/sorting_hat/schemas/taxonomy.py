@@ -107,6 +107,13 @@ class TaxonomyNodeResponse(TaxonomyNodeBase):
     model_config = {"from_attributes": True}
 
 
+class TaxonomyNodeWithCounts(TaxonomyNodeResponse):
+    """A taxonomy node with the size of the branch below it, for expanding the tree on demand."""
+
+    child_count: int = Field(..., description="Number of direct child nodes")
+    descendant_count: int = Field(..., description="Number of nodes anywhere below this one")
+
+
 class TaxonomyNodeDetail(TaxonomyNodeResponse):
     """A taxonomy node with its direct children and full ancestry chain."""
 
@@ -116,3 +123,33 @@ class TaxonomyNodeDetail(TaxonomyNodeResponse):
 
 class TaxonomyNodeMove(BaseModel):
     new_parent_id: str = Field(..., description="UUID of the new parent node")
+
+
+class TaxonomyNodeImport(BaseModel):
+    """A node to create or update by path, optionally with nested children."""
+
+    path: str | None = Field(None, max_length=1000, description="ltree path such as 'software.data_analytics.etl'; for nested children defaults to the parent path plus the slugified name")
+    name: str = Field(..., max_length=300, description="Display name of the taxonomy node")
+    slug: str | None = Field(None, max_length=300, description="URL-friendly identifier (defaults to the last path label)")
+    governance_group: str | None = Field(None, description="Governance group slug; required for new top-level nodes, inherited from the parent otherwise")
+    definition: str = Field("", description="What products in this category do")
+    distinguishing_characteristics: str = Field("", description="How to differentiate this category from similar ones")
+    inclusions: str = Field("", description="Types of products that belong in this category")
+    exclusions: str = Field("", description="Types of products that do NOT belong in this category")
+    sort_order: int = Field(0, description="Display ordering within siblings (lower numbers first)")
+    children: list["TaxonomyNodeImport"] = Field([], description="Nodes to import below this one")
+
+
+class TaxonomyBulkImportResult(BaseModel):
+    created: int = Field(..., description="Nodes that did not exist and were inserted")
+    updated: int = Field(..., description="Existing nodes whose fields changed")
+    unchanged: int = Field(..., description="Existing nodes that already matched")
+
+
+class TaxonomyNodeSuggestion(BaseModel):
+    id: str = Field(..., description="Unique identifier (UUID)")
+    name: str = Field(..., description="Display name of the taxonomy node")
+    path: str = Field(..., description="Human-readable breadcrumb (e.g. 'Software > Security > IAM')")
+    level: int = Field(..., description="Depth in the tree")
+    branch: str = Field(..., description="Top-level branch: 'software' or 'hardware'")
+    score: float = Field(..., description="Match strength; higher is better")
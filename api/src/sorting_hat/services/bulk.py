@@ -0,0 +1,232 @@
+"""Offline bulk classification through provider batch jobs.
+
+    python -m sorting_hat.services.bulk urls.txt
+
+Pages are scraped concurrently, then every summarize request goes out as one
+batch job and every classify request as a second one. Batches are cheaper and
+have far higher throughput limits than per-step calls, but can take hours, so
+this is for overnight jobs rather than the API.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from dataclasses import dataclass, field, replace
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sorting_hat.circuit_breaker import CircuitOpenError, scraper_breakers
+from sorting_hat.config import settings
+from sorting_hat.db import async_session
+from sorting_hat.llm.batch import (
+    DEFAULT_BATCH_TIMEOUT,
+    BatchLLMProvider,
+    BatchRequest,
+    BatchResult,
+    OpenAIBatchProvider,
+)
+from sorting_hat.llm.cost import PriceTable, price_table
+from sorting_hat.llm.provider import LLMMessage
+from sorting_hat.models.classification import Classification, ClassificationStep, StepType
+from sorting_hat.services.classifier import (
+    ClassifierService,
+    classify_messages,
+    summarize_messages,
+    usage_columns,
+)
+from sorting_hat.services.scraper import ScrapeResult, Scraper, ScraperError
+
+
+@dataclass
+class BulkResult:
+    classifications: list[Classification] = field(default_factory=list)
+    failures: dict[str, str] = field(default_factory=dict)  # url -> reason
+
+
+class BulkClassifier(ClassifierService):
+    def __init__(
+        self,
+        session: AsyncSession,
+        llm: BatchLLMProvider,
+        model: str,
+        scraper: Scraper | None = None,
+        scrape_concurrency: int = 8,
+        poll_interval: float = 30.0,
+        batch_timeout: float = DEFAULT_BATCH_TIMEOUT,
+        prices: PriceTable | None = None,
+    ):
+        super().__init__(session=session, llm=llm, model=model, scraper=scraper)
+        self.llm: BatchLLMProvider = llm
+        self.scrape_concurrency = scrape_concurrency
+        self.poll_interval = poll_interval
+        self.batch_timeout = batch_timeout
+        self.prices = prices or PriceTable()
+
+    async def classify_urls(self, urls: list[str]) -> BulkResult:
+        """Scrape, summarize and classify every URL. Failed URLs are reported, not raised."""
+        result = BulkResult()
+        scraped = await self._scrape_all(urls, result.failures)
+
+        summaries, summarize_ms = await self._run_batch(
+            [summarize_messages(page.extracted_text) for _, page, _ in scraped]
+        )
+        taxonomy_text, _ = await self._build_taxonomy_text()
+        classify_inputs = [
+            (i, classify_messages(summary.response.content, taxonomy_text))
+            for i, summary in enumerate(summaries)
+            if summary.response is not None
+        ]
+        classified, classify_ms = await self._run_batch([m for _, m in classify_inputs])
+        classifications = dict(zip((i for i, _ in classify_inputs), classified))
+
+        for i, (url, page, scrape_ms) in enumerate(scraped):
+            summary = summaries[i]
+            if summary.response is None:
+                result.failures[url] = f"Summarize failed: {summary.error}"
+                continue
+            classify = classifications[i]
+            if classify.response is None:
+                result.failures[url] = f"Classify failed: {classify.error}"
+                continue
+            result.classifications.append(
+                self._record(url, page, scrape_ms, summary, summarize_ms, classify, classify_ms)
+            )
+
+        await self.session.flush()
+        return result
+
+    async def _scrape_all(
+        self, urls: list[str], failures: dict[str, str]
+    ) -> list[tuple[str, ScrapeResult, int]]:
+        semaphore = asyncio.Semaphore(self.scrape_concurrency)
+
+        async def scrape(url: str) -> tuple[str, ScrapeResult, int] | None:
+            async with semaphore:
+                start = time.monotonic()
+                try:
+                    page = await self.scraper.scrape(url)
+                except (ScraperError, CircuitOpenError) as e:
+                    failures[url] = str(e)
+                    return None
+                return url, page, int((time.monotonic() - start) * 1000)
+
+        return [s for s in await asyncio.gather(*(scrape(url) for url in urls)) if s]
+
+    async def _run_batch(self, prompts: list[list[LLMMessage]]) -> tuple[list[BatchResult], int]:
+        """Run one batch job. Returns results in prompt order and the job's wall time in ms."""
+        start = time.monotonic()
+        results = await self.llm.complete_batch(
+            [
+                BatchRequest(custom_id=str(i), messages=messages, model=self.model)
+                for i, messages in enumerate(prompts)
+            ],
+            poll_interval=self.poll_interval,
+            timeout=self.batch_timeout,
+        )
+        elapsed_ms = int((time.monotonic() - start) * 1000)
+        ordered = [results[str(i)] for i in range(len(prompts))]
+        for result in ordered:
+            if result.response is not None:
+                cost = self.prices.cost(result.response, self.model)
+                result.response = replace(result.response, cost_usd=cost)
+        return ordered, elapsed_ms
+
+    def _record(
+        self,
+        url: str,
+        page: ScrapeResult,
+        scrape_ms: int,
+        summary: BatchResult,
+        summarize_ms: int,
+        classify: BatchResult,
+        classify_ms: int,
+    ) -> Classification:
+        parsed = self._parse_classification(classify.response.content)
+        classification = Classification(
+            url=url,
+            raw_content=page.extracted_text,
+            product_summary=summary.response.content,
+            primary_node_id=parsed.get("primary_node_id"),
+            secondary_node_ids=parsed.get("secondary_node_ids", []),
+            confidence_score=parsed.get("confidence"),
+            model_used=classify.response.model,
+            reasoning=parsed.get("reasoning", ""),
+        )
+        # Batch steps share the wall time of the job that ran them.
+        classification.steps = [
+            ClassificationStep(
+                step_type=StepType.scrape,
+                input_text=url,
+                output_text=page.extracted_text[:10000],
+                latency_ms=scrape_ms,
+                attempts=page.attempts,
+            ),
+            ClassificationStep(
+                step_type=StepType.summarize,
+                input_text=page.extracted_text[:10000],
+                output_text=summary.response.content,
+                model_used=summary.response.model,
+                **usage_columns(summary.response),
+                latency_ms=summarize_ms,
+                backend=summary.response.backend,
+            ),
+            ClassificationStep(
+                step_type=StepType.classify,
+                input_text=summary.response.content,
+                output_text=classify.response.content,
+                model_used=classify.response.model,
+                **usage_columns(classify.response),
+                latency_ms=classify_ms,
+                backend=classify.response.backend,
+            ),
+        ]
+        self.session.add(classification)
+        return classification
+
+
+async def run(urls: list[str]) -> BulkResult:
+    provider = OpenAIBatchProvider(
+        api_key=settings.llm_batch_api_key or settings.llm_api_key,
+        base_url=settings.llm_batch_base_url or settings.llm_base_url or None,
+        name=settings.llm_provider,
+        completion_window=settings.llm_batch_completion_window,
+    )
+    scraper = Scraper(
+        timeout=settings.scraper_timeout,
+        total_timeout=settings.scraper_total_timeout,
+        max_attempts=settings.scraper_max_attempts,
+        backoff_base=settings.scraper_backoff_base,
+        backoff_max=settings.scraper_backoff_max,
+        breakers=scraper_breakers,
+    )
+    async with async_session() as session:
+        service = BulkClassifier(
+            session=session,
+            llm=provider,
+            model=settings.llm_batch_model or settings.llm_model,
+            scraper=scraper,
+            poll_interval=settings.llm_batch_poll_interval,
+            batch_timeout=settings.llm_batch_timeout,
+            prices=price_table,
+        )
+        result = await service.classify_urls(urls)
+        await session.commit()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify many URLs through LLM batch jobs.")
+    parser.add_argument("file", type=argparse.FileType(), help="file with one URL per line, or -")
+    args = parser.parse_args()
+    urls = [line.strip() for line in args.file if line.strip() and not line.startswith("#")]
+
+    result = asyncio.run(run(urls))
+    for classification in result.classifications:
+        print(f"{classification.id}\t{classification.url}")
+    for url, reason in result.failures.items():
+        print(f"FAILED\t{url}\t{reason}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
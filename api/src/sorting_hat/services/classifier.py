@@ -1,20 +1,87 @@
 import json
+import re
 import time
 from dataclasses import dataclass
+from typing import Awaitable, Callable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from sorting_hat.llm.provider import LLMMessage, LLMProvider
+from sorting_hat.cassette import cassette_scope
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse
 from sorting_hat.models.classification import Classification, ClassificationStep, StepType
 from sorting_hat.prompts import CLASSIFY_SYSTEM, CLASSIFY_USER, SUMMARIZE_SYSTEM, SUMMARIZE_USER
 from sorting_hat.services.scraper import Scraper
 from sorting_hat.services.taxonomy import TaxonomyService
 
 
+DeltaCallback = Callable[[str], Awaitable[None]]
+
+_PRIMARY_START = re.compile(r'"primary"\s*:\s*\{')
+
+
 class ClassificationError(Exception):
     pass
 
 
+def extract_primary(partial: str) -> dict | None:
+    """Return the "primary" object from a partially streamed classify response once it is complete."""
+    match = _PRIMARY_START.search(partial)
+    if not match:
+        return None
+    start = match.end() - 1
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(partial)):
+        char = partial[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                try:
+                    return json.loads(partial[start : i + 1])
+                except json.JSONDecodeError:
+                    return None
+    return None
+
+
+def summarize_messages(extracted_text: str) -> list[LLMMessage]:
+    return [
+        LLMMessage(role="system", content=SUMMARIZE_SYSTEM),
+        LLMMessage(role="user", content=SUMMARIZE_USER.format(content=extracted_text[:8000])),
+    ]
+
+
+def classify_messages(summary: str, taxonomy_text: str) -> list[LLMMessage]:
+    return [
+        LLMMessage(role="system", content=CLASSIFY_SYSTEM),
+        LLMMessage(
+            role="user", content=CLASSIFY_USER.format(summary=summary, taxonomy=taxonomy_text)
+        ),
+    ]
+
+
+def usage_columns(response: LLMResponse) -> dict:
+    """ClassificationStep token and cost columns for an LLM response."""
+    return {
+        "tokens_used": response.tokens_used,
+        "prompt_tokens": response.prompt_tokens,
+        "completion_tokens": response.completion_tokens,
+        "cached_tokens": response.cached_tokens,
+        "cost_usd": response.cost_usd,
+    }
+
+
 @dataclass
 class ClassificationResult:
     classification: Classification
@@ -35,7 +102,19 @@ class ClassifierService:
         self.scraper = scraper or Scraper()
         self.taxonomy_service = TaxonomyService(session)
 
-    async def classify_url(self, url: str) -> ClassificationResult:
+    async def classify_url(
+        self, url: str, on_summary_delta: DeltaCallback | None = None
+    ) -> ClassificationResult:
+        """Scrape, summarize and classify a URL.
+
+        `on_summary_delta` receives the product summary text as it streams in.
+        """
+        with cassette_scope(url):
+            return await self._classify_url(url, on_summary_delta)
+
+    async def _classify_url(
+        self, url: str, on_summary_delta: DeltaCallback | None
+    ) -> ClassificationResult:
         classification = Classification(url=url)
         self.session.add(classification)
         await self.session.flush()
@@ -43,7 +122,8 @@ class ClassifierService:
 
         # Step 1: Scrape
         start = time.monotonic()
-        raw_html, extracted_text = await self.scraper.fetch_and_extract(url)
+        scraped = await self.scraper.scrape(url)
+        extracted_text = scraped.extracted_text
         scrape_ms = int((time.monotonic() - start) * 1000)
 
         classification.raw_content = extracted_text
@@ -53,18 +133,15 @@ class ClassifierService:
             input_text=url,
             output_text=extracted_text[:10000],
             latency_ms=scrape_ms,
+            attempts=scraped.attempts,
         )
         self.session.add(scrape_step)
         steps.append(scrape_step)
 
         # Step 2: Summarize
         start = time.monotonic()
-        summary_response = await self.llm.complete(
-            messages=[
-                LLMMessage(role="system", content=SUMMARIZE_SYSTEM),
-                LLMMessage(role="user", content=SUMMARIZE_USER.format(content=extracted_text[:8000])),
-            ],
-            model=self.model,
+        summary_response, summarize_ttft = await self._stream(
+            summarize_messages(extracted_text), on_delta=on_summary_delta
         )
         summarize_ms = int((time.monotonic() - start) * 1000)
 
@@ -75,27 +152,37 @@ class ClassifierService:
             input_text=extracted_text[:10000],
             output_text=summary_response.content,
             model_used=summary_response.model,
-            tokens_used=summary_response.tokens_used,
+            **usage_columns(summary_response),
             latency_ms=summarize_ms,
+            time_to_first_token_ms=summarize_ttft,
+            backend=summary_response.backend,
         )
         self.session.add(summarize_step)
         steps.append(summarize_step)
 
         # Step 3: Classify
-        taxonomy_text = await self._build_taxonomy_text()
+        taxonomy_text, node_ids = await self._build_taxonomy_text()
+
+        # Persist the primary node as soon as its JSON object is complete,
+        # without waiting for the secondaries and confidence to stream in.
+        partial: list[str] = []
+
+        async def on_classify_delta(delta: str) -> None:
+            partial.append(delta)
+            # The object can only have closed on a delta with a "}", so the
+            # buffer is rejoined and rescanned at most once per such delta.
+            if classification.primary_node_id or "}" not in delta:
+                return
+            primary = extract_primary("".join(partial))
+            if primary and primary.get("node_id") in node_ids:
+                classification.primary_node_id = primary["node_id"]
+                classification.reasoning = primary.get("reasoning", "")
+                await self.session.flush()
 
         start = time.monotonic()
-        classify_response = await self.llm.complete(
-            messages=[
-                LLMMessage(role="system", content=CLASSIFY_SYSTEM),
-                LLMMessage(
-                    role="user",
-                    content=CLASSIFY_USER.format(
-                        summary=summary_response.content, taxonomy=taxonomy_text
-                    ),
-                ),
-            ],
-            model=self.model,
+        classify_response, classify_ttft = await self._stream(
+            classify_messages(summary_response.content, taxonomy_text),
+            on_delta=on_classify_delta,
         )
         classify_ms = int((time.monotonic() - start) * 1000)
 
@@ -105,24 +192,55 @@ class ClassifierService:
             input_text=summary_response.content,
             output_text=classify_response.content,
             model_used=classify_response.model,
-            tokens_used=classify_response.tokens_used,
+            **usage_columns(classify_response),
             latency_ms=classify_ms,
+            time_to_first_token_ms=classify_ttft,
+            backend=classify_response.backend,
         )
         self.session.add(classify_step)
         steps.append(classify_step)
 
         # Parse classification result
         parsed = self._parse_classification(classify_response.content)
-        classification.primary_node_id = parsed.get("primary_node_id")
+        primary_node_id = parsed.get("primary_node_id")
+        if primary_node_id in node_ids:
+            classification.primary_node_id = primary_node_id
+            classification.reasoning = parsed.get("reasoning", "")
+        elif not classification.primary_node_id:
+            # Nothing usable streamed in either; keep the parse failure or say why.
+            classification.reasoning = (
+                f"Unknown primary node: {primary_node_id}"
+                if primary_node_id
+                else parsed.get("reasoning", "")
+            )
         classification.secondary_node_ids = parsed.get("secondary_node_ids", [])
         classification.confidence_score = parsed.get("confidence")
         classification.model_used = classify_response.model
-        classification.reasoning = parsed.get("reasoning", "")
 
         await self.session.flush()
         return ClassificationResult(classification=classification, steps=steps)
 
-    async def _build_taxonomy_text(self) -> str:
+    async def _stream(
+        self, messages: list[LLMMessage], on_delta: DeltaCallback | None = None
+    ) -> tuple[LLMResponse, int | None]:
+        """Stream a completion. Returns (response, time to first token in ms)."""
+        start = time.monotonic()
+        ttft_ms = None
+        response = None
+        async for chunk in self.llm.complete_stream(messages=messages, model=self.model):
+            if chunk.delta:
+                if ttft_ms is None:
+                    ttft_ms = int((time.monotonic() - start) * 1000)
+                if on_delta:
+                    await on_delta(chunk.delta)
+            if chunk.response:
+                response = chunk.response
+        if response is None:
+            raise ClassificationError("LLM stream ended without a response")
+        return response, ttft_ms
+
+    async def _build_taxonomy_text(self) -> tuple[str, set[str]]:
+        """Render the taxonomy for the classify prompt. Returns (text, valid node IDs)."""
         nodes = await self.taxonomy_service.list_nodes()
         lines = []
         for node in nodes:
@@ -131,7 +249,7 @@ class ClassifierService:
             if node.definition:
                 line += f": {node.definition}"
             lines.append(line)
-        return "\n".join(lines)
+        return "\n".join(lines), {node.id for node in nodes}
 
     def _parse_classification(self, raw: str) -> dict:
         try:
@@ -1,34 +1,121 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
 import httpx
 import trafilatura
 
+from sorting_hat.circuit_breaker import CircuitBreakerRegistry
+
+USER_AGENT = "Mozilla/5.0 (compatible; SortingHat/1.0; +https://github.com/sorting-hat)"
+
+# Responses worth retrying: the server (or something in front of it) is
+# struggling, not telling us the request itself is wrong.
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
 
 class ScraperError(Exception):
     pass
 
 
+class _HostUnavailableError(ScraperError):
+    """Retries exhausted on transient failures: counts against the host's circuit."""
+
+
+class _RetryableError(Exception):
+    def __init__(self, message: str, requests: int = 1, retry_after: float | None = None):
+        super().__init__(message)
+        self.requests = requests
+        self.retry_after = retry_after  # seconds the server asked us to wait, if any
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header, given as seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class ScrapeResult:
+    raw_html: str
+    extracted_text: str
+    attempts: int
+
+
+class LatencyTracker:
+    """Rolling window of full fetch times (request to last body byte) used to pick the
+    hedge delay, which is measured against the same thing."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples: deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> float | None:
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(p * len(ordered)))
+        return ordered[index]
+
+
+# Shared across Scraper instances so the hedge threshold reflects recent
+# traffic rather than a single request.
+fetch_latencies = LatencyTracker()
+
+
 class Scraper:
-    def __init__(self, timeout: float = 30.0):
-        self.timeout = timeout
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        total_timeout: float = 45.0,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_min_delay: float = 2.0,
+        latency_tracker: LatencyTracker | None = None,
+        breakers: CircuitBreakerRegistry | None = None,
+    ):
+        self.timeout = timeout  # per request
+        self.total_timeout = total_timeout  # across all attempts and backoff; 0 = none
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.latency_tracker = latency_tracker or fetch_latencies
+        self.breakers = breakers  # per-host circuit breakers, optional
 
     async def fetch_and_extract(self, url: str) -> tuple[str, str]:
         """Fetch URL and extract main content. Returns (raw_html, extracted_text)."""
-        try:
-            async with httpx.AsyncClient(
-                timeout=self.timeout, follow_redirects=True
-            ) as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        "User-Agent": (
-                            "Mozilla/5.0 (compatible; SortingHat/1.0; "
-                            "+https://github.com/sorting-hat)"
-                        )
-                    },
-                )
-                response.raise_for_status()
-                raw_html = response.text
-        except httpx.HTTPError as e:
-            raise ScraperError(f"Failed to fetch {url}: {e}") from e
+        result = await self.scrape(url)
+        return result.raw_html, result.extracted_text
+
+    async def scrape(self, url: str) -> ScrapeResult:
+        """Fetch URL with retries (and optional hedging) and extract main content."""
+        raw_html, attempts = await self._fetch(url)
 
         extracted = trafilatura.extract(
             raw_html,
@@ -40,4 +127,104 @@ class Scraper:
         if not extracted:
             raise ScraperError(f"Could not extract meaningful content from {url}")
 
-        return raw_html, extracted
+        return ScrapeResult(raw_html=raw_html, extracted_text=extracted, attempts=attempts)
+
+    async def _fetch(self, url: str) -> tuple[str, int]:
+        """Return (raw_html, attempts), retrying transient failures with jittered backoff.
+
+        Raises CircuitOpenError without fetching while the host's circuit is open.
+        """
+        if self.breakers is None:
+            guard = nullcontext()
+        else:
+            breaker = self.breakers.get(urlsplit(url).hostname or url)
+            guard = breaker.guard(lambda e: isinstance(e, _HostUnavailableError))
+        async with guard:
+            return await self._fetch_with_retries(url)
+
+    async def _fetch_with_retries(self, url: str) -> tuple[str, int]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.total_timeout if self.total_timeout else None
+        attempts = 0
+        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    for retry in range(self.max_attempts):
+                        try:
+                            raw_html, used = await self._fetch_once(client, url)
+                            return raw_html, attempts + used
+                        except _RetryableError as e:
+                            attempts += e.requests
+                            delay = max(self._backoff(retry), e.retry_after or 0.0)
+                            if retry + 1 >= self.max_attempts or (
+                                deadline is not None and loop.time() + delay >= deadline
+                            ):
+                                raise _HostUnavailableError(
+                                    f"Failed to fetch {url} after {attempts} attempts: {e}"
+                                ) from e.__cause__
+                            await asyncio.sleep(delay)
+            except TimeoutError as e:
+                raise _HostUnavailableError(
+                    f"Failed to fetch {url}: no response within {self.total_timeout:g}s"
+                ) from e
+        raise ScraperError(f"Failed to fetch {url}")  # pragma: no cover
+
+    def _backoff(self, retry: int) -> float:
+        # "Full jitter": spreads retries from many callers over the whole window.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2**retry)))
+
+    async def _fetch_once(self, client: httpx.AsyncClient, url: str) -> tuple[str, int]:
+        """One logical attempt, possibly hedged with a second request. Returns (html, requests)."""
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._get(client, url), 1
+
+        first = asyncio.create_task(self._get(client, url))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result(), 1
+
+        second = asyncio.create_task(self._get(client, url))
+        pending = {first, second}
+        error: _RetryableError | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        return task.result(), 2
+                    except _RetryableError as e:
+                        error = e
+        finally:
+            for task in pending:
+                task.cancel()
+        raise _RetryableError(
+            str(error), requests=2, retry_after=error.retry_after
+        ) from error.__cause__
+
+    def _hedge_delay(self) -> float | None:
+        if not self.hedge:
+            return None
+        threshold = self.latency_tracker.percentile(self.hedge_percentile)
+        if threshold is None:
+            return None
+        return max(self.hedge_min_delay, threshold)
+
+    async def _get(self, client: httpx.AsyncClient, url: str) -> str:
+        start = time.monotonic()
+        try:
+            async with client.stream("GET", url, headers={"User-Agent": USER_AGENT}) as response:
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    raise _RetryableError(
+                        f"HTTP {response.status_code}",
+                        retry_after=parse_retry_after(response.headers.get("retry-after")),
+                    )
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPStatusError as e:
+                    raise ScraperError(f"Failed to fetch {url}: {e}") from e
+                await response.aread()
+                self.latency_tracker.record(time.monotonic() - start)
+                return response.text
+        except httpx.TransportError as e:
+            raise _RetryableError(str(e) or type(e).__name__) from e
@@ -0,0 +1,163 @@
+"""In-memory typeahead over taxonomy node names and aliases.
+
+Built from a taxonomy snapshot (so it is rebuilt whenever the taxonomy
+changes) and queried without touching the database: a prefix trie answers
+"what the user is typing", a trigram index catches typos and mid-word
+fragments.
+"""
+
+import re
+from dataclasses import dataclass
+
+from sorting_hat.services.taxonomy_snapshot import NodeView, TaxonomySnapshot
+
+_WORD = re.compile(r"[a-z0-9]+")
+_PARENTHETICAL = re.compile(r"\s*\(([^)]*)\)")
+_STOP_WORDS = frozenset({"and", "of", "the", "for", "to", "in", "on", "a", "an"})
+
+
+def normalize(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def aliases(name: str) -> set[str]:
+    """Alternative spellings for a node name, e.g. for
+    'Identity & Access Management (IAM)': 'identity access management', 'iam'.
+
+    Parenthesised text becomes its own alias, so do the halves of slashed words
+    ('CI/CD' -> 'ci', 'cd'), and multi-word names get an acronym.
+    """
+    found = {normalize(name)}
+    base = _PARENTHETICAL.sub("", name)
+    found.add(normalize(base))
+    found.update(normalize(inner) for inner in _PARENTHETICAL.findall(name))
+    for word in base.split():
+        if "/" in word:
+            found.update(normalize(part) for part in word.split("/"))
+    words = [w for w in _WORD.findall(base.lower()) if w not in _STOP_WORDS]
+    if len(words) >= 2:
+        found.add("".join(w[0] for w in words))
+    found.discard("")
+    return found
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.ids: set[str] = set()  # every node with a term starting with this prefix
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    node: NodeView
+    breadcrumb: str
+    score: float
+
+
+class SuggestIndex:
+    def __init__(self, snapshot: TaxonomySnapshot, min_similarity: float = 0.3):
+        self.snapshot = snapshot
+        self.etag = snapshot.etag
+        self.min_similarity = min_similarity
+        self.terms: dict[str, set[str]] = {}  # node id -> normalized name and aliases
+        self._trie = _TrieNode()
+        self._trigrams: dict[str, set[str]] = {}
+        self._node_trigrams: dict[str, list[set[str]]] = {}  # per term and per word
+        for node in snapshot.nodes:
+            terms = self.terms[node.id] = aliases(node.name)
+            grams = self._node_trigrams[node.id] = []
+            for term in terms:
+                words = term.split()
+                # Whole terms and single words, so "contaner" still finds "container ...".
+                grams.append(trigrams(term))
+                grams.extend(trigrams(word) for word in words)
+                for gram in grams[-1 - len(words) :]:
+                    for g in gram:
+                        self._trigrams.setdefault(g, set()).add(node.id)
+                # Index the term from each word on, so "mana" finds "... management".
+                for i in range(len(words)):
+                    self._insert(" ".join(words[i:]), node.id)
+
+    def _insert(self, term: str, node_id: str) -> None:
+        current = self._trie
+        current.ids.add(node_id)
+        for char in term:
+            current = current.children.setdefault(char, _TrieNode())
+            current.ids.add(node_id)
+
+    def _prefixed(self, prefix: str) -> set[str]:
+        current = self._trie
+        for char in prefix:
+            current = current.children.get(char)
+            if current is None:
+                return set()
+        return current.ids
+
+    def _similarity(self, query_grams: set[str], node_id: str) -> float:
+        best = 0.0
+        for grams in self._node_trigrams[node_id]:
+            shared = len(query_grams & grams)
+            best = max(best, shared / (len(query_grams) + len(grams) - shared))
+        return best
+
+    def suggest(self, query: str, limit: int = 10) -> list[Suggestion]:
+        q = normalize(query)
+        if not q:
+            return []
+        scores: dict[str, float] = {}
+
+        # Prefix matches: every query word must start some word of the node's terms.
+        words = q.split()
+        ids = set(self._prefixed(words[0]))
+        for word in words[1:]:
+            ids &= self._prefixed(word)
+        whole = self._prefixed(q)
+        for node_id in ids:
+            terms = self.terms[node_id]
+            score = 2.0
+            if node_id in whole:
+                score += 0.5  # the query matches as a phrase
+            if any(term.startswith(q) for term in terms):
+                score += 0.5  # ...at the start of the name or an alias
+            if q in terms:
+                score += 1.0  # exact name or alias, e.g. an acronym
+            scores[node_id] = score
+
+        # Trigram matches for typos and fragments the trie cannot reach.
+        grams = trigrams(q)
+        candidates = set().union(*(self._trigrams.get(g, ()) for g in grams)) - scores.keys()
+        for node_id in candidates:
+            similarity = self._similarity(grams, node_id)
+            if similarity >= self.min_similarity:
+                scores[node_id] = similarity
+
+        nodes = self.snapshot.by_id
+        ranked = sorted(
+            scores, key=lambda i: (-scores[i], nodes[i].level, nodes[i].name)
+        )[:limit]
+        return [
+            Suggestion(nodes[i], self.snapshot.resolve_node_path(i), round(scores[i], 3))
+            for i in ranked
+        ]
+
+
+_current: SuggestIndex | None = None
+
+
+def suggest_index(snapshot: TaxonomySnapshot) -> SuggestIndex:
+    """The index for this snapshot's taxonomy, rebuilt only when its content changes.
+
+    Keyed on the ETag, so a periodic reload of an unchanged taxonomy keeps the index.
+    """
+    global _current
+    index = _current
+    if index is None or index.etag != snapshot.etag:
+        index = _current = SuggestIndex(snapshot)
+    return index
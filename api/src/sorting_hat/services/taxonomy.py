@@ -1,16 +1,25 @@
 import re
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import case, func, literal, literal_column, select, tuple_, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
+from sorting_hat.models.ltree import Ltree
 from sorting_hat.models.taxonomy import Branch, GovernanceGroup, TaxonomyNode
 from sorting_hat.schemas.taxonomy import (
     GovernanceGroupCreate,
     GovernanceGroupUpdate,
+    TaxonomyBulkImportResult,
     TaxonomyNodeCreate,
+    TaxonomyNodeImport,
     TaxonomyNodeUpdate,
 )
+from sorting_hat.services.taxonomy_snapshot import TAXONOMY_CHANGED
 
 
 def slugify(text: str) -> str:
@@ -21,10 +30,44 @@ class TaxonomyServiceError(Exception):
     pass
 
 
+_LABEL = re.compile(r"^[A-Za-z0-9_]+$")
+# Rows per INSERT statement in bulk imports; keeps parameters well under asyncpg's limit.
+_BULK_CHUNK = 500
+# Columns a bulk import may change on an existing node; its path (and so parent,
+# level and branch) is the key. Only the ones an import item supplies are updated.
+_UPSERT_COLUMNS = (
+    "governance_group_id",
+    "name",
+    "slug",
+    "definition",
+    "distinguishing_characteristics",
+    "inclusions",
+    "exclusions",
+    "sort_order",
+)
+
+
+def _flatten(
+    items: Iterable[TaxonomyNodeImport], parent_path: str | None = None
+) -> Iterator[tuple[str, TaxonomyNodeImport]]:
+    for item in items:
+        path = item.path or (f"{parent_path}.{slugify(item.name)}" if parent_path else None)
+        if path is None:
+            raise TaxonomyServiceError(f"Top-level node '{item.name}' needs a path")
+        if parent_path and path.rpartition(".")[0] != parent_path:
+            raise TaxonomyServiceError(f"'{path}' is not directly under '{parent_path}'")
+        yield path, item
+        yield from _flatten(item.children, path)
+
+
 class TaxonomyService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    def _changed(self) -> None:
+        # The read snapshot is rebuilt once this session commits.
+        self.session.info[TAXONOMY_CHANGED] = True
+
     # --- Governance Groups ---
 
     async def list_governance_groups(self) -> list[GovernanceGroup]:
@@ -42,6 +85,7 @@ class TaxonomyService:
     async def create_governance_group(self, data: GovernanceGroupCreate) -> GovernanceGroup:
         group = GovernanceGroup(**data.model_dump())
         self.session.add(group)
+        self._changed()
         await self.session.flush()
         return group
 
@@ -53,6 +97,7 @@ class TaxonomyService:
             return None
         for field, value in data.model_dump(exclude_unset=True).items():
             setattr(group, field, value)
+        self._changed()
         await self.session.flush()
         return group
 
@@ -67,6 +112,7 @@ class TaxonomyService:
         if result.scalar_one_or_none():
             raise TaxonomyServiceError("Cannot delete group with existing nodes")
         await self.session.delete(group)
+        self._changed()
         await self.session.flush()
         return True
 
@@ -126,18 +172,205 @@ class TaxonomyService:
             sort_order=data.sort_order,
         )
         self.session.add(node)
+        self._changed()
         await self.session.flush()
         return node
 
+    async def bulk_upsert_nodes(
+        self, items: list[TaxonomyNodeImport]
+    ) -> TaxonomyBulkImportResult:
+        """Create or update many nodes, keyed by path, in one transaction.
+
+        Parents, branches and governance groups are resolved in memory against
+        one read of the existing tree; rows are then written with multi-row
+        INSERT ... ON CONFLICT (path) DO UPDATE, which skips rows that would not
+        change and reports whether each written row was inserted (xmax = 0).
+        Existing nodes only get the fields an item supplies, and a top-level node
+        moved to another governance group takes its whole subtree along.
+        """
+        imports: dict[str, TaxonomyNodeImport] = {}
+        for path, item in _flatten(items):
+            if path in imports:
+                raise TaxonomyServiceError(f"Duplicate path '{path}'")
+            imports[path] = item
+
+        groups = dict(
+            (await self.session.execute(select(GovernanceGroup.slug, GovernanceGroup.id))).all()
+        )
+        # path -> (id, governance_group_id), for existing nodes and then for imported ones
+        resolved = {
+            path: (node_id, group_id)
+            for node_id, path, group_id in await self.session.execute(
+                select(TaxonomyNode.id, TaxonomyNode.path, TaxonomyNode.governance_group_id)
+            )
+        }
+
+        now = datetime.now(timezone.utc)
+        # Rows grouped by depth and the columns they may update, one INSERT ... ON CONFLICT
+        # per group; groups are created (and so written) shallowest first.
+        batches: dict[tuple[int, tuple[str, ...]], list[dict]] = {}
+        regrouped: dict[str, str] = {}  # path of an existing top-level node -> new group id
+        for path in sorted(imports, key=lambda p: p.count(".")):  # parents first
+            item = imports[path]
+            labels = path.split(".")
+            if len(labels) < 2 or not all(_LABEL.match(label) for label in labels):
+                raise TaxonomyServiceError(f"Invalid path '{path}'")
+            if labels[0] not in Branch.__members__:
+                raise TaxonomyServiceError(
+                    f"'{path}' must start with a branch: software or hardware"
+                )
+            existing_id, existing_group_id = resolved.get(path, (None, None))
+
+            parent_id = None
+            if len(labels) == 2:
+                group_id = groups.get(item.governance_group) or existing_group_id
+                if item.governance_group and item.governance_group not in groups:
+                    raise TaxonomyServiceError(
+                        f"Governance group '{item.governance_group}' not found"
+                    )
+                if group_id is None:
+                    raise TaxonomyServiceError(
+                        f"Top-level node '{path}' needs a governance_group"
+                    )
+                if existing_group_id and group_id != existing_group_id:
+                    regrouped[path] = group_id
+            else:
+                parent_path = path.rpartition(".")[0]
+                if parent_path not in resolved:
+                    raise TaxonomyServiceError(f"Parent '{parent_path}' of '{path}' not found")
+                parent_id, group_id = resolved[parent_path]
+
+            node_id = existing_id or str(uuid4())
+            resolved[path] = (node_id, group_id)
+            supplied = set(item.model_fields_set)
+            if parent_id is not None or item.governance_group:
+                supplied.add("governance_group_id")
+            columns = tuple(name for name in _UPSERT_COLUMNS if name in supplied)
+            batches.setdefault((len(labels), columns), []).append(
+                {
+                    "id": node_id,
+                    "governance_group_id": group_id,
+                    "parent_id": parent_id,
+                    "path": path,
+                    "name": item.name,
+                    "slug": item.slug or labels[-1],
+                    "level": len(labels),
+                    "branch": Branch(labels[0]),
+                    "definition": item.definition,
+                    "distinguishing_characteristics": item.distinguishing_characteristics,
+                    "inclusions": item.inclusions,
+                    "exclusions": item.exclusions,
+                    "sort_order": item.sort_order,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+
+        created = updated = total = 0
+        table = TaxonomyNode.__table__
+        try:
+            for (_, columns), rows in batches.items():
+                total += len(rows)
+                for start in range(0, len(rows), _BULK_CHUNK):
+                    stmt = insert(table).values(rows[start : start + _BULK_CHUNK])
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[table.c.path],
+                        set_={
+                            **{name: stmt.excluded[name] for name in columns},
+                            "updated_at": stmt.excluded.updated_at,
+                        },
+                        where=tuple_(*(table.c[name] for name in columns)).is_distinct_from(
+                            tuple_(*(stmt.excluded[name] for name in columns))
+                        ),
+                    ).returning(literal_column("xmax = 0"))
+                    for (inserted,) in await self.session.execute(stmt):
+                        created += inserted
+                        updated += not inserted
+        except IntegrityError as e:
+            raise TaxonomyServiceError(f"Import conflicts with existing nodes: {e.orig}") from e
+        for path, group_id in regrouped.items():
+            # Descendants always share their top-level node's group (see create_node).
+            await self.session.execute(
+                update(TaxonomyNode)
+                .where(
+                    TaxonomyNode.path.descendant_of(path),
+                    TaxonomyNode.governance_group_id != group_id,
+                )
+                .values(governance_group_id=group_id, updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+        if created or updated:
+            self._changed()
+        return TaxonomyBulkImportResult(
+            created=created, updated=updated, unchanged=total - created - updated
+        )
+
     async def update_node(self, node_id: str, data: TaxonomyNodeUpdate) -> TaxonomyNode | None:
         node = await self.get_node(node_id)
         if not node:
             return None
         for field, value in data.model_dump(exclude_unset=True).items():
             setattr(node, field, value)
+        self._changed()
         await self.session.flush()
         return node
 
+    async def move_node(self, node_id: str, new_parent_id: str) -> TaxonomyNode | None:
+        """Re-parent a node, rewriting path, level and governance group for its whole subtree.
+
+        The subtree is rewritten by a single set-based UPDATE:
+        path = new_parent.path || subpath(path, depth_of_node - 1).
+        """
+        result = await self.session.execute(
+            select(TaxonomyNode).where(TaxonomyNode.id.in_([node_id, new_parent_id]))
+        )
+        by_id = {n.id: n for n in result.scalars().all()}
+        node = by_id.get(node_id)
+        if not node:
+            return None
+        parent = by_id.get(new_parent_id)
+        if not parent or node_id == new_parent_id:
+            raise TaxonomyServiceError("New parent node not found")
+        if parent.path == node.path or parent.path.startswith(f"{node.path}."):
+            raise TaxonomyServiceError("Cannot move a node under itself or its descendants")
+        if parent.branch != node.branch:
+            raise TaxonomyServiceError("Node branch must match parent branch")
+        if node.parent_id == parent.id:
+            return node
+
+        old_path = node.path
+        parent_id_type = TaxonomyNode.__table__.c.parent_id.type
+        new_path = literal(parent.path, Ltree()).op("||", return_type=Ltree())(
+            func.subpath(TaxonomyNode.path, old_path.count("."))
+        )
+        try:
+            await self.session.execute(
+                update(TaxonomyNode)
+                .where(TaxonomyNode.path.descendant_of(old_path))
+                .values(
+                    path=new_path,
+                    level=func.nlevel(new_path),
+                    governance_group_id=parent.governance_group_id,
+                    parent_id=case(
+                        (TaxonomyNode.id == node.id, literal(parent.id, parent_id_type)),
+                        else_=TaxonomyNode.parent_id,
+                    ),
+                    updated_at=func.now(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+        except IntegrityError as e:
+            raise TaxonomyServiceError(
+                "The new parent already has a child with this name or path"
+            ) from e
+        self._changed()
+        result = await self.session.execute(
+            select(TaxonomyNode)
+            .where(TaxonomyNode.id == node_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one()
+
     async def delete_node(self, node_id: str) -> bool:
         node = await self.get_node(node_id)
         if not node:
@@ -145,76 +378,95 @@ class TaxonomyService:
         if node.children:
             raise TaxonomyServiceError("Cannot delete node with children — delete leaves first")
         await self.session.delete(node)
+        self._changed()
         await self.session.flush()
         return True
 
-    async def get_subtree(self, node_id: str) -> list[TaxonomyNode]:
+    async def get_subtree(self, node_id: str, depth: int | None = None) -> list[TaxonomyNode]:
+        """The node and its descendants, optionally only `depth` levels below it.
+
+        Both forms (`<@` and an lquery like 'a.b.*{0,2}') are answered by the GiST
+        index on path, and unlike a prefix LIKE they never match 'a.bc' under 'a.b'.
+        """
         node = await self.get_node(node_id)
         if not node:
             return []
-        # Use path prefix matching (works with ltree-style dot-separated paths)
+        if depth is None:
+            condition = TaxonomyNode.path.descendant_of(node.path)
+        else:
+            condition = TaxonomyNode.path.lquery(f"{node.path}.*{{0,{depth}}}")
         result = await self.session.execute(
             select(TaxonomyNode)
-            .where(TaxonomyNode.path.like(f"{node.path}%"))
+            .where(condition)
             .order_by(TaxonomyNode.path, TaxonomyNode.sort_order)
         )
         return list(result.scalars().all())
 
     async def get_parent_chain(self, node_id: str) -> list[TaxonomyNode]:
-        chain = []
-        node = await self.get_node(node_id)
-        while node and node.parent_id:
-            result = await self.session.execute(
-                select(TaxonomyNode).where(TaxonomyNode.id == node.parent_id)
-            )
-            node = result.scalar_one_or_none()
-            if node:
-                chain.insert(0, node)
-        return chain
+        """Ancestors from root to parent, fetched in one query with ltree `@>`."""
+        node = aliased(TaxonomyNode)
+        result = await self.session.execute(
+            select(TaxonomyNode)
+            .join(node, TaxonomyNode.path.ancestor_of(node.path))
+            .where(node.id == node_id, TaxonomyNode.id != node.id)
+            .order_by(TaxonomyNode.level)
+        )
+        return list(result.scalars().all())
 
     async def resolve_node_path(self, node_id: str) -> str | None:
         """Build a human-readable path like 'Software > Content & Media > Media Production'."""
-        node = await self.get_node(node_id)
-        if not node:
-            return None
-        chain = await self.get_parent_chain(node_id)
-        names = [n.name for n in chain] + [node.name]
-        return " > ".join(names)
+        return (await self.resolve_node_paths([node_id])).get(node_id)
+
+    async def resolve_node_paths(self, node_ids: Iterable[str]) -> dict[str, str]:
+        """Resolve many node IDs to human-readable paths in one query. Unknown IDs are omitted."""
+        ids = list(set(node_ids))
+        if not ids:
+            return {}
+        node = aliased(TaxonomyNode)
+        result = await self.session.execute(
+            select(
+                node.id,
+                func.string_agg(
+                    TaxonomyNode.name, aggregate_order_by(literal(" > "), TaxonomyNode.level)
+                ),
+            )
+            .join(node, TaxonomyNode.path.ancestor_of(node.path))
+            .where(node.id.in_(ids))
+            .group_by(node.id)
+        )
+        return dict(result.all())
 
     async def search_nodes(self, query: str) -> list[TaxonomyNode]:
-        pattern = f"%{query}%"
+        """Ranked search: full-text over the weighted search_vector, plus trigram matching
+        on names for partial words and typos. Returns ancestors (by path), then matches
+        (best first), so the tree renders."""
+        tsquery = func.websearch_to_tsquery("english", query)
+        rank = func.ts_rank(TaxonomyNode.search_vector, tsquery) + func.similarity(
+            TaxonomyNode.name, query
+        )
         result = await self.session.execute(
             select(TaxonomyNode)
             .where(
-                TaxonomyNode.name.ilike(pattern)
-                | TaxonomyNode.definition.ilike(pattern)
-                | TaxonomyNode.distinguishing_characteristics.ilike(pattern)
+                TaxonomyNode.search_vector.bool_op("@@")(tsquery)
+                | TaxonomyNode.name.bool_op("%")(query)
+                | TaxonomyNode.name.ilike(f"%{query}%")
             )
-            .order_by(TaxonomyNode.path)
+            .order_by(rank.desc(), TaxonomyNode.path)
             .limit(50)
         )
         matches = list(result.scalars().all())
+        if not matches:
+            return []
 
-        # Collect all ancestor IDs needed to build complete tree paths
-        seen_ids = {n.id for n in matches}
-        missing_parent_ids = {
-            n.parent_id for n in matches if n.parent_id and n.parent_id not in seen_ids
-        }
-
-        ancestors: list[TaxonomyNode] = []
-        while missing_parent_ids:
-            result = await self.session.execute(
-                select(TaxonomyNode).where(TaxonomyNode.id.in_(missing_parent_ids))
-            )
-            batch = list(result.scalars().all())
-            if not batch:
-                break
-            ancestors.extend(batch)
-            seen_ids.update(n.id for n in batch)
-            missing_parent_ids = {
-                n.parent_id for n in batch if n.parent_id and n.parent_id not in seen_ids
-            }
-
-        # Return ancestors first (sorted by path), then matches (sorted by path)
-        ancestors.sort(key=lambda n: n.path)
+        # Every ancestor of every match that is not itself a match, in one query
+        match_ids = [n.id for n in matches]
+        node = aliased(TaxonomyNode)
+        result = await self.session.execute(
+            select(TaxonomyNode)
+            .join(node, TaxonomyNode.path.ancestor_of(node.path))
+            .where(node.id.in_(match_ids), TaxonomyNode.id.not_in(match_ids))
+            .distinct()
+            .order_by(TaxonomyNode.path)
+        )
+        ancestors = list(result.scalars().all())
         return ancestors + matches
@@ -0,0 +1,360 @@
+"""A process-wide, immutable in-memory copy of the taxonomy for read endpoints.
+
+The taxonomy is a few hundred rows that change a few times a day, so reads are
+served from a snapshot loaded with two queries and indexed by id, path and
+parent. Writes made through TaxonomyService mark the session; once it commits,
+the snapshot is invalidated and the next read swaps in a fresh one. Other
+worker processes pick up the change when their snapshot's TTL runs out.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime
+from types import MappingProxyType
+from typing import Awaitable, Callable, Iterable, Mapping
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from sorting_hat.config import settings
+from sorting_hat.db import async_session
+from sorting_hat.models.taxonomy import Branch, GovernanceGroup, TaxonomyNode
+
+try:
+    import brotli
+except ImportError:  # optional: pip install sorting-hat[brotli]
+    brotli = None
+
+# Set on a session's info by TaxonomyService writes; checked after commit.
+TAXONOMY_CHANGED = "taxonomy_changed"
+
+
+@dataclass(frozen=True)
+class GroupView:
+    id: str
+    name: str
+    slug: str
+    description: str
+    covers_software: bool
+    covers_hardware: bool
+    sort_order: int
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(frozen=True)
+class NodeView:
+    id: str
+    governance_group_id: str
+    parent_id: str | None
+    path: str
+    name: str
+    slug: str
+    level: int
+    branch: Branch
+    definition: str
+    distinguishing_characteristics: str
+    inclusions: str
+    exclusions: str
+    sort_order: int
+    created_at: datetime
+    updated_at: datetime
+
+
+def _copy(view: type, row) -> object:
+    return view(**{f.name: getattr(row, f.name) for f in fields(view)})
+
+
+def _node_order(node: NodeView) -> tuple:
+    return (node.path, node.sort_order)
+
+
+TREE_FIELDS = tuple(f.name for f in fields(NodeView))
+
+
+@dataclass(frozen=True)
+class TreePayload:
+    """A nested tree serialized to JSON once, with pre-compressed copies."""
+
+    json: bytes
+    gzip: bytes
+    br: bytes | None  # None when brotli is not installed
+
+    def encodings(self) -> tuple[str, ...]:
+        """Available content-codings, in the server's order of preference."""
+        return ("br", "gzip") if self.br is not None else ("gzip",)
+
+    def body(self, encoding: str | None) -> bytes:
+        return {"br": self.br, "gzip": self.gzip}.get(encoding) or self.json
+
+    @classmethod
+    def encode(cls, tree: list[dict]) -> "TreePayload":
+        raw = json.dumps(tree, separators=(",", ":"), default=str).encode()
+        return cls(
+            json=raw,
+            gzip=gzip.compress(raw, mtime=0),
+            br=brotli.compress(raw) if brotli is not None else None,
+        )
+
+
+class TaxonomySnapshot:
+    """Read-only view of every governance group and node at one taxonomy version."""
+
+    def __init__(self, version: int, groups: Iterable[GroupView], nodes: Iterable[NodeView]):
+        self.version = version
+        self.groups: tuple[GroupView, ...] = tuple(sorted(groups, key=lambda g: g.sort_order))
+        self.nodes: tuple[NodeView, ...] = tuple(sorted(nodes, key=_node_order))
+        self.groups_by_slug: Mapping[str, GroupView] = MappingProxyType(
+            {g.slug: g for g in self.groups}
+        )
+        self.by_id: Mapping[str, NodeView] = MappingProxyType({n.id: n for n in self.nodes})
+        self.by_path: Mapping[str, NodeView] = MappingProxyType({n.path: n for n in self.nodes})
+
+        children: dict[str | None, list[NodeView]] = {}
+        for node in self.nodes:
+            children.setdefault(node.parent_id, []).append(node)
+        self.children: Mapping[str | None, tuple[NodeView, ...]] = MappingProxyType(
+            {
+                parent_id: tuple(sorted(kids, key=lambda n: (n.sort_order, n.name)))
+                for parent_id, kids in children.items()
+            }
+        )
+
+        ancestors: dict[str, tuple[NodeView, ...]] = {}
+        for node in self.nodes:  # path order: a parent's chain is built before its children's
+            parent = self.by_id.get(node.parent_id) if node.parent_id else None
+            ancestors[node.id] = (ancestors.get(parent.id, ()) + (parent,)) if parent else ()
+        self.ancestors: Mapping[str, tuple[NodeView, ...]] = MappingProxyType(ancestors)
+
+        descendants = dict.fromkeys(self.by_id, 0)
+        for node in reversed(self.nodes):  # children before parents
+            if node.parent_id in descendants:
+                descendants[node.parent_id] += 1 + descendants[node.id]
+        self.descendant_counts: Mapping[str, int] = MappingProxyType(descendants)
+
+        # Derived from content rather than `version`, so every worker process
+        # produces the same ETag for the same taxonomy.
+        digest = hashlib.sha256()
+        for row in (*self.groups, *self.nodes):
+            digest.update(f"{row.id}:{row.updated_at.isoformat()}\n".encode())
+        self.etag = f'"{digest.hexdigest()[:32]}"'
+        self._tree_payloads: dict[tuple, TreePayload] = {}
+
+    @classmethod
+    def from_rows(
+        cls, version: int, groups: Iterable[GovernanceGroup], nodes: Iterable[TaxonomyNode]
+    ) -> "TaxonomySnapshot":
+        return cls(
+            version,
+            [_copy(GroupView, g) for g in groups],
+            [_copy(NodeView, n) for n in nodes],
+        )
+
+    def get_group(self, slug: str) -> GroupView | None:
+        return self.groups_by_slug.get(slug)
+
+    def get_node(self, node_id: str) -> NodeView | None:
+        return self.by_id.get(node_id)
+
+    def list_nodes(
+        self,
+        branch: str | None = None,
+        governance_group_slug: str | None = None,
+        max_depth: int | None = None,
+    ) -> list[NodeView]:
+        """Same filters and ordering as TaxonomyService.list_nodes."""
+        group = self.get_group(governance_group_slug) if governance_group_slug else None
+        if governance_group_slug and group is None:
+            return []
+        return [
+            n
+            for n in self.nodes
+            if (branch is None or n.branch == branch)
+            and (group is None or n.governance_group_id == group.id)
+            and (max_depth is None or n.level <= max_depth)
+        ]
+
+    def get_children(self, node_id: str | None) -> tuple[NodeView, ...]:
+        return self.children.get(node_id, ())
+
+    def child_count(self, node_id: str) -> int:
+        return len(self.get_children(node_id))
+
+    def descendant_count(self, node_id: str) -> int:
+        return self.descendant_counts.get(node_id, 0)
+
+    def get_subtree(self, node_id: str, depth: int | None = None) -> list[NodeView]:
+        """The node and its descendants (down to `depth` levels below it), in path order."""
+        node = self.get_node(node_id)
+        if node is None:
+            return []
+        subtree = []
+        stack = [(node, 0)]
+        while stack:
+            current, below = stack.pop()
+            subtree.append(current)
+            if depth is None or below < depth:
+                stack.extend((child, below + 1) for child in self.get_children(current.id))
+        return sorted(subtree, key=_node_order)
+
+    def get_parent_chain(self, node_id: str) -> list[NodeView]:
+        return list(self.ancestors.get(node_id, ()))
+
+    def tree(
+        self, fields: Iterable[str] = TREE_FIELDS, max_depth: int | None = None
+    ) -> list[dict]:
+        """Root nodes with nested `children`, limited to `fields` and levels <= max_depth."""
+        names = [name for name in TREE_FIELDS if name in set(fields)]
+
+        def build(node: NodeView) -> dict:
+            item = {name: getattr(node, name) for name in names}
+            if "branch" in item:
+                item["branch"] = node.branch.value
+            if max_depth is None or node.level < max_depth:
+                item["children"] = [build(child) for child in self.get_children(node.id)]
+            else:
+                item["children"] = []
+            return item
+
+        return [build(root) for root in self.get_children(None)]
+
+    def tree_payload(
+        self, fields: Iterable[str] = TREE_FIELDS, max_depth: int | None = None
+    ) -> TreePayload:
+        """The encoded tree, built once per snapshot for each fields/max_depth combination."""
+        fields = frozenset(fields) | {"id"}
+        key = (fields, max_depth)
+        payload = self._tree_payloads.get(key)
+        if payload is None:
+            if len(self._tree_payloads) >= 64:  # arbitrary field sets must not grow this forever
+                self._tree_payloads.clear()
+            payload = self._tree_payloads[key] = TreePayload.encode(self.tree(fields, max_depth))
+        return payload
+
+    def resolve_node_path(self, node_id: str) -> str | None:
+        """Build a human-readable path like 'Software > Content & Media > Media Production'."""
+        node = self.get_node(node_id)
+        if node is None:
+            return None
+        return " > ".join([n.name for n in self.ancestors[node_id]] + [node.name])
+
+
+Loader = Callable[[int], Awaitable[TaxonomySnapshot]]
+
+
+async def load_snapshot(version: int) -> TaxonomySnapshot:
+    async with async_session() as session:
+        groups = (await session.execute(select(GovernanceGroup))).scalars().all()
+        nodes = (await session.execute(select(TaxonomyNode))).scalars().all()
+        return TaxonomySnapshot.from_rows(version, groups, nodes)
+
+
+class TaxonomySnapshotCache:
+    """Holds the current snapshot; rebuilds it once per version (or after `ttl` seconds)."""
+
+    def __init__(self, ttl: float = 60.0, loader: Loader = load_snapshot):
+        self.ttl = ttl
+        self.loader = loader
+        self.version = 0
+        self._snapshot: TaxonomySnapshot | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self.version += 1
+
+    def _fresh(self) -> bool:
+        snapshot = self._snapshot
+        return (
+            snapshot is not None
+            and snapshot.version == self.version
+            and (not self.ttl or time.monotonic() - self._loaded_at < self.ttl)
+        )
+
+    async def get(self) -> TaxonomySnapshot:
+        if self._fresh():
+            return self._snapshot
+        async with self._lock:
+            if not self._fresh():
+                version = self.version
+                loaded_at = time.monotonic()
+                snapshot = await self.loader(version)
+                # Swapped in whole; readers holding the old snapshot keep a consistent view.
+                self._snapshot, self._loaded_at = snapshot, loaded_at
+        return self._snapshot
+
+
+taxonomy_snapshot = TaxonomySnapshotCache(ttl=settings.taxonomy_snapshot_ttl)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(TAXONOMY_CHANGED, False):
+        taxonomy_snapshot.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_changes(session: Session) -> None:
+    session.info.pop(TAXONOMY_CHANGED, None)
+
+
+async def get_snapshot() -> TaxonomySnapshot:
+    """The current taxonomy snapshot."""
+    return await taxonomy_snapshot.get()
+
+
+def encoded_etag(etag: str, encoding: str | None) -> str:
+    """A strong ETag for one content-coding of a representation, e.g. '"<digest>-br"'.
+
+    Strong validators must differ between codings (RFC 9110), or a cache could
+    answer a revalidation with a body in the wrong encoding.
+    """
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def _etag_version(tag: str) -> str:
+    tag = tag.strip().removeprefix("W/")
+    for encoding in ("br", "gzip"):
+        if tag.endswith(f'-{encoding}"'):
+            return f'{tag[: -len(encoding) - 2]}"'
+    return tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison, per RFC 9110).
+
+    Any content-coding of the same version matches, since all of them are current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    version = _etag_version(etag)
+    return any(_etag_version(tag) == version for tag in if_none_match.split(","))
+
+
+def negotiate_encoding(accept_encoding: str | None, available: Iterable[str]) -> str | None:
+    """The first of `available` the client accepts with q > 0; None means identity."""
+    weights: dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    for encoding in available:
+        if weights.get(encoding, weights.get("*", 0.0)) > 0:
+            return encoding
+    return None
@@ -0,0 +1,72 @@
+from sorting_hat.cassette import (
+    Cassette,
+    CassetteWriter,
+    RecordingProvider,
+    RecordingScraper,
+    ReplayProvider,
+    ReplayScraper,
+    cassette_scope,
+)
+from sorting_hat.llm.fake import FakeLLMProvider
+from sorting_hat.llm.provider import LLMMessage
+
+HTML = """<html><body><article><h1>Acme Endpoint Shield</h1>
+<p>Acme Endpoint Shield is an endpoint protection platform that detects and blocks
+malware, ransomware and fileless attacks on laptops and servers across the fleet.</p>
+<p>It includes device control, vulnerability assessment and automated response.</p>
+</article></body></html>"""
+
+
+async def test_llm_round_trip_exact_then_positional(tmp_path):
+    path = tmp_path / "cassette.jsonl.gz"
+    writer = CassetteWriter(path)
+    recorder = RecordingProvider(FakeLLMProvider(latency=0), writer)
+    with cassette_scope("https://example.com"):
+        recorded = await recorder.complete([LLMMessage("user", "summarize this page")], "m")
+    writer.close()
+
+    cassette = Cassette.load(path)
+    assert cassette.scopes() == ["https://example.com"]
+    replayer = ReplayProvider(cassette, latency_scale=0)
+    with cassette_scope("https://example.com"):
+        exact = await replayer.complete([LLMMessage("user", "summarize this page")], "m")
+    assert exact.content == recorded.content
+
+    # A changed prompt is still served, matched by its position in the scope.
+    longer = "summarize this page, in more detail please"
+    with cassette_scope("https://example.com"):
+        changed = await replayer.complete([LLMMessage("user", longer)], "m")
+    assert changed.content == recorded.content
+    assert changed.prompt_tokens > recorded.prompt_tokens
+    assert (cassette.stats.exact, cassette.stats.positional) == (1, 1)
+
+
+async def test_scraper_round_trip(tmp_path):
+    path = tmp_path / "cassette.jsonl.gz"
+    writer = CassetteWriter(path)
+    recorder = RecordingScraper(writer)
+
+    async def fake_get(client, url):
+        return HTML
+
+    recorder._get = fake_get
+    with cassette_scope("https://example.com"):
+        recorded = await recorder.scrape("https://example.com")
+    writer.close()
+
+    replayer = ReplayScraper(Cassette.load(path), latency_scale=0)
+    replayed = await replayer.scrape("https://example.com")
+    assert replayed.extracted_text == recorded.extracted_text
+    assert replayed.attempts == 1
+
+
+def test_writer_appends_across_reopens(tmp_path):
+    path = tmp_path / "cassette.jsonl.gz"
+    writer = CassetteWriter(path)
+    for i in range(100):
+        writer.write({"kind": "llm", "key": str(i)})
+    writer.close()
+    writer.write({"kind": "llm", "key": "after reopen"})
+    writer.close()
+    keys = [item["key"] for item in Cassette.load(path).interactions]
+    assert keys == [str(i) for i in range(100)] + ["after reopen"]
@@ -0,0 +1,98 @@
+import httpx
+import pytest
+from openai import APIStatusError
+
+from sorting_hat.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    CircuitState,
+)
+from sorting_hat.llm.circuit_breaker import CircuitBreakerProvider, is_provider_failure
+from sorting_hat.llm.provider import LLMProvider, LLMResponse
+from sorting_hat.services.scraper import Scraper, _RetryableError
+
+CONFIG = CircuitBreakerConfig(failure_rate=0.5, window=4, min_calls=4, cooldown=60.0)
+
+
+class FailingProvider(LLMProvider):
+    def __init__(self):
+        self.calls = 0
+
+    async def complete(self, messages, model, temperature=0.0, max_tokens=4096):
+        self.calls += 1
+        raise RuntimeError("provider down")
+
+
+def test_opens_after_failure_rate():
+    breaker = CircuitBreaker("llm", CONFIG)
+    for ok in (True, False, True):
+        breaker.record(0.1, ok=ok)
+    assert breaker.state == CircuitState.closed
+    breaker.record(0.1, ok=False)
+    assert breaker.state == CircuitState.open
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert 0 < exc.value.retry_after <= 60
+
+
+def test_slow_calls_count_as_failures():
+    config = CircuitBreakerConfig(window=2, min_calls=2, slow_call_seconds=1.0)
+    breaker = CircuitBreaker("llm", config)
+    breaker.record(5.0, ok=True)
+    breaker.record(5.0, ok=True)
+    assert breaker.state == CircuitState.open
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("llm", CONFIG)
+    breaker.state = CircuitState.open
+    breaker.opened_at = -1000.0  # cool-down long over
+
+    breaker.before_call()
+    assert breaker.state == CircuitState.half_open
+    # Only one probe at a time.
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record(0.1, ok=False)
+    assert breaker.state == CircuitState.open
+
+    breaker.opened_at = -1000.0
+    breaker.before_call()
+    breaker.record(0.1, ok=True)
+    assert breaker.state == CircuitState.closed
+
+
+def test_client_errors_do_not_count_against_provider():
+    request = httpx.Request("POST", "https://example.com")
+    response = httpx.Response(400, request=request)
+    assert not is_provider_failure(APIStatusError("bad", response=response, body=None))
+    assert is_provider_failure(TimeoutError())
+
+
+async def test_provider_fails_fast_once_open():
+    inner = FailingProvider()
+    provider = CircuitBreakerProvider(inner, CircuitBreakerRegistry(CONFIG), "openrouter")
+    for _ in range(4):
+        with pytest.raises(RuntimeError):
+            await provider.complete([], "claude")
+    with pytest.raises(CircuitOpenError):
+        await provider.complete([], "claude")
+    assert inner.calls == 4
+    assert provider.breakers.states() == {"openrouter/claude": "open"}
+
+
+async def test_scraper_breaker_is_per_host():
+    breakers = CircuitBreakerRegistry(CircuitBreakerConfig(window=1, min_calls=1))
+    scraper = Scraper(max_attempts=1, breakers=breakers)
+
+    async def failing_get(client, url):
+        raise _RetryableError("HTTP 503")
+
+    scraper._get = failing_get
+    with pytest.raises(Exception, match="after 1 attempts"):
+        await scraper.scrape("https://down.example.com/a")
+    with pytest.raises(CircuitOpenError):
+        await scraper.scrape("https://down.example.com/b")
+    assert breakers.states() == {"down.example.com": "open"}
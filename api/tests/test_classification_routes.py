@@ -1,6 +1,12 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
 from fastapi.testclient import TestClient
 
+from sorting_hat.db import get_session
 from sorting_hat.main import app
+from sorting_hat.models.classification import Classification
+from sorting_hat.pagination import encode_cursor
 
 client = TestClient(app)
 
@@ -9,3 +15,123 @@ def test_classification_routes_registered():
     routes = [route.path for route in app.routes]
     assert "/api/v1/classify" in routes
     assert "/api/v1/classify/{classification_id}" in routes
+
+
+def test_classification_stream_route_registered():
+    routes = [route.path for route in app.routes]
+    assert "/api/v1/classify/stream" in routes
+
+
+def test_unknown_provider_is_rejected():
+    with TestClient(app) as lifespan_client:
+        response = lifespan_client.post(
+            "/api/v1/classify", json={"url": "https://example.com", "provider": "nope"}
+        )
+    assert response.status_code == 400
+    assert "Unknown LLM provider" in response.json()["detail"]
+
+
+def test_list_llm_providers():
+    with TestClient(app) as lifespan_client:
+        response = lifespan_client.get("/api/v1/llm/providers")
+    assert response.status_code == 200
+    assert response.json()["default"] in response.json()["providers"]
+
+
+def test_list_classifications_uses_fixed_query_count():
+    page = [
+        Classification(
+            id=f"00000000-0000-0000-0000-00000000000{i}",
+            url=f"https://example.com/{i}",
+            product_summary="",
+            primary_node_id="p-id",
+            secondary_node_ids=["s-id", "missing"],
+            confidence_score=0.9,
+            model_used="m",
+            reasoning="",
+            created_at=datetime.now(timezone.utc),
+        )
+        for i in range(10)
+    ]
+    listing = MagicMock()
+    listing.scalars.return_value.all.return_value = page
+    paths = MagicMock()
+    paths.all.return_value = [("p-id", "Software > Security"), ("s-id", "Software > Data")]
+    session = AsyncMock()
+    session.execute.side_effect = [listing, paths]
+
+    async def fake_session():
+        yield session
+
+    app.dependency_overrides[get_session] = fake_session
+    try:
+        response = client.get("/api/v1/classify?limit=10")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert session.execute.await_count == 2
+    body = response.json()
+    assert len(body) == 10
+    assert body[0]["primary_node_path"] == "Software > Security"
+    assert body[0]["secondary_node_paths"] == ["Software > Data"]
+
+
+def test_list_classifications_returns_keyset_cursor():
+    rows = [
+        Classification(
+            id=f"00000000-0000-0000-0000-00000000000{i}",
+            url="https://example.com",
+            product_summary="",
+            primary_node_id=None,
+            secondary_node_ids=[],
+            confidence_score=None,
+            model_used="m",
+            reasoning="",
+            created_at=datetime(2026, 1, 3 - i, tzinfo=timezone.utc),
+        )
+        for i in range(3)
+    ]
+    listing = MagicMock()
+    listing.scalars.return_value.all.return_value = rows
+    session = AsyncMock()
+    session.execute.return_value = listing
+
+    async def fake_session():
+        yield session
+
+    app.dependency_overrides[get_session] = fake_session
+    try:
+        first = client.get("/api/v1/classify?limit=2")
+        cursor = first.headers["x-next-cursor"]
+        client.get("/api/v1/classify", params={"limit": 2, "cursor": cursor})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert len(first.json()) == 2
+    query = session.execute.await_args.args[0]
+    assert "(classifications.created_at, classifications.id) <" in str(query)
+    assert "OFFSET" not in str(query)
+
+
+def test_list_classifications_rejects_a_cursor_with_a_bad_id():
+    session = AsyncMock()
+
+    async def fake_session():
+        yield session
+
+    app.dependency_overrides[get_session] = fake_session
+    try:
+        cursor = encode_cursor("2026-01-01T00:00:00+00:00", "not-a-uuid")
+        response = client.get("/api/v1/classify", params={"cursor": cursor})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+    session.execute.assert_not_awaited()
+
+
+def test_list_classifications_rejects_a_zero_limit():
+    response = client.get("/api/v1/classify", params={"limit": 0})
+    assert response.status_code == 422
@@ -1,6 +1,10 @@
 import json
+from unittest.mock import AsyncMock, MagicMock
 
-from sorting_hat.services.classifier import ClassifierService
+from sorting_hat.llm.provider import LLMProvider, LLMResponse, LLMStreamChunk
+from sorting_hat.services import classifier
+from sorting_hat.services.classifier import ClassifierService, extract_primary
+from sorting_hat.services.scraper import ScrapeResult
 from sorting_hat.prompts import SUMMARIZE_SYSTEM, CLASSIFY_SYSTEM
 from sorting_hat.prompts.summarize import SUMMARIZE_USER
 from sorting_hat.prompts.classify import CLASSIFY_USER
@@ -64,3 +68,72 @@ def test_prompts_are_nonempty():
     assert len(CLASSIFY_SYSTEM) > 50
     assert "{summary}" in CLASSIFY_USER
     assert "{taxonomy}" in CLASSIFY_USER
+
+
+def test_extract_primary_waits_for_complete_object():
+    partial = '{"primary": {"node_id": "abc-123", "reasoning": "uses {braces} and \\"quotes\\"'
+    assert extract_primary(partial) is None
+    complete = partial + '"}, "secondaries": ['
+    assert extract_primary(complete) == {
+        "node_id": "abc-123",
+        "reasoning": 'uses {braces} and "quotes"',
+    }
+
+
+def test_extract_primary_without_primary_key():
+    assert extract_primary('{"secondaries": []}') is None
+
+
+class ScriptedProvider(LLMProvider):
+    """Streams a summary, then the given classify deltas."""
+
+    def __init__(self, classify_deltas: list[str]):
+        self.replies = [["A product."], classify_deltas]
+
+    async def complete(self, messages, model, temperature=0.0, max_tokens=4096):
+        raise NotImplementedError
+
+    async def complete_stream(self, messages, model, temperature=0.0, max_tokens=4096):
+        deltas = self.replies.pop(0)
+        for delta in deltas:
+            yield LLMStreamChunk(delta=delta)
+        response = LLMResponse(content="".join(deltas), model=model, tokens_used=0)
+        yield LLMStreamChunk(delta="", response=response)
+
+
+async def classify(classify_deltas: list[str]):
+    session = AsyncMock()
+    session.add = MagicMock()
+    scraper = AsyncMock()
+    scraper.scrape.return_value = ScrapeResult("<html>", "page text", 1)
+    service = ClassifierService(session, ScriptedProvider(classify_deltas), "m", scraper)
+    service._build_taxonomy_text = AsyncMock(return_value=("- [n1] Node", {"n1"}))
+    return (await service.classify_url("https://example.com")).classification
+
+
+async def test_streamed_primary_survives_an_unparseable_final_response():
+    classification = await classify(
+        ['{"primary": {"node_id": "n1", "reasoning": "fits"}', ', "secondaries": [']
+    )
+    assert classification.primary_node_id == "n1"
+    assert classification.reasoning == "fits"
+
+
+async def test_final_primary_must_be_a_taxonomy_node():
+    classification = await classify(['{"primary": {"node_id": "nope"}, "secondaries": []}'])
+    assert classification.primary_node_id is None
+    assert classification.reasoning == "Unknown primary node: nope"
+
+
+async def test_primary_is_only_looked_for_once_an_object_closes(monkeypatch):
+    calls = []
+
+    def counting_extract(partial):
+        calls.append(partial)
+        return extract_primary(partial)
+
+    monkeypatch.setattr(classifier, "extract_primary", counting_extract)
+    text = '{"primary": {"node_id": "n1", "reasoning": "fits"}, "secondaries": []}'
+    classification = await classify(list(text))  # one character per delta
+    assert classification.primary_node_id == "n1"
+    assert len(calls) == 1
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from openai import APIStatusError
+
+from sorting_hat.llm.balancer import BalancedProvider, Endpoint
+from sorting_hat.llm.provider import LLMProvider, LLMResponse
+
+
+class ScriptedProvider(LLMProvider):
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def complete(self, messages, model, temperature=0.0, max_tokens=4096):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("endpoint down")
+            return LLMResponse(content="ok", model=model, tokens_used=1)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.parametrize("strategy", ["least_outstanding", "power_of_two"])
+async def test_spreads_load_and_respects_concurrency(strategy):
+    replicas = [ScriptedProvider(delay=0.01) for _ in range(3)]
+    balancer = BalancedProvider(
+        [Endpoint(f"http://gpu{i}", p, max_concurrency=2) for i, p in enumerate(replicas)],
+        strategy=strategy,
+        health_check_interval=0,
+    )
+    responses = await asyncio.gather(*(balancer.complete([], "m") for _ in range(30)))
+    assert {r.backend for r in responses} == {"http://gpu0", "http://gpu1", "http://gpu2"}
+    assert all(p.peak <= 2 for p in replicas)
+    assert sum(p.calls for p in replicas) == 30
+
+
+async def test_failing_endpoint_is_ejected_and_retried_elsewhere():
+    down, up = ScriptedProvider(fail=True), ScriptedProvider()
+    balancer = BalancedProvider(
+        [Endpoint("down", down), Endpoint("up", up)], eject_after=2, health_check_interval=0
+    )
+    for _ in range(50):
+        response = await balancer.complete([], "m")
+        assert response.backend == "up"
+    assert down.calls == 2
+    assert not balancer.endpoints[0].healthy(time.monotonic())
+
+
+async def test_health_check_ejects_and_readmits():
+    healthy = True
+
+    async def check():
+        if not healthy:
+            raise RuntimeError("GET /models failed")
+
+    endpoint = Endpoint("gpu0", ScriptedProvider(), health_check=check)
+    other = Endpoint("gpu1", ScriptedProvider())
+    balancer = BalancedProvider([endpoint, other], health_check_interval=0)
+
+    healthy = False
+    await balancer.check(endpoint)
+    assert [balancer.pick().name for _ in range(10)] == ["gpu1"] * 10
+
+    healthy = True
+    await balancer.check(endpoint)
+    assert endpoint.ejected_until == 0.0
+
+
+async def test_client_errors_are_not_retried_on_other_endpoints():
+    request = httpx.Request("POST", "https://example.com")
+    bad_request = APIStatusError("bad", response=httpx.Response(400, request=request), body=None)
+
+    class RejectingProvider(ScriptedProvider):
+        async def complete(self, messages, model, temperature=0.0, max_tokens=4096):
+            self.calls += 1
+            raise bad_request
+
+    replicas = [RejectingProvider(), RejectingProvider()]
+    balancer = BalancedProvider(
+        [Endpoint(f"gpu{i}", p) for i, p in enumerate(replicas)], health_check_interval=0
+    )
+    with pytest.raises(APIStatusError):
+        await balancer.complete([], "m")
+    assert sum(p.calls for p in replicas) == 1
+
+
+async def test_freed_slot_wakes_waiters_that_can_use_it():
+    busy = [ScriptedProvider(delay=0.05), ScriptedProvider(delay=0.05)]
+    balancer = BalancedProvider(
+        [Endpoint(f"gpu{i}", p, max_concurrency=1) for i, p in enumerate(busy)],
+        health_check_interval=0,
+    )
+    # gpu0 frees first; a waiter excluding gpu0 must not swallow the wakeup.
+    first = await balancer._acquire(set())
+    second = await balancer._acquire(set())
+    picky = asyncio.create_task(balancer._acquire({first.name}))
+    anyone = asyncio.create_task(balancer._acquire(set()))
+    await asyncio.sleep(0)
+    await balancer._release(first)
+    assert (await asyncio.wait_for(anyone, timeout=1)) is first
+    await balancer._release(second)
+    assert (await asyncio.wait_for(picky, timeout=1)) is second
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import httpx
+
+from sorting_hat.llm.batch import BatchRequest, OpenAIBatchProvider, parse_output, to_jsonl
+from sorting_hat.llm.batch_server import create_batch_app
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse
+
+
+class EchoProvider(LLMProvider):
+    async def complete(self, messages, model, temperature=0.0, max_tokens=4096):
+        if messages[-1].content == "fail":
+            raise RuntimeError("model refused")
+        return LLMResponse(content=messages[-1].content.upper(), model=model, tokens_used=3)
+
+
+def test_to_jsonl_uses_batch_api_format():
+    request = BatchRequest("0", [LLMMessage("user", "hi")], model="gpt-4o-mini")
+    line = json.loads(to_jsonl([request]).decode().strip())
+    assert line["custom_id"] == "0"
+    assert line["url"] == "/v1/chat/completions"
+    assert line["body"]["messages"] == [{"role": "user", "content": "hi"}]
+
+
+def test_parse_output_reports_failed_requests():
+    ok_body = {
+        "model": "m",
+        "choices": [{"message": {"content": "ok"}}],
+        "usage": {"total_tokens": 7},
+    }
+    error_body = {"error": {"message": "boom"}}
+    lines = [
+        {"custom_id": "a", "response": {"status_code": 200, "body": ok_body}},
+        {"custom_id": "b", "response": {"status_code": 500, "body": error_body}},
+        {"custom_id": "c", "response": None, "error": {"message": "expired"}},
+    ]
+    results = parse_output("\n".join(json.dumps(line) for line in lines))
+    assert results["a"].response.content == "ok"
+    assert results["a"].response.tokens_used == 7
+    assert results["b"].error == "boom"
+    assert results["c"].error == "expired"
+
+
+async def test_batch_round_trip_through_local_server(tmp_path):
+    app = create_batch_app(tmp_path, EchoProvider())
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    provider = OpenAIBatchProvider(
+        api_key="test", base_url="http://batch.test/v1", http_client=http_client
+    )
+    requests = [
+        BatchRequest(str(i), [LLMMessage("user", text)], model="m")
+        for i, text in enumerate(["hello", "fail", "world"])
+    ]
+    results = await provider.complete_batch(requests, poll_interval=0.01, timeout=5)
+    await http_client.aclose()
+
+    assert results["0"].response.content == "HELLO"
+    assert results["2"].response.backend == "batch"
+    assert "model refused" in results["1"].error
+    assert list((tmp_path / "batches").iterdir())
+
+
+async def test_local_server_isolates_bad_lines_and_fails_broken_batches(tmp_path):
+    app = create_batch_app(tmp_path, EchoProvider())
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    good = to_jsonl([BatchRequest("ok", [LLMMessage("user", "hi")], model="m")])
+    uploaded = await client.post(
+        "/v1/files",
+        files={"file": ("in.jsonl", good + b"not json\n" + b'{"custom_id": "x"}\n')},
+        data={"purpose": "batch"},
+    )
+    batch = (
+        await client.post(
+            "/v1/batches",
+            json={"input_file_id": uploaded.json()["id"], "endpoint": "/v1/chat/completions"},
+        )
+    ).json()
+    await asyncio.gather(*app.state.tasks)
+    batch = (await client.get(f"/v1/batches/{batch['id']}")).json()
+    assert batch["status"] == "completed"
+    assert batch["request_counts"] == {"total": 3, "completed": 1, "failed": 2}
+    errors = (await client.get(f"/v1/files/{batch['error_file_id']}/content")).text
+    assert parse_output(errors)["x"].error.startswith("Malformed request line")
+
+    # Missing input (deleted after the batch was accepted) fails the batch instead of hanging.
+    file_id = uploaded.json()["id"]
+    (tmp_path / "files" / f"{file_id}.jsonl").unlink()
+    batch = (
+        await client.post(
+            "/v1/batches", json={"input_file_id": file_id, "endpoint": "/v1/chat/completions"}
+        )
+    ).json()
+    await asyncio.gather(*app.state.tasks)
+    assert (await client.get(f"/v1/batches/{batch['id']}")).json()["status"] == "failed"
+
+    traversal = await client.post(
+        "/v1/batches",
+        json={"input_file_id": "../../etc/passwd", "endpoint": "/v1/chat/completions"},
+    )
+    assert traversal.status_code == 404
+    await client.aclose()
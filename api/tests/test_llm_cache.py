@@ -0,0 +1,121 @@
+from sorting_hat.llm.cache import (
+    CachingProvider,
+    LLMCache,
+    MemoryCacheBackend,
+    bypass_cache,
+    cache_key,
+)
+from sorting_hat.llm.fake import FakeLLMProvider
+from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse
+from sorting_hat.llm.registry import ProviderRegistry
+
+MESSAGES = [LLMMessage(role="system", content="sys"), LLMMessage(role="user", content="hi")]
+
+
+class CountingProvider(LLMProvider):
+    def __init__(self):
+        self.calls = 0
+
+    async def complete(self, messages, model, temperature=0.0, max_tokens=4096):
+        self.calls += 1
+        return LLMResponse(content=f"answer {self.calls}", model=model, tokens_used=10)
+
+
+def test_cache_key_depends_on_all_parameters():
+    base = cache_key("m", MESSAGES, 0.0, 100)
+    assert base == cache_key("m", MESSAGES, 0.0, 100)
+    assert base != cache_key("other", MESSAGES, 0.0, 100)
+    assert base != cache_key("m", MESSAGES[:1], 0.0, 100)
+    assert base != cache_key("m", MESSAGES, 0.5, 100)
+    assert base != cache_key("m", MESSAGES, 0.0, 200)
+
+
+async def test_memory_backend_lru_eviction():
+    backend = MemoryCacheBackend(max_entries=2)
+    response = LLMResponse(content="x", model="m", tokens_used=1)
+    await backend.set("a", response)
+    await backend.set("b", response)
+    await backend.get("a")
+    await backend.set("c", response)
+    assert await backend.get("a") is not None
+    assert await backend.get("b") is None
+    assert len(backend) == 2
+
+
+async def test_memory_backend_ttl():
+    backend = MemoryCacheBackend(ttl=-1)
+    await backend.set("a", LLMResponse(content="x", model="m", tokens_used=1))
+    assert await backend.get("a") is None
+
+
+async def test_caching_provider_serves_repeats_and_counts():
+    inner = CountingProvider()
+    cache = LLMCache([MemoryCacheBackend()])
+    provider = CachingProvider(inner, cache)
+
+    first = await provider.complete(MESSAGES, "m")
+    second = await provider.complete(MESSAGES, "m")
+
+    assert inner.calls == 1
+    assert second.content == first.content
+    assert second.cached is True
+    assert cache.stats.as_dict()["hits"] == 1
+    assert cache.stats.misses == 1
+
+
+async def test_caching_provider_skips_sampled_and_bypassed_calls():
+    inner = CountingProvider()
+    cache = LLMCache([MemoryCacheBackend()])
+    provider = CachingProvider(inner, cache)
+
+    await provider.complete(MESSAGES, "m", temperature=0.7)
+    await provider.complete(MESSAGES, "m", temperature=0.7)
+    assert inner.calls == 2
+
+    await provider.complete(MESSAGES, "m")
+    with bypass_cache():
+        fresh = await provider.complete(MESSAGES, "m")
+    assert inner.calls == 4
+    assert fresh.cached is False
+    assert cache.stats.bypassed == 1
+
+
+class BrokenBackend(MemoryCacheBackend):
+    name = "sql"
+
+    async def get(self, key):
+        raise ConnectionError("cache table unreachable")
+
+    async def set(self, key, response):
+        raise ConnectionError("cache table unreachable")
+
+
+async def test_failing_tier_falls_through_to_the_provider():
+    inner = CountingProvider()
+    cache = LLMCache([MemoryCacheBackend(), BrokenBackend()])
+    provider = CachingProvider(inner, cache)
+
+    first = await provider.complete(MESSAGES, "m")
+    second = await provider.complete(MESSAGES, "m")
+
+    assert first.content == "answer 1"
+    assert second.cached is True  # still served by the memory tier
+    assert inner.calls == 1
+    assert cache.stats.errors == {"sql": 2}
+
+
+async def test_wrapped_stream_streams_misses_and_replays_hits():
+    cache = LLMCache([MemoryCacheBackend()])
+    provider = ProviderRegistry(cache=cache)._wrap(
+        FakeLLMProvider(latency=0.01, chunks=4), "fake", ""
+    )
+
+    miss = [c async for c in provider.complete_stream(MESSAGES, "fake")]
+    hit = [c async for c in provider.complete_stream(MESSAGES, "fake")]
+
+    assert len(miss) > 2
+    assert len(hit) == 1
+    assert hit[0].delta == miss[-1].response.content
+    assert hit[0].response.cached is True
+    assert hit[0].response.content == "".join(c.delta for c in miss)
+    assert cache.stats.misses == 1 and cache.stats.as_dict()["hits"] == 1
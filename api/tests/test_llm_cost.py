@@ -0,0 +1,104 @@
+import pytest
+from openai.types import CompletionUsage
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from sorting_hat.llm.cost import (
+    BudgetExceededError,
+    CostTrackingProvider,
+    ModelPrice,
+    PriceTable,
+    SpendBudget,
+    SQLSpendBudget,
+)
+from sorting_hat.llm.openai_compat import usage_fields
+from sorting_hat.llm.provider import LLMProvider, LLMResponse
+from sorting_hat.models.llm_spend import LLMSpend
+
+PRICES = PriceTable({"big": ModelPrice(prompt=10.0, completion=30.0, cached=1.0)})
+
+
+class UsageProvider(LLMProvider):
+    def __init__(self):
+        self.models = []
+
+    async def complete(self, messages, model, temperature=0.0, max_tokens=4096):
+        self.models.append(model)
+        return LLMResponse(
+            content="ok",
+            model=model,
+            tokens_used=1_500_000,
+            prompt_tokens=1_000_000,
+            completion_tokens=500_000,
+            cached_tokens=400_000,
+        )
+
+
+def test_usage_fields_split_tokens():
+    usage = CompletionUsage(
+        prompt_tokens=100,
+        completion_tokens=20,
+        total_tokens=120,
+        prompt_tokens_details={"cached_tokens": 64},
+    )
+    assert usage_fields(usage) == {
+        "tokens_used": 120,
+        "prompt_tokens": 100,
+        "completion_tokens": 20,
+        "cached_tokens": 64,
+    }
+    assert usage_fields(None) == {"tokens_used": 0}
+
+
+def test_cost_prices_cached_tokens_separately():
+    response = LLMResponse(
+        content="",
+        model="big-2025-01-01",
+        tokens_used=0,
+        prompt_tokens=1_000_000,
+        completion_tokens=500_000,
+        cached_tokens=400_000,
+    )
+    # 600k uncached * $10 + 400k cached * $1 + 500k completion * $30, per million.
+    assert PRICES.cost(response, "big") == pytest.approx(6.0 + 0.4 + 15.0)
+    assert PRICES.cost(response, "unpriced") == 0.0
+
+
+async def test_provider_records_cost_and_rejects_over_budget():
+    budget = SpendBudget(default=20.0)
+    provider = CostTrackingProvider(UsageProvider(), PRICES, budget, name="openai", api_key="k")
+    response = await provider.complete([], "big")
+    assert response.cost_usd == pytest.approx(21.4)
+    assert await budget.spent(provider.key) == pytest.approx(21.4)
+
+    with pytest.raises(BudgetExceededError) as exc:
+        await provider.complete([], "big")
+    assert exc.value.retry_after > 0
+    # Budgets are labelled by a fingerprint, never the raw key.
+    assert provider.key != "openai:k"
+
+
+async def test_provider_downgrades_over_budget():
+    inner = UsageProvider()
+    budget = SpendBudget(default=1.0, overrides={"openai": 50.0})
+    provider = CostTrackingProvider(
+        inner, PRICES, budget, name="openai", api_key="k", downgrade_model="small"
+    )
+    for _ in range(4):
+        await provider.complete([], "big")
+    assert inner.models == ["big", "big", "big", "small"]
+
+
+async def test_sql_budget_is_shared_between_processes(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'spend.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(LLMSpend.__table__.create)
+    # Two workers (or a worker before and after a restart) see one daily total.
+    first = SQLSpendBudget(engine, default=30.0)
+    second = SQLSpendBudget(engine, default=30.0)
+    await first.record("openai:abc", 20.0)
+    await second.record("openai:abc", 15.0)
+    await second.record("openai:abc", 0.0)
+    assert await first.spent("openai:abc") == pytest.approx(35.0)
+    assert await first.exceeded("openai:abc", "openai")
+    assert await second.spent("other:def") == 0.0
+    await engine.dispose()
@@ -0,0 +1,65 @@
+import json
+
+from sorting_hat.llm.cache import CachingProvider, LLMCache, MemoryCacheBackend
+from sorting_hat.llm.fake import FakeLLMProvider
+from sorting_hat.llm.provider import LLMMessage
+from sorting_hat.llm.rate_limit import RateLimiter, RateLimits
+from sorting_hat.llm.registry import ProviderRegistry
+from sorting_hat.services.classifier import (
+    ClassifierService,
+    classify_messages,
+    summarize_messages,
+)
+
+TAXONOMY = "\n".join(
+    f"- [00000000-0000-0000-0000-00000000000{i}] Node {i}: definition" for i in range(5)
+)
+
+
+async def test_fake_summary_is_deterministic():
+    provider = FakeLLMProvider(latency=0)
+    messages = summarize_messages("Acme Firewall blocks intrusions")
+    first = await provider.complete(messages, "fake")
+    second = await provider.complete(messages, "fake")
+    assert first == second
+    assert "intrusions" in first.content
+    assert first.prompt_tokens > 0 and first.completion_tokens > 0
+
+
+async def test_fake_token_counts_are_configurable():
+    messages = summarize_messages("Acme Firewall blocks intrusions")
+    fixed = await FakeLLMProvider(latency=0, prompt_tokens=1000, completion_tokens=200).complete(
+        messages, "fake"
+    )
+    assert (fixed.prompt_tokens, fixed.completion_tokens, fixed.tokens_used) == (1000, 200, 1200)
+    default = await FakeLLMProvider(latency=0).complete(messages, "fake")
+    scaled = await FakeLLMProvider(latency=0, chars_per_token=2).complete(messages, "fake")
+    assert scaled.prompt_tokens >= 2 * default.prompt_tokens
+
+
+async def test_fake_classify_returns_parseable_json():
+    provider = FakeLLMProvider(latency=0)
+    response = await provider.complete(classify_messages("A firewall.", TAXONOMY), "fake")
+    data = json.loads(response.content)
+    assert data["primary"]["node_id"].startswith("00000000")
+    service = ClassifierService.__new__(ClassifierService)
+    assert service._parse_classification(response.content)["primary_node_id"]
+
+
+async def test_fake_stream_reassembles_to_response():
+    provider = FakeLLMProvider(latency=0.01, chunks=4)
+    chunks = [c async for c in provider.complete_stream(summarize_messages("text"), "fake")]
+    assert "".join(c.delta for c in chunks) == chunks[-1].response.content
+    assert len(chunks) > 2
+
+
+async def test_registry_wraps_fake_like_a_real_provider():
+    limiter = RateLimiter(RateLimits(rpm=600))
+    registry = ProviderRegistry(rate_limiter=limiter, cache=LLMCache([MemoryCacheBackend()]))
+    provider = registry.get_fake(latency=0)
+    assert registry.get_fake(latency=0) is provider
+    assert isinstance(provider, CachingProvider)
+
+    chunks = [c async for c in provider.complete_stream(summarize_messages("text"), "fake")]
+    assert chunks[-1].response.content
+    assert ("fake", "fake") in limiter._buckets
@@ -1,5 +1,7 @@
 from sorting_hat.llm.provider import LLMMessage, LLMProvider, LLMResponse
+from sorting_hat.llm.cache import CachingProvider, LLMCache, MemoryCacheBackend
 from sorting_hat.llm.openai_compat import OpenAICompatProvider
+from sorting_hat.llm.registry import ProviderRegistry
 
 
 def test_llm_message_creation():
@@ -24,3 +26,36 @@ def test_openai_compat_provider_custom_base_url():
         api_key="test-key", base_url="http://localhost:11434/v1"
     )
     assert provider.client.base_url.host == "localhost"
+
+
+def test_registry_reuses_provider_per_name_and_base_url():
+    registry = ProviderRegistry(max_connections=5)
+    first = registry.get("openrouter", api_key="k", base_url="https://openrouter.ai/api/v1")
+    again = registry.get("openrouter", api_key="k", base_url="https://openrouter.ai/api/v1")
+    other = registry.get("ollama", api_key="k", base_url="http://localhost:11434/v1")
+    assert first is again
+    assert first is not other
+
+
+def test_registry_wraps_with_cache():
+    registry = ProviderRegistry(cache=LLMCache([MemoryCacheBackend()]))
+    assert isinstance(registry.get("openai", api_key="k"), CachingProvider)
+
+
+async def test_registry_aclose_forgets_providers():
+    registry = ProviderRegistry()
+    provider = registry.get("openai", api_key="k")
+    await registry.aclose()
+    assert registry.get("openai", api_key="k") is not provider
+    await registry.aclose()
+
+
+async def test_default_complete_stream_yields_single_final_chunk():
+    class StaticProvider(LLMProvider):
+        async def complete(self, messages, model, temperature=0.0, max_tokens=4096):
+            return LLMResponse(content="done", model=model, tokens_used=3)
+
+    chunks = [c async for c in StaticProvider().complete_stream([], "m")]
+    assert len(chunks) == 1
+    assert chunks[0].delta == "done"
+    assert chunks[0].response.tokens_used == 3
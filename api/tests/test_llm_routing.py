@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from sorting_hat.llm.provider import LLMProvider, LLMResponse
+from sorting_hat.llm.routing import Backend, BackendStats, RoutingProvider
+
+
+class ScriptedProvider(LLMProvider):
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.models = []
+
+    async def complete(self, messages, model, temperature=0.0, max_tokens=4096):
+        self.calls += 1
+        self.models.append(model)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("backend down")
+        return LLMResponse(content="ok", model=model, tokens_used=1)
+
+
+def test_stats_score_penalizes_errors():
+    healthy = BackendStats()
+    flaky = BackendStats()
+    for _ in range(5):
+        healthy.record(1.0, ok=True)
+        flaky.record(1.0, ok=True)
+    flaky.record(1.0, ok=False)
+    assert healthy.score() < flaky.score()
+
+
+async def test_fails_over_and_records_backend():
+    down = ScriptedProvider(fail=True)
+    up = ScriptedProvider()
+    router = RoutingProvider(
+        [Backend("openrouter", down), Backend("ollama", up, model="llama3.1")]
+    )
+    response = await router.complete([], "claude")
+    assert response.backend == "ollama"
+    assert up.models == ["llama3.1"]
+    # The failing backend is now ranked last.
+    assert router.ranked()[0].name == "ollama"
+
+
+async def test_raises_when_every_backend_fails():
+    router = RoutingProvider([Backend("a", ScriptedProvider(fail=True))])
+    with pytest.raises(RuntimeError):
+        await router.complete([], "m")
+
+
+async def test_hedges_after_percentile_latency():
+    slow = ScriptedProvider(delay=5)
+    fast = ScriptedProvider()
+    slow_backend = Backend("slow", slow)
+    for _ in range(20):
+        slow_backend.stats.samples.append(0.01)
+    router = RoutingProvider([slow_backend, Backend("fast", fast)], hedge=True)
+    response = await asyncio.wait_for(router.complete([], "m"), timeout=1)
+    assert response.backend == "fast"
+    assert slow.calls == 1
+
+
+def test_error_rate_decays_so_failed_backends_are_retried():
+    primary = BackendStats()
+    primary.record(1.0, ok=True, now=0.0)
+    primary.record(1.0, ok=False, now=1.0)
+    fallback = BackendStats()
+    fallback.record(2.0, ok=True, now=1.0)
+    assert primary.score(now=1.0) > fallback.score(now=1.0)
+    # With no traffic to re-measure it, the blip fades and the primary wins again.
+    assert primary.score(now=300.0) < fallback.score(now=300.0)
+
+    never_up = BackendStats()
+    never_up.record(1.0, ok=False, now=0.0)
+    assert 0 < never_up.score(now=0.0) < float("inf")
+    assert never_up.score(now=300.0) < never_up.score(now=0.0)
+
+
+async def test_streams_hedge_on_time_to_first_token():
+    slow = ScriptedProvider(delay=5)
+    fast = ScriptedProvider()
+    slow_backend = Backend("slow", slow)
+    for _ in range(20):
+        slow_backend.stats.record_first_token(0.01)
+    router = RoutingProvider([slow_backend, Backend("fast", fast)], hedge=True)
+
+    async def collect():
+        return [chunk async for chunk in router.complete_stream([], "m")]
+
+    chunks = await asyncio.wait_for(collect(), timeout=1)
+    assert chunks[-1].response.backend == "fast"
+    assert slow.calls == 1 and fast.calls == 1
+    assert len(router.backends[1].stats.first_token_samples) == 1
+
+
+async def test_streams_fail_over_before_the_first_chunk():
+    router = RoutingProvider(
+        [Backend("down", ScriptedProvider(fail=True)), Backend("up", ScriptedProvider())]
+    )
+    chunks = [chunk async for chunk in router.complete_stream([], "m")]
+    assert chunks[-1].response.backend == "up"
+    assert router.ranked()[0].name == "up"
@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from sorting_hat.config import LLMProviderConfig, settings
+from sorting_hat.llm.openai_compat import OpenAICompatProvider
+from sorting_hat.llm.provider import LLMMessage
+from sorting_hat.llm.rate_limit import (
+    RateLimiter,
+    RateLimits,
+    estimate_tokens,
+    parse_reset,
+    provider_limits,
+)
+
+
+def test_estimate_tokens_includes_max_tokens():
+    messages = [LLMMessage(role="user", content="x" * 400)]
+    assert estimate_tokens(messages) == 104
+    assert estimate_tokens(messages, max_tokens=1000) == 1104
+
+
+def test_parse_reset_formats():
+    assert parse_reset("1s") == 1.0
+    assert parse_reset("6m0s") == 360.0
+    assert parse_reset("20ms") == 0.02
+    assert parse_reset("2") == 2.0
+    assert parse_reset(None) is None
+    assert parse_reset("soon") is None
+
+
+def test_overrides_by_provider_and_model():
+    limiter = RateLimiter(
+        default=RateLimits(rpm=10),
+        overrides={"openrouter": RateLimits(rpm=20), "openrouter/big": RateLimits(rpm=5)},
+    )
+    assert limiter.limits_for("openrouter", "big").rpm == 5
+    assert limiter.limits_for("openrouter", "small").rpm == 20
+    assert limiter.limits_for("ollama", "llama3").rpm == 10
+
+
+def test_provider_limits_fall_back_to_the_global_ones(monkeypatch):
+    monkeypatch.setattr(settings, "llm_rpm", 100)
+    monkeypatch.setattr(settings, "llm_tpm", 50_000)
+    limits = provider_limits(LLMProviderConfig(max_concurrency=4))
+    assert limits == RateLimits(rpm=100, tpm=50_000, max_concurrency=4)
+
+
+async def test_unlimited_does_not_block():
+    limiter = RateLimiter()
+    start = time.monotonic()
+    for _ in range(50):
+        async with limiter.acquire("openai", "gpt-4o", 1000):
+            pass
+    assert time.monotonic() - start < 0.1
+
+
+async def test_max_concurrency_is_enforced():
+    limiter = RateLimiter(default=RateLimits(max_concurrency=2))
+    in_flight = 0
+    peak = 0
+
+    async def call():
+        nonlocal in_flight, peak
+        async with limiter.acquire("openai", "gpt-4o"):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak == 2
+
+
+async def test_exhausted_remaining_header_pauses_callers():
+    limiter = RateLimiter(default=RateLimits(rpm=6000))
+    async with limiter.acquire("openai", "gpt-4o") as lease:
+        lease.update_from_headers(
+            {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "50ms"}
+        )
+    start = time.monotonic()
+    async with limiter.acquire("openai", "gpt-4o"):
+        pass
+    assert time.monotonic() - start >= 0.04
+
+
+async def test_every_429_retry_goes_through_the_limiter():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(429, headers={"retry-after": "0.01"}, json={"error": {}})
+
+    provider = OpenAICompatProvider(
+        api_key="k",
+        base_url="http://llm.test/v1",
+        rate_limiter=RateLimiter(),
+        rate_limit_retries=1,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    with pytest.raises(RateLimitError):
+        await provider.complete([LLMMessage(role="user", content="hi")], "gpt-4o")
+    assert len(requests) == 2  # no hidden SDK retries on top of rate_limit_retries
+
+
+async def test_stream_retries_a_429_before_the_first_chunk():
+    responses = [
+        httpx.Response(429, headers={"retry-after": "0.01"}, json={"error": {}}),
+        httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content=b"".join(
+                b"data: %s\n\n" % event
+                for event in (
+                    b'{"id":"1","object":"chat.completion.chunk","created":0,"model":"gpt-4o",'
+                    b'"choices":[{"index":0,"delta":{"content":"hel"}}]}',
+                    b'{"id":"1","object":"chat.completion.chunk","created":0,"model":"gpt-4o",'
+                    b'"choices":[{"index":0,"delta":{"content":"lo"}}]}',
+                    b"[DONE]",
+                )
+            ),
+        ),
+    ]
+    provider = OpenAICompatProvider(
+        api_key="k",
+        base_url="http://llm.test/v1",
+        rate_limiter=RateLimiter(),
+        rate_limit_retries=1,
+        http_client=httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: responses.pop(0))
+        ),
+    )
+    chunks = [
+        chunk
+        async for chunk in provider.complete_stream(
+            [LLMMessage(role="user", content="hi")], "gpt-4o"
+        )
+    ]
+    assert [chunk.delta for chunk in chunks] == ["hel", "lo", ""]
+    assert chunks[-1].response.content == "hello"
+    assert responses == []
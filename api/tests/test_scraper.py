@@ -1,6 +1,15 @@
+import asyncio
+
+import pytest
 import trafilatura
 
-from sorting_hat.services.scraper import Scraper, ScraperError
+from sorting_hat.services.scraper import (
+    LatencyTracker,
+    Scraper,
+    ScraperError,
+    _RetryableError,
+    parse_retry_after,
+)
 
 
 def test_scraper_exists():
@@ -38,3 +47,96 @@ def test_trafilatura_extracts_content():
     result = trafilatura.extract(html, include_comments=False, favor_recall=True)
     assert result is not None
     assert "endpoint protection" in result.lower() or "security" in result.lower()
+
+
+HTML = "<html><body><main><h1>Product</h1><p>" + "An endpoint protection platform. " * 20 + "</p></main></body></html>"
+
+
+def test_latency_tracker_needs_min_samples():
+    tracker = LatencyTracker(min_samples=3)
+    tracker.record(0.1)
+    assert tracker.percentile(0.95) is None
+    tracker.record(0.2)
+    tracker.record(0.3)
+    assert tracker.percentile(0.95) == 0.3
+
+
+def test_backoff_is_capped():
+    scraper = Scraper(backoff_base=1.0, backoff_max=2.0)
+    assert all(0 <= scraper._backoff(retry) <= 2.0 for retry in range(10))
+
+
+async def test_scrape_retries_transient_failures():
+    scraper = Scraper(max_attempts=3, backoff_base=0.0)
+    calls = []
+
+    async def flaky_get(client, url):
+        calls.append(url)
+        if len(calls) < 3:
+            raise _RetryableError("HTTP 503")
+        return HTML
+
+    scraper._get = flaky_get
+    result = await scraper.scrape("https://example.com")
+    assert result.attempts == 3
+    assert "endpoint protection" in result.extracted_text.lower()
+
+
+async def test_scrape_gives_up_after_max_attempts():
+    scraper = Scraper(max_attempts=2, backoff_base=0.0)
+
+    async def failing_get(client, url):
+        raise _RetryableError("HTTP 503")
+
+    scraper._get = failing_get
+    with pytest.raises(ScraperError, match="after 2 attempts"):
+        await scraper.scrape("https://example.com")
+
+
+async def test_scrape_hedges_slow_request():
+    tracker = LatencyTracker(min_samples=1)
+    tracker.record(0.01)
+    scraper = Scraper(hedge=True, hedge_min_delay=0.01, latency_tracker=tracker)
+    calls = []
+
+    async def slow_then_fast_get(client, url):
+        calls.append(url)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+        return HTML
+
+    scraper._get = slow_then_fast_get
+    result = await scraper.scrape("https://example.com")
+    assert result.attempts == 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+async def test_scrape_gives_up_at_the_total_deadline():
+    scraper = Scraper(total_timeout=0.05, max_attempts=3, backoff_base=0.0)
+
+    async def hanging_get(client, url):
+        await asyncio.sleep(5)
+
+    scraper._get = hanging_get
+    with pytest.raises(ScraperError, match="within 0.05s"):
+        await asyncio.wait_for(scraper.scrape("https://example.com"), timeout=1)
+
+
+async def test_scrape_stops_when_retry_after_exceeds_the_deadline():
+    scraper = Scraper(total_timeout=10, max_attempts=3, backoff_base=0.0)
+    calls = []
+
+    async def throttled_get(client, url):
+        calls.append(url)
+        raise _RetryableError("HTTP 429", retry_after=60)
+
+    scraper._get = throttled_get
+    with pytest.raises(ScraperError, match="after 1 attempts"):
+        await asyncio.wait_for(scraper.scrape("https://example.com"), timeout=1)
+    assert len(calls) == 1
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+
+from sorting_hat.models.taxonomy import Branch
+from sorting_hat.services.suggest import SuggestIndex, aliases, suggest_index
+from sorting_hat.services.taxonomy_snapshot import NodeView, TaxonomySnapshot
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def node(id: str, parent_id: str | None, path: str, name: str) -> NodeView:
+    return NodeView(
+        id, "g", parent_id, path, name, path.rsplit(".", 1)[-1], path.count(".") + 1,
+        Branch.software, "", "", "", "", 0, NOW, NOW,
+    )  # fmt: skip
+
+
+SNAPSHOT = TaxonomySnapshot(
+    0,
+    [],
+    [
+        node("sec", None, "software.security", "Security (Software)"),
+        node("iam", "sec", "software.security.iam", "Identity & Access Management (IAM)"),
+        node("dev", None, "software.dev", "Application Development & Platform"),
+        node("cicd", "dev", "software.dev.cicd", "CI/CD & Build Automation"),
+        node("kube", "dev", "software.dev.containers", "Container Orchestration"),
+    ],
+)
+
+
+def test_aliases():
+    assert {"iam", "identity access management"} <= aliases("Identity & Access Management (IAM)")
+    assert {"ci", "cd"} <= aliases("CI/CD & Build Automation")
+
+
+def test_prefix_acronym_and_typo_matches():
+    index = SuggestIndex(SNAPSHOT)
+    top = index.suggest("iam")[0]
+    assert top.node.id == "iam"
+    assert top.breadcrumb == "Security (Software) > Identity & Access Management (IAM)"
+    assert index.suggest("acc man")[0].node.id == "iam"
+    assert index.suggest("orchest")[0].node.id == "kube"
+    assert index.suggest("contaner")[0].node.id == "kube"  # typo, via trigrams
+    assert index.suggest("zzzz") == []
+
+
+def test_index_is_rebuilt_only_when_the_taxonomy_changes():
+    index = suggest_index(SNAPSHOT)
+    assert suggest_index(SNAPSHOT) is index
+    assert suggest_index(TaxonomySnapshot(1, [], SNAPSHOT.nodes)) is index  # reloaded, same content
+    changed = suggest_index(TaxonomySnapshot(2, [], [n for n in SNAPSHOT.nodes if n.id != "kube"]))
+    assert changed is not index
+    assert changed.suggest("orchest") == []
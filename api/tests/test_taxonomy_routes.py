@@ -1,6 +1,9 @@
 from fastapi.testclient import TestClient
 
 from sorting_hat.main import app
+from sorting_hat.pagination import encode_cursor
+from sorting_hat.services.taxonomy_snapshot import get_snapshot
+from tests.test_taxonomy_snapshot import make_snapshot
 
 client = TestClient(app)
 
@@ -10,3 +13,96 @@ def test_taxonomy_routes_registered():
     assert "/api/v1/taxonomy/governance-groups" in routes
     assert "/api/v1/taxonomy/nodes" in routes
     assert "/api/v1/taxonomy/nodes/search" in routes
+
+
+def test_taxonomy_reads_support_conditional_requests():
+    snapshot = make_snapshot()
+    app.dependency_overrides[get_snapshot] = lambda: snapshot
+    try:
+        first = client.get("/api/v1/taxonomy/governance-groups")
+        assert first.status_code == 200
+        assert first.headers["etag"] == snapshot.etag
+        assert "cache-control" in first.headers
+
+        again = client.get(
+            "/api/v1/taxonomy/governance-groups", headers={"If-None-Match": snapshot.etag}
+        )
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["etag"] == snapshot.etag
+
+        stale = client.get("/api/v1/taxonomy/nodes", headers={"If-None-Match": '"old"'})
+        assert stale.status_code == 200
+        assert len(stale.json()) == len(snapshot.nodes)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_tree_is_nested_and_precompressed():
+    snapshot = make_snapshot()
+    app.dependency_overrides[get_snapshot] = lambda: snapshot
+    try:
+        response = client.get(
+            "/api/v1/taxonomy/tree?fields=name&max_depth=2",
+            headers={"Accept-Encoding": "br;q=0, gzip"},
+        )
+        revalidated = client.get(
+            "/api/v1/taxonomy/tree?fields=name&max_depth=2",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+        )
+        bad = client.get("/api/v1/taxonomy/tree?fields=nope")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == snapshot.etag[:-1] + '-gzip"'
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == response.headers["etag"]
+    assert revalidated.headers["vary"] == "Accept-Encoding"
+    tree = response.json()  # the test client decodes gzip
+    assert [root["name"] for root in tree] == ["Software"]
+    assert [child["name"] for child in tree[0]["children"]] == ["App Dev", "Devices"]
+    assert tree[0]["children"][0] == {"id": "dev", "name": "App Dev", "children": []}
+    assert snapshot.tree_payload(["name"], 2) is snapshot.tree_payload(["name"], 2)
+    assert bad.status_code == 400
+
+
+def test_roots_and_children_carry_counts():
+    snapshot = make_snapshot()
+    app.dependency_overrides[get_snapshot] = lambda: snapshot
+    try:
+        roots = client.get("/api/v1/taxonomy/nodes/roots").json()
+        children = client.get("/api/v1/taxonomy/nodes/dev/children").json()
+        missing = client.get("/api/v1/taxonomy/nodes/nope/children")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [(n["id"], n["child_count"], n["descendant_count"]) for n in roots] == [("sw", 2, 4)]
+    assert [(n["id"], n["child_count"]) for n in children] == [("ci", 0), ("ides", 0)]
+    assert missing.status_code == 404
+
+
+def test_list_nodes_keyset_pages():
+    snapshot = make_snapshot()
+    app.dependency_overrides[get_snapshot] = lambda: snapshot
+    try:
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/v1/taxonomy/nodes", params=params)
+            seen += [n["path"] for n in response.json()]
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+        bad = client.get("/api/v1/taxonomy/nodes", params={"cursor": "garbage"})
+        not_a_path = client.get("/api/v1/taxonomy/nodes", params={"cursor": encode_cursor(5)})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert seen == [n.path for n in snapshot.nodes]
+    assert bad.status_code == 400
+    assert not_a_path.status_code == 400
+    assert not_a_path.json()["detail"] == "Invalid cursor"
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
+from sorting_hat.schemas.taxonomy import TaxonomyNodeImport
 from sorting_hat.services.taxonomy import TaxonomyService, TaxonomyServiceError, slugify
 
 
@@ -54,17 +55,14 @@ async def test_search_nodes_includes_ancestors():
     child.path = "software.app_dev.ides"
 
     session = AsyncMock()
-    # First call: search query returns only the child
+    # First call: ranked search returns only the child
     search_result = MagicMock()
     search_result.scalars.return_value.all.return_value = [child]
-    # Second call: fetch parent
-    parent_result = MagicMock()
-    parent_result.scalars.return_value.all.return_value = [parent]
-    # Third call: fetch grandparent
-    grandparent_result = MagicMock()
-    grandparent_result.scalars.return_value.all.return_value = [grandparent]
+    # Second call: every ancestor of the matches, in one ltree query
+    ancestors_result = MagicMock()
+    ancestors_result.scalars.return_value.all.return_value = [grandparent, parent]
 
-    session.execute.side_effect = [search_result, parent_result, grandparent_result]
+    session.execute.side_effect = [search_result, ancestors_result]
 
     service = TaxonomyService(session)
     results = await service.search_nodes("IDE")
@@ -73,3 +71,159 @@ async def test_search_nodes_includes_ancestors():
     assert "c-id" in ids, "Matching child node should be in results"
     assert "p-id" in ids, "Parent ancestor should be in results"
     assert "gp-id" in ids, "Grandparent ancestor should be in results"
+    assert ids == ["gp-id", "p-id", "c-id"], "Ancestors come before matches"
+    assert session.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_resolve_node_paths_is_one_query():
+    session = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = [("c-id", "Software > App Dev > IDEs"), ("p-id", "Software > App Dev")]
+    session.execute.return_value = result
+
+    service = TaxonomyService(session)
+    paths = await service.resolve_node_paths(["c-id", "p-id", "c-id", "missing"])
+
+    assert paths == {"c-id": "Software > App Dev > IDEs", "p-id": "Software > App Dev"}
+    assert session.execute.await_count == 1
+    sql = str(session.execute.await_args.args[0])
+    assert "@>" in sql and "string_agg" in sql
+
+
+@pytest.mark.asyncio
+async def test_resolve_node_paths_empty_skips_query():
+    session = AsyncMock()
+    assert await TaxonomyService(session).resolve_node_paths([]) == {}
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_subtree_uses_ltree_operators():
+    node = MagicMock()
+    node.path = "software.dev"
+    session = AsyncMock()
+    node_result = MagicMock()
+    node_result.scalar_one_or_none.return_value = node
+    subtree_result = MagicMock()
+    subtree_result.scalars.return_value.all.return_value = []
+    session.execute.side_effect = [node_result, subtree_result, node_result, subtree_result]
+
+    service = TaxonomyService(session)
+    await service.get_subtree("dev-id")
+    assert "<@" in str(session.execute.await_args.args[0])
+    assert "LIKE" not in str(session.execute.await_args.args[0])
+
+    await service.get_subtree("dev-id", depth=1)
+    query = session.execute.await_args.args[0]
+    assert "~" in str(query)
+    assert "software.dev.*{0,1}" in query.compile().params.values()
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_resolves_tree_in_memory_and_counts():
+    session = AsyncMock()
+    session.info = {}
+    groups = MagicMock()
+    groups.all.return_value = [("data", "group-id")]
+    existing = [("top-id", "software.data", "group-id")]
+    # One INSERT per depth: the existing top node was updated, two nodes were created
+    session.execute.side_effect = [groups, existing, [(False,)], [(True,)], [(True,)]]
+
+    tree = TaxonomyNodeImport(
+        path="software.data",
+        name="Data",
+        children=[
+            TaxonomyNodeImport(
+                name="ETL Tools", children=[TaxonomyNodeImport(name="Reverse ETL")]
+            )
+        ],
+    )
+    result = await TaxonomyService(session).bulk_upsert_nodes([tree])
+
+    assert (result.created, result.updated, result.unchanged) == (2, 1, 0)
+    assert session.execute.await_count == 5
+    statements = [call.args[0] for call in session.execute.await_args_list[2:]]
+    top, child, grandchild = (stmt.compile().params for stmt in statements)
+    assert grandchild["path_m0"] == "software.data.etl_tools.reverse_etl"
+    assert grandchild["parent_id_m0"] == child["id_m0"]
+    assert child["parent_id_m0"] == "top-id"
+    # Fields the import left out keep their current values.
+    top_sql = str(statements[0])
+    assert "name = excluded.name" in top_sql and "definition = excluded" not in top_sql
+    assert session.info.get("taxonomy_changed")
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_moves_subtree_with_its_top_level_group():
+    session = AsyncMock()
+    session.info = {}
+    groups = MagicMock()
+    groups.all.return_value = [("data", "group-id"), ("infra", "infra-id")]
+    existing = [("top-id", "software.data", "group-id")]
+    session.execute.side_effect = [groups, existing, [(False,)], MagicMock()]
+
+    await TaxonomyService(session).bulk_upsert_nodes(
+        [TaxonomyNodeImport(path="software.data", name="Data", governance_group="infra")]
+    )
+
+    assert session.execute.await_count == 4
+    regroup = session.execute.await_args.args[0]
+    sql = str(regroup)
+    assert sql.startswith("UPDATE taxonomy_nodes SET governance_group_id") and "<@" in sql
+    assert "infra-id" in regroup.compile().params.values()
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_rejects_missing_parent_before_writing():
+    session = AsyncMock()
+    groups = MagicMock()
+    groups.all.return_value = []
+    session.execute.side_effect = [groups, []]
+
+    with pytest.raises(TaxonomyServiceError, match="Parent 'software.nope' .* not found"):
+        await TaxonomyService(session).bulk_upsert_nodes(
+            [TaxonomyNodeImport(path="software.nope.child", name="Child")]
+        )
+    assert session.execute.await_count == 2
+
+
+def _node(id, path, parent_id=None, branch="software"):
+    node = MagicMock()
+    node.id, node.path, node.parent_id, node.branch = id, path, parent_id, branch
+    node.governance_group_id = "group-id"
+    return node
+
+
+@pytest.mark.asyncio
+async def test_move_node_rewrites_subtree_in_one_update():
+    node = _node("n-id", "software.a.etl", parent_id="a-id")
+    parent = _node("b-id", "software.b")
+    session = AsyncMock()
+    session.info = {}
+    found = MagicMock()
+    found.scalars.return_value.all.return_value = [node, parent]
+    moved = MagicMock()
+    moved.scalar_one.return_value = node
+    session.execute.side_effect = [found, MagicMock(), moved]
+
+    assert await TaxonomyService(session).move_node("n-id", "b-id") is node
+
+    assert session.execute.await_count == 3
+    sql = str(session.execute.await_args_list[1].args[0])
+    assert sql.startswith("UPDATE taxonomy_nodes")
+    assert "subpath(taxonomy_nodes.path" in sql and "<@" in sql
+    assert session.info.get("taxonomy_changed")
+
+
+@pytest.mark.asyncio
+async def test_move_node_rejects_own_descendant():
+    node = _node("n-id", "software.a")
+    child = _node("c-id", "software.a.child", parent_id="n-id")
+    session = AsyncMock()
+    found = MagicMock()
+    found.scalars.return_value.all.return_value = [node, child]
+    session.execute.return_value = found
+
+    with pytest.raises(TaxonomyServiceError, match="under itself"):
+        await TaxonomyService(session).move_node("n-id", "c-id")
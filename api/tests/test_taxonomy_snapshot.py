@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+from sorting_hat.models.taxonomy import Branch
+from sorting_hat.services.taxonomy_snapshot import (
+    GroupView,
+    NodeView,
+    TaxonomySnapshot,
+    TaxonomySnapshotCache,
+    encoded_etag,
+    etag_matches,
+    negotiate_encoding,
+)
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def group(slug: str) -> GroupView:
+    return GroupView(slug, slug.title(), slug, "", True, False, 0, NOW, NOW)
+
+
+def node(id: str, parent_id: str | None, path: str, name: str, sort_order: int = 0) -> NodeView:
+    return NodeView(
+        id, "apps", parent_id, path, name, path.rsplit(".", 1)[-1], path.count(".") + 1,
+        Branch.software, "", "", "", "", sort_order, NOW, NOW,
+    )  # fmt: skip
+
+
+def make_snapshot(version: int = 0) -> TaxonomySnapshot:
+    return TaxonomySnapshot(
+        version,
+        [group("apps")],
+        [
+            node("ides", "dev", "software.dev.ides", "IDEs", sort_order=1),
+            node("sw", None, "software", "Software"),
+            node("dev", "sw", "software.dev", "App Dev"),
+            node("ci", "dev", "software.dev.ci", "CI/CD", sort_order=0),
+            node("devices", "sw", "software.devices", "Devices"),
+        ],
+    )
+
+
+def test_indexes_and_ancestor_chains():
+    snapshot = make_snapshot()
+    assert snapshot.by_path["software.dev"].id == "dev"
+    assert [n.id for n in snapshot.get_children("dev")] == ["ci", "ides"]
+    assert [n.id for n in snapshot.get_parent_chain("ides")] == ["sw", "dev"]
+    assert snapshot.resolve_node_path("ides") == "Software > App Dev > IDEs"
+    assert snapshot.resolve_node_path("missing") is None
+
+
+def test_subtree_does_not_match_shared_prefix_siblings():
+    snapshot = make_snapshot()
+    assert [n.id for n in snapshot.get_subtree("dev")] == ["dev", "ci", "ides"]
+    assert [n.id for n in snapshot.get_subtree("sw", depth=1)] == ["sw", "dev", "devices"]
+    assert [n.id for n in snapshot.list_nodes(max_depth=2)] == ["sw", "dev", "devices"]
+    assert snapshot.list_nodes(governance_group_slug="nope") == []
+
+
+async def test_cache_rebuilds_once_per_version():
+    loads = []
+
+    async def loader(version):
+        loads.append(version)
+        return make_snapshot(version)
+
+    cache = TaxonomySnapshotCache(ttl=0, loader=loader)
+    first = await cache.get()
+    assert await cache.get() is first
+    cache.invalidate()
+    second = await cache.get()
+    assert second is not first and second.version == 1
+    assert loads == [0, 1]
+
+
+def test_encoding_negotiation_and_per_encoding_etags():
+    assert negotiate_encoding("gzip, br", ("br", "gzip")) == "br"
+    assert negotiate_encoding("br;q=0, gzip;q=0.5", ("br", "gzip")) == "gzip"
+    assert negotiate_encoding("*;q=0.1", ("br", "gzip")) == "br"
+    assert negotiate_encoding("identity", ("br", "gzip")) is None
+    assert negotiate_encoding(None, ("gzip",)) is None
+
+    etag = '"abc"'
+    assert encoded_etag(etag, "br") == '"abc-br"'
+    assert encoded_etag(etag, None) == etag
+    assert etag_matches('W/"abc-gzip", "zzz"', etag)
+    assert etag_matches('"abc"', etag)
+    assert not etag_matches('"abd-br"', etag)
@@ -40,6 +40,24 @@ export interface TaxonomyNode {
   sort_order: number;
 }
 
+export interface TaxonomyNodeWithCounts extends TaxonomyNode {
+  child_count: number;
+  descendant_count: number;
+}
+
+export interface TaxonomyNodeSuggestion {
+  id: string;
+  name: string;
+  path: string;
+  level: number;
+  branch: string;
+  score: number;
+}
+
+export interface TaxonomyTreeNode extends TaxonomyNode {
+  children: TaxonomyTreeNode[];
+}
+
 export interface TaxonomyNodeDetail extends TaxonomyNode {
   children: TaxonomyNode[];
   parent_chain: TaxonomyNode[];
@@ -84,6 +102,17 @@ export const api = {
       const qs = query.toString();
       return fetchAPI<TaxonomyNode[]>(`/taxonomy/nodes${qs ? `?${qs}` : ""}`);
     },
+    getTree: (params?: { max_depth?: number }) => {
+      const qs = params?.max_depth ? `?max_depth=${params.max_depth}` : "";
+      return fetchAPI<TaxonomyTreeNode[]>(`/taxonomy/tree${qs}`);
+    },
+    suggestNodes: (q: string, limit = 10) =>
+      fetchAPI<TaxonomyNodeSuggestion[]>(
+        `/taxonomy/nodes/suggest?q=${encodeURIComponent(q)}&limit=${limit}`
+      ),
+    listRoots: () => fetchAPI<TaxonomyNodeWithCounts[]>("/taxonomy/nodes/roots"),
+    listChildren: (id: string) =>
+      fetchAPI<TaxonomyNodeWithCounts[]>(`/taxonomy/nodes/${id}/children`),
     getNode: (id: string) => fetchAPI<TaxonomyNodeDetail>(`/taxonomy/nodes/${id}`),
     searchNodes: (q: string) => fetchAPI<TaxonomyNode[]>(`/taxonomy/nodes/search?q=${encodeURIComponent(q)}`),
   },